@@ -13,6 +13,7 @@ from .models import (
     SlotStatus,
     SlotStatusHistory,
 )
+from apps.core.pagination import EstimatedCountAdminMixin
 
 # Importar o admin_site customizado
 from smartpark.admin import admin_site
@@ -415,7 +416,7 @@ class SlotStatusAdmin(admin.ModelAdmin):
     confidence_display.short_description = "Confiança"
 
 
-class SlotStatusHistoryAdmin(admin.ModelAdmin):
+class SlotStatusHistoryAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = [
         "slot_info",
         "status",
@@ -0,0 +1,239 @@
+"""
+Índice em memória dos estabelecimentos públicos, para a busca com facetas.
+
+Cada estabelecimento de cliente ativo ocupa uma posição (ordem de nome) e
+cada valor de faceta (tipo de loja, cidade, estado) guarda um bitset (int do
+Python) com as posições que o têm; "tem vaga livre" é mais um bitset. Um
+filtro é um AND dos bitsets (OR entre valores da mesma faceta) e a contagem
+de cada valor é um popcount, sem consultar o banco.
+
+O índice é remontado quando um estabelecimento muda, ou a cada
+REFRESH_SECONDS. A mudança incrementa uma versão no banco (CacheVersions,
+ver apps.catalog.signals), que cada processo relê no máximo a cada
+VERSION_CHECK_SECONDS, fora do lock. As vagas livres são relidas
+a cada FREE_REFRESH_SECONDS (uma consulta agregada) e, entre uma leitura e
+outra, ajustadas pela ingestão deste processo.
+"""
+
+import threading
+import time
+
+from django.db.models import Count
+
+from apps.core.models import CacheVersions
+
+from .models import Establishments, Lots, Slots
+
+FACETS = ("store_type", "city", "state")
+FREE_STATUS = "FREE"
+ACTIVE_CLIENT = "ACTIVE"
+
+VERSION_NAME = "establishment-index"
+REFRESH_SECONDS = 300
+# Intervalo mínimo entre leituras da versão do índice no banco
+VERSION_CHECK_SECONDS = 5
+FREE_REFRESH_SECONDS = 30
+# Resultados de filtros guardados entre mudanças do índice
+MAX_MEMO_SIZE = 256
+
+
+def positions(bits):
+    """Posições dos bits ligados, em ordem crescente"""
+    return [index for index, bit in enumerate(bin(bits)[:1:-1]) if bit == "1"]
+
+
+class EstablishmentIndex:
+    """
+    Bitsets por valor de faceta sobre os estabelecimentos públicos
+    """
+
+    def __init__(
+        self,
+        refresh_seconds=REFRESH_SECONDS,
+        free_refresh_seconds=FREE_REFRESH_SECONDS,
+        version_check_seconds=VERSION_CHECK_SECONDS,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.free_refresh_seconds = free_refresh_seconds
+        self.version_check_seconds = version_check_seconds
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.rows = []
+            self.positions = {}
+            self.lots = {}
+            self.bitsets = {facet: {} for facet in FACETS}
+            self.free_counts = []
+            self.free = 0
+            self.version = None
+            self.loaded_at = None
+            self.free_loaded_at = None
+            self.memo = {}
+            self.latest_version = None
+            self.version_checked_at = None
+
+    def invalidate(self):
+        """Marca o índice como desatualizado em todos os processos"""
+        CacheVersions.bump(VERSION_NAME)
+        with self.lock:
+            self.loaded_at = None
+            self.version_checked_at = None
+
+    def current_version(self):
+        """Versão do índice no banco (relida a cada version_check_seconds)"""
+        now = time.monotonic()
+        checked_at = self.version_checked_at
+        if checked_at is None or now - checked_at >= self.version_check_seconds:
+            self.latest_version = CacheVersions.current(VERSION_NAME)
+            self.version_checked_at = now
+        return self.latest_version
+
+    def search(self, filters, has_free=None):
+        """
+        Estabelecimentos que atendem aos filtros e contagens de cada faceta
+
+        `filters` mapeia a faceta para os valores aceitos (OR); `has_free`
+        filtra por ter (True) ou não ter (False) vaga livre. Retorna
+        (linhas em ordem de nome, {faceta: {valor: quantidade}}).
+        """
+        key = (
+            tuple(
+                sorted(
+                    (facet, tuple(sorted(values))) for facet, values in filters.items()
+                )
+            ),
+            has_free,
+        )
+        version = self.current_version()
+        with self.lock:
+            self.ensure_fresh(version)
+            cached = self.memo.get(key)
+            if cached is None:
+                if len(self.memo) >= MAX_MEMO_SIZE:
+                    self.memo.clear()
+                cached = self.memo[key] = self.evaluate(filters, has_free)
+            matches, facets = cached
+            return [self.rows[position] for position in matches], facets
+
+    def record_free_delta(self, lot_id, delta):
+        """Aplica a variação de vagas livres de um lote (ingestão)"""
+        with self.lock:
+            position = self.lots.get(lot_id)
+            if position is None:
+                return
+            self.free_counts[position] += delta
+            if self.free_counts[position] > 0:
+                self.free |= 1 << position
+            else:
+                self.free &= ~(1 << position)
+            self.memo.clear()
+
+    def ensure_fresh(self, version):
+        now = time.monotonic()
+        if (
+            self.loaded_at is None
+            or version != self.version
+            or now - self.loaded_at >= self.refresh_seconds
+        ):
+            self.load(version, now)
+        elif now - self.free_loaded_at >= self.free_refresh_seconds:
+            self.load_free(now)
+
+    def load(self, version, now):
+        """Remonta as posições e os bitsets das facetas"""
+        rows = (
+            Establishments.objects.filter(client__onboarding_status=ACTIVE_CLIENT)
+            .order_by("name", "id")
+            .values(
+                "id",
+                "name",
+                "store_type__name",
+                "address",
+                "city",
+                "state",
+                "lat",
+                "lng",
+            )
+        )
+        self.rows = []
+        self.positions = {}
+        self.bitsets = {facet: {} for facet in FACETS}
+        for position, row in enumerate(rows):
+            row["store_type"] = row.pop("store_type__name")
+            self.rows.append(row)
+            self.positions[row["id"]] = position
+            for facet in FACETS:
+                if row[facet]:
+                    values = self.bitsets[facet]
+                    values[row[facet]] = values.get(row[facet], 0) | 1 << position
+
+        self.lots = {
+            lot_id: self.positions[establishment_id]
+            for lot_id, establishment_id in Lots.objects.filter(
+                establishment_id__in=self.positions
+            ).values_list("id", "establishment_id")
+            if establishment_id in self.positions
+        }
+        self.version = version
+        self.loaded_at = now
+        self.load_free(now)
+
+    def load_free(self, now):
+        """Relê a quantidade de vagas livres de cada estabelecimento"""
+        self.free_counts = [0] * len(self.rows)
+        self.free = 0
+        rows = (
+            Slots.objects.filter(active=True, current_status__status=FREE_STATUS)
+            .values("lot__establishment_id")
+            .annotate(free=Count("id"))
+        )
+        for row in rows:
+            position = self.positions.get(row["lot__establishment_id"])
+            if position is not None:
+                self.free_counts[position] = row["free"]
+                self.free |= 1 << position
+        self.free_loaded_at = now
+        self.memo.clear()
+
+    def evaluate(self, filters, has_free):
+        everything = (1 << len(self.rows)) - 1
+        selections = {
+            facet: self.union(facet, values) for facet, values in filters.items()
+        }
+        free_selection = everything
+        if has_free is not None:
+            free_selection = self.free if has_free else everything & ~self.free
+
+        def matching(excluded=None, free=True):
+            bits = free_selection if free else everything
+            for facet, selection in selections.items():
+                if facet != excluded:
+                    bits &= selection
+            return bits
+
+        # Cada faceta conta com os filtros das outras, para mostrar alternativas
+        facets = {}
+        for facet in FACETS:
+            base = matching(excluded=facet)
+            counts = {}
+            for value, bits in self.bitsets[facet].items():
+                count = (bits & base).bit_count()
+                if count:
+                    counts[value] = count
+            facets[facet] = dict(sorted(counts.items()))
+
+        base = matching(free=False)
+        free = (base & self.free).bit_count()
+        facets["has_free"] = {"true": free, "false": base.bit_count() - free}
+        return positions(matching()), facets
+
+    def union(self, facet, values):
+        bits = 0
+        for value in values:
+            bits |= self.bitsets[facet].get(value, 0)
+        return bits
+
+
+establishment_index = EstablishmentIndex()
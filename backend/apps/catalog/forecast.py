@@ -0,0 +1,155 @@
+"""
+Previsão de ocupação por hora da semana, por lote e tipo de vaga.
+
+Toda noite os rollups por hora das últimas semanas completas são lidos uma
+única vez, em ordem de (lote, tipo de vaga), e cada grupo vira um perfil de
+168 posições (hora da semana, horário local). As semanas recentes pesam mais:
+a semana que terminou há k semanas tem peso `decay ** k`.
+
+Horas sem rollup não tiveram vagas ocupadas, então o denominador de cada
+posição é a soma dos pesos das semanas observadas (fórmula fechada), e não a
+soma das linhas lidas. A consulta de uma previsão é só um acesso por índice
+ao perfil gravado.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.core.partitioning import local_timezone
+
+from .models import OccupancyProfiles, OccupancyRollups, Slots
+
+HOURS_PER_WEEK = 168
+HOUR_SECONDS = 3600
+
+DEFAULT_WEEKS = 8
+DEFAULT_DECAY = 0.7
+WRITE_BATCH_SIZE = 1000
+
+
+def hour_of_week(moment):
+    """Posição no perfil (0 = segunda 00h, horário local)"""
+    local = moment.astimezone(local_timezone())
+    return local.weekday() * 24 + local.hour
+
+
+def week_start(moment):
+    """Segunda-feira 00:00 (horário local) da semana de `moment`"""
+    local = moment.astimezone(local_timezone())
+    monday = local.date() - timedelta(days=local.weekday())
+    return local.replace(
+        year=monday.year,
+        month=monday.month,
+        day=monday.day,
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
+
+
+class OccupancyProfileBuilder:
+    """
+    Recalcula os perfis de ocupação a partir dos rollups por hora
+    """
+
+    def __init__(self, weeks=DEFAULT_WEEKS, decay=DEFAULT_DECAY, now=None):
+        self.weeks = weeks
+        self.decay = decay
+        self.now = now or timezone.now()
+        # Só semanas completas: a atual ainda não tem todas as horas
+        self.end = week_start(self.now)
+        self.start = self.end - timedelta(weeks=weeks)
+        self.weights = [decay**k for k in range(weeks)]
+        self.hour = timedelta(seconds=HOUR_SECONDS)
+
+    def run(self):
+        """
+        Retorna {"profiles": perfis gravados, "rows": rollups lidos,
+        "deleted": perfis antigos removidos}
+        """
+        capacities = {
+            (row["lot_id"], row["slot_type_id"]): row["capacity"]
+            for row in Slots.objects.filter(active=True)
+            .values("lot_id", "slot_type_id")
+            .annotate(capacity=Count("id"))
+        }
+        rows = (
+            OccupancyRollups.objects.filter(
+                resolution=HOUR_SECONDS,
+                bucket_start__gte=self.start,
+                bucket_start__lt=self.end,
+            )
+            .order_by("lot_id", "slot_type_id")
+            .values_list("lot_id", "slot_type_id", "bucket_start", "occupied_seconds")
+        )
+
+        stats = {"profiles": 0, "rows": 0}
+        pending = []
+        group, sums, oldest = None, None, 0
+        for lot_id, slot_type_id, start, occupied_seconds in rows.iterator(
+            chunk_size=10000
+        ):
+            if (lot_id, slot_type_id) != group:
+                if group is not None:
+                    pending.append(self.profile(group, sums, oldest, capacities))
+                group = (lot_id, slot_type_id)
+                sums = [0.0] * HOURS_PER_WEEK
+                oldest = 0
+
+            weeks_ago = (self.end - self.hour - start) // timedelta(weeks=1)
+            oldest = max(oldest, weeks_ago)
+            sums[hour_of_week(start)] += (
+                self.weights[weeks_ago] * occupied_seconds / HOUR_SECONDS
+            )
+            stats["rows"] += 1
+
+            if len(pending) >= WRITE_BATCH_SIZE:
+                stats["profiles"] += self.save(pending)
+                pending = []
+
+        if group is not None:
+            pending.append(self.profile(group, sums, oldest, capacities))
+        stats["profiles"] += self.save(pending)
+
+        # Grupos sem rollups na janela não têm mais previsão
+        stats["deleted"], _ = OccupancyProfiles.objects.filter(
+            built_at__lt=self.now
+        ).delete()
+        return stats
+
+    def profile(self, group, sums, oldest, capacities):
+        """Perfil do grupo: média ponderada de vagas ocupadas por hora da semana"""
+        # Semanas anteriores ao primeiro rollup do grupo não contam
+        total_weight = sum(self.weights[: oldest + 1])
+        return OccupancyProfiles(
+            lot_id=group[0],
+            slot_type_id=group[1],
+            capacity=capacities.get(group, 0),
+            weeks=oldest + 1,
+            profile=[round(value / total_weight, 3) for value in sums],
+            built_at=self.now,
+        )
+
+    def save(self, profiles):
+        if not profiles:
+            return 0
+        with transaction.atomic():
+            OccupancyProfiles.objects.bulk_create(
+                profiles,
+                update_conflicts=True,
+                unique_fields=["lot", "slot_type"],
+                update_fields=["capacity", "weeks", "profile", "built_at"],
+            )
+        return len(profiles)
+
+
+def forecast(profile, moment):
+    """Previsão do perfil para o instante: (vagas ocupadas, taxa de ocupação)"""
+    expected = profile.profile[hour_of_week(moment)]
+    if not profile.capacity:
+        return expected, None
+    return expected, min(expected / profile.capacity, 1.0)
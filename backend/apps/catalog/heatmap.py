@@ -0,0 +1,141 @@
+"""
+Mapa de calor das vagas de um lote (utilização e rotatividade por vaga).
+
+Duas consultas, qualquer que seja o número de vagas:
+- o histórico do intervalo agrupado por vaga, com o tempo ocupado de cada
+  registro até o registro seguinte e o status do registro anterior
+  (subconsultas no índice (slot_id, recorded_at)). Só conta como chegada
+  um OCCUPIED cujo registro anterior não era OCCUPIED;
+- as vagas do lote, com o status em vigor no início do intervalo.
+
+O resultado é guardado no cache por (lote, intervalo).
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+
+from .models import Slots, SlotStatusHistory
+
+OCCUPIED_STATUS = "OCCUPIED"
+
+CACHE_PREFIX = "slot-heatmap"
+# Intervalos que terminam no passado não mudam mais
+CACHE_TIMEOUT = 300
+CLOSED_RANGE_CACHE_TIMEOUT = 24 * 3600
+
+
+def history_by_slot(lot, start, end):
+    """{slot_id: (segundos ocupado, chegadas, registros, primeiro registro)}"""
+    history = SlotStatusHistory.objects.filter(lot=lot)
+    previous_status = Subquery(
+        SlotStatusHistory.objects.filter(slot_id=OuterRef("slot_id"))
+        .filter(
+            Q(recorded_at__lt=OuterRef("recorded_at"))
+            | Q(recorded_at=OuterRef("recorded_at"), id__lt=OuterRef("id"))
+        )
+        .order_by("-recorded_at", "-id")
+        .values("status")[:1]
+    )
+    next_recorded_at = Subquery(
+        SlotStatusHistory.objects.filter(slot_id=OuterRef("slot_id"))
+        .filter(
+            Q(recorded_at__gt=OuterRef("recorded_at"))
+            | Q(recorded_at=OuterRef("recorded_at"), id__gt=OuterRef("id"))
+        )
+        .order_by("recorded_at", "id")
+        .values("recorded_at")[:1]
+    )
+    duration = ExpressionWrapper(
+        Least(Coalesce(next_recorded_at, Value(end)), Value(end)) - F("recorded_at"),
+        output_field=DurationField(),
+    )
+    occupied = Q(status=OCCUPIED_STATUS)
+    arrival = occupied & ~Q(previous_status=OCCUPIED_STATUS)
+    rows = (
+        history.filter(recorded_at__gte=start, recorded_at__lt=end)
+        .alias(previous_status=Coalesce(previous_status, Value("")))
+        .values("slot_id")
+        .annotate(
+            occupied=Sum(duration, filter=occupied),
+            arrivals=Count("id", filter=arrival),
+            transitions=Count("id"),
+            first_at=Min("recorded_at"),
+        )
+    )
+    return {
+        row["slot_id"]: (
+            row["occupied"].total_seconds() if row["occupied"] else 0.0,
+            row["arrivals"],
+            row["transitions"],
+            row["first_at"],
+        )
+        for row in rows
+    }
+
+
+def slot_heatmap(lot, start, end):
+    """Utilização (fração do tempo ocupada) e rotatividade de cada vaga"""
+    status_at_start = Subquery(
+        SlotStatusHistory.objects.filter(slot_id=OuterRef("pk"), recorded_at__lt=start)
+        .order_by("-recorded_at", "-id")
+        .values("status")[:1]
+    )
+    slots = (
+        Slots.objects.filter(lot=lot)
+        .annotate(status_at_start=status_at_start)
+        .order_by("slot_code", "id")
+        .values("id", "slot_code", "polygon_json", "active", "status_at_start")
+    )
+    history = history_by_slot(lot, start, end)
+    total = (end - start).total_seconds()
+
+    results = []
+    for slot in slots:
+        occupied, arrivals, transitions, first_at = history.get(
+            slot["id"], (0.0, 0, 0, end)
+        )
+        # Tempo ocupado antes do primeiro registro do intervalo
+        if slot["status_at_start"] == OCCUPIED_STATUS:
+            occupied += (first_at - start).total_seconds()
+        results.append(
+            {
+                "slot_id": slot["id"],
+                "slot_code": slot["slot_code"],
+                "polygon_json": slot["polygon_json"],
+                "active": slot["active"],
+                "utilization": round(occupied / total, 4),
+                "turnover": arrivals,
+                "transitions": transitions,
+            }
+        )
+    return results
+
+
+def cached_slot_heatmap(lot, start, end):
+    """slot_heatmap com cache por (lote, intervalo)"""
+    key = f"{CACHE_PREFIX}:{lot.id}:{start.timestamp()}:{end.timestamp()}"
+    results = cache.get(key)
+    if results is None:
+        results = slot_heatmap(lot, start, end)
+        closed = end <= timezone.now() - timedelta(minutes=5)
+        cache.set(
+            key,
+            results,
+            CLOSED_RANGE_CACHE_TIMEOUT if closed else CACHE_TIMEOUT,
+        )
+    return results
@@ -0,0 +1,196 @@
+"""
+Série reduzida (por intervalo) do histórico de status de uma vaga.
+
+O banco agrupa o histórico por (intervalo, status) com DATE_TRUNC e devolve,
+para cada grupo, a quantidade de registros e o tempo em que a vaga ficou no
+status. O tempo de cada registro vai até o registro seguinte, obtido com uma
+subconsulta no índice (slot_id, recorded_at). Só o último registro de cada
+intervalo pode ultrapassar o fim dele; esse excesso, e o tempo sem registros
+no início de cada intervalo, são acertados aqui a partir do status anterior.
+
+A resposta tem um item por intervalo, independente do número de registros.
+Intervalos cujo histórico bruto já foi reduzido pela política de retenção
+usam os resumos (SlotStatusHistorySummaries), por amostragem.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import (
+    Count,
+    DateTimeField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Least, Trunc
+
+from apps.core.partitioning import local_timezone
+from apps.core.retention import bucket_start
+
+from .models import SlotStatusHistory, SlotStatusHistorySummaries
+from .rollups import RESOLUTIONS
+
+OCCUPIED_STATUS = "OCCUPIED"
+
+
+def status_before(slot_id, moment):
+    """Status da vaga imediatamente antes de `moment` (ou None)"""
+    return (
+        SlotStatusHistory.objects.filter(slot_id=slot_id, recorded_at__lt=moment)
+        .order_by("-recorded_at", "-id")
+        .values_list("status", flat=True)
+        .first()
+    )
+
+
+def grouped_history(slot_id, resolution, start, end):
+    """
+    {início do intervalo: {status: (registros, segundos, primeiro, último)}}
+
+    Os segundos de cada registro vão até o registro seguinte (ou `end`), sem
+    cortar no fim do intervalo.
+    """
+    history = SlotStatusHistory.objects.filter(slot_id=slot_id)
+    next_recorded_at = Subquery(
+        history.filter(
+            Q(recorded_at__gt=OuterRef("recorded_at"))
+            | Q(recorded_at=OuterRef("recorded_at"), id__gt=OuterRef("id"))
+        )
+        .order_by("recorded_at", "id")
+        .values("recorded_at")[:1]
+    )
+    duration = ExpressionWrapper(
+        Least(Coalesce(next_recorded_at, Value(end)), Value(end)) - F("recorded_at"),
+        output_field=DurationField(),
+    )
+    rows = (
+        history.filter(recorded_at__gte=start, recorded_at__lt=end)
+        .annotate(
+            bucket=Trunc(
+                "recorded_at",
+                resolution,
+                output_field=DateTimeField(),
+                tzinfo=local_timezone(),
+            )
+        )
+        .values("bucket", "status")
+        .annotate(
+            transitions=Count("id"),
+            duration=Sum(duration),
+            first_at=Min("recorded_at"),
+            last_at=Max("recorded_at"),
+        )
+    )
+
+    buckets = defaultdict(dict)
+    for row in rows:
+        buckets[row["bucket"]][row["status"]] = (
+            row["transitions"],
+            row["duration"].total_seconds(),
+            row["first_at"],
+            row["last_at"],
+        )
+    return buckets
+
+
+def grouped_summaries(slot_id, interval, start, end):
+    """Resumos da retenção que cabem nos intervalos, agrupados por intervalo"""
+    buckets = defaultdict(list)
+    summaries = SlotStatusHistorySummaries.objects.filter(
+        slot_id=slot_id,
+        interval_seconds__lte=interval,
+        bucket_start__gte=start,
+        bucket_start__lt=end,
+    ).order_by("bucket_start")
+    for summary in summaries:
+        buckets[bucket_start(summary.bucket_start, interval)].append(summary)
+    return buckets
+
+
+def slot_history_series(slot_id, resolution, start, end):
+    """
+    Série da vaga entre `start` e `end`, um item por intervalo
+
+    Cada item tem o status predominante (maior tempo), a fração do tempo
+    ocupada e a quantidade de registros (mudanças) no intervalo.
+    """
+    interval = RESOLUTIONS[resolution]
+    step = timedelta(seconds=interval)
+    history = grouped_history(slot_id, resolution, start, end)
+    summaries = grouped_summaries(slot_id, interval, start, end)
+    current = status_before(slot_id, start)
+
+    # Primeiro registro de cada intervalo com histórico, em ordem
+    firsts = sorted(
+        (key, min(group[2] for group in groups.values()))
+        for key, groups in history.items()
+    )
+    following = {
+        key: firsts[index + 1][1] if index + 1 < len(firsts) else end
+        for index, (key, _) in enumerate(firsts)
+    }
+
+    moment = bucket_start(start, interval)
+    while moment < end:
+        bucket_end = moment + step
+        begin, finish = max(moment, start), min(bucket_end, end)
+        groups = history.get(moment)
+        times = defaultdict(float)
+
+        if groups:
+            first_at = min(group[2] for group in groups.values())
+            if current is not None:
+                times[current] += (first_at - begin).total_seconds()
+            for status, (_, seconds, _, _) in groups.items():
+                times[status] += seconds
+            current = max(groups, key=lambda status: groups[status][3])
+            # O último registro segue até o próximo; o excesso fica para os
+            # intervalos seguintes
+            times[current] -= max((following[moment] - finish).total_seconds(), 0)
+            transitions = sum(group[0] for group in groups.values())
+            yield build_item(moment, times, begin, finish, transitions)
+        elif moment in summaries:
+            yield summary_item(moment, summaries[moment])
+            current = summaries[moment][-1].last_status
+        else:
+            if current is not None:
+                times[current] = (finish - begin).total_seconds()
+            yield build_item(moment, times, begin, finish, 0)
+
+        moment = bucket_end
+
+
+def build_item(moment, times, begin, finish, transitions):
+    known = sum(times.values())
+    return {
+        "bucket_start": moment,
+        "dominant_status": max(times, key=times.get) if known else None,
+        "occupied_fraction": (
+            times.get(OCCUPIED_STATUS, 0) / (finish - begin).total_seconds()
+            if known
+            else None
+        ),
+        "transitions": transitions,
+    }
+
+
+def summary_item(moment, summaries):
+    changes = sum(summary.change_count for summary in summaries)
+    occupied = sum(summary.occupied_count for summary in summaries)
+    counts = defaultdict(int)
+    for summary in summaries:
+        counts[summary.last_status] += 1
+    return {
+        "bucket_start": moment,
+        "dominant_status": max(counts, key=counts.get),
+        "occupied_fraction": occupied / changes if changes else None,
+        "transitions": changes,
+    }
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.forecast import (
+    DEFAULT_DECAY,
+    DEFAULT_WEEKS,
+    OccupancyProfileBuilder,
+)
+
+
+class Command(BaseCommand):
+    """
+    Comando para recalcular os perfis de ocupação por hora da semana
+
+    Deve rodar uma vez por noite, depois dos rollups de ocupação.
+
+    Usage: python manage.py build_occupancy_profiles --weeks 8 --decay 0.7
+    """
+
+    help = "Recalcula os perfis de previsão de ocupação por lote e tipo de vaga"
+
+    def add_arguments(self, parser):
+        """Adicionar argumentos do comando"""
+        parser.add_argument(
+            "--weeks",
+            type=int,
+            default=DEFAULT_WEEKS,
+            help="Semanas completas usadas no perfil",
+        )
+        parser.add_argument(
+            "--decay",
+            type=float,
+            default=DEFAULT_DECAY,
+            help="Peso de cada semana em relação à seguinte (0 a 1)",
+        )
+
+    def handle(self, *args, **options):
+        """Executar o comando"""
+        if options["weeks"] < 1:
+            raise CommandError("--weeks deve ser maior que zero")
+        if not 0 < options["decay"] <= 1:
+            raise CommandError("--decay deve estar entre 0 (exclusivo) e 1")
+
+        builder = OccupancyProfileBuilder(
+            weeks=options["weeks"], decay=options["decay"]
+        )
+        stats = builder.run()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ {stats['profiles']} perfis gravados a partir de "
+                f"{stats['rows']} rollups ({stats['deleted']} removidos)"
+            )
+        )
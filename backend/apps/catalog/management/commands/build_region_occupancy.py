@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.regions import rebuild_region_occupancy
+
+
+class Command(BaseCommand):
+    """
+    Comando para recalcular a ocupação agregada por estado e cidade
+
+    Entre execuções, as mudanças de status ajustam as vagas livres; o
+    recálculo inclui vagas e estabelecimentos novos e corrige diferenças.
+
+    Usage: python manage.py build_region_occupancy
+    """
+
+    help = "Recalcula vagas livres e totais por estado e cidade"
+
+    def handle(self, *args, **options):
+        """Executar o comando"""
+        stats = rebuild_region_occupancy()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ {stats['regions']} cidades recalculadas "
+                f"({stats['deleted']} removidas)"
+            )
+        )
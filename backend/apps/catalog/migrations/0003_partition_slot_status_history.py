@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from apps.core.partitioning import PARTITIONED_TABLES, partition_table
+
+
+def partition_forward(apps, schema_editor):
+    """Particiona slot_status_history por mês (só no PostgreSQL)"""
+    table = "slot_status_history"
+    partition_table(schema_editor.connection, table, PARTITIONED_TABLES[table])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0002_initial"),
+    ]
+
+    operations = [
+        # A tabela particionada tem as mesmas colunas da original, então as
+        # migrations anteriores continuam válidas sobre ela: desfazer esta
+        # migration não converte a tabela de volta
+        migrations.RunPython(
+            partition_forward, migrations.RunPython.noop, elidable=False
+        ),
+    ]
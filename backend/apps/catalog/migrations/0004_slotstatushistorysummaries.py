@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0003_partition_slot_status_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlotStatusHistorySummaries",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("interval_seconds", models.PositiveIntegerField()),
+                ("bucket_start", models.DateTimeField()),
+                ("change_count", models.PositiveIntegerField(default=0)),
+                ("occupied_count", models.PositiveIntegerField(default=0)),
+                (
+                    "confidence_sum",
+                    models.DecimalField(decimal_places=3, default=0, max_digits=12),
+                ),
+                ("confidence_samples", models.PositiveIntegerField(default=0)),
+                ("last_status", models.CharField(max_length=16)),
+                ("last_recorded_at", models.DateTimeField()),
+                (
+                    "slot",
+                    models.ForeignKey(
+                        db_column="slot_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="status_history_summaries",
+                        to="catalog.slots",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "slot_status_history_summaries",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("slot", "interval_seconds", "bucket_start"),
+                        name="uq_slot_hist_summaries_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0004_slotstatushistorysummaries"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccupancyRollups",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "resolution",
+                    models.PositiveIntegerField(
+                        choices=[(60, "Minuto"), (3600, "Hora"), (86400, "Dia")]
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                ("occupied_seconds", models.FloatField(default=0)),
+                ("peak_occupied", models.PositiveIntegerField(default=0)),
+                ("change_count", models.PositiveIntegerField(default=0)),
+                (
+                    "confidence_sum",
+                    models.DecimalField(decimal_places=3, default=0, max_digits=14),
+                ),
+                ("confidence_samples", models.PositiveIntegerField(default=0)),
+                (
+                    "establishment",
+                    models.ForeignKey(
+                        db_column="establishment_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="occupancy_rollups",
+                        to="catalog.establishments",
+                    ),
+                ),
+                (
+                    "lot",
+                    models.ForeignKey(
+                        db_column="lot_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="occupancy_rollups",
+                        to="catalog.lots",
+                    ),
+                ),
+                (
+                    "slot_type",
+                    models.ForeignKey(
+                        db_column="slot_type_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="occupancy_rollups",
+                        to="catalog.slottypes",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "occupancy_rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["lot", "resolution", "bucket_start"],
+                        name="ix_occ_rollups_lot_res_bucket",
+                    ),
+                    models.Index(
+                        fields=["establishment", "resolution", "bucket_start"],
+                        name="ix_occ_rollups_est_res_bucket",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("lot", "slot_type", "resolution", "bucket_start"),
+                        name="uq_occupancy_rollups_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
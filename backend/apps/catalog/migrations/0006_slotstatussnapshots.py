@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0005_occupancyrollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlotStatusSnapshots",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("taken_at", models.DateTimeField()),
+                ("statuses", models.JSONField(default=dict)),
+                (
+                    "lot",
+                    models.ForeignKey(
+                        db_column="lot_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_snapshots",
+                        to="catalog.lots",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "slot_status_snapshots",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("lot", "taken_at"),
+                        name="uq_slot_status_snapshots_lot_at",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_lot(apps, schema_editor):
+    """Preenche o lote do histórico existente a partir da vaga"""
+    SlotStatusHistory = apps.get_model("catalog", "SlotStatusHistory")
+    Slots = apps.get_model("catalog", "Slots")
+    SlotStatusHistory.objects.filter(lot__isnull=True).update(
+        lot=Subquery(Slots.objects.filter(pk=OuterRef("slot_id")).values("lot_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0006_slotstatussnapshots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="slotstatushistory",
+            name="lot",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="lot_id",
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="status_history",
+                to="catalog.lots",
+            ),
+        ),
+        migrations.RunPython(fill_lot, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="slotstatushistory",
+            index=models.Index(
+                fields=["lot", "recorded_at", "id"], name="ix_slot_hist_lot_rec_at"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0007_slotstatushistory_lot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccupancyProfiles",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("capacity", models.PositiveIntegerField(default=0)),
+                ("weeks", models.PositiveSmallIntegerField(default=0)),
+                ("profile", models.JSONField(default=list)),
+                ("built_at", models.DateTimeField()),
+                (
+                    "lot",
+                    models.ForeignKey(
+                        db_column="lot_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy_profiles",
+                        to="catalog.lots",
+                    ),
+                ),
+                (
+                    "slot_type",
+                    models.ForeignKey(
+                        db_column="slot_type_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="occupancy_profiles",
+                        to="catalog.slottypes",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "occupancy_profiles",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("lot", "slot_type"),
+                        name="uq_occupancy_profiles_lot_type",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0008_occupancyprofiles"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegionOccupancy",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("state", models.CharField(max_length=50)),
+                ("city", models.CharField(blank=True, default="", max_length=100)),
+                ("establishments", models.PositiveIntegerField(default=0)),
+                ("total_slots", models.PositiveIntegerField(default=0)),
+                ("free_slots", models.IntegerField(default=0)),
+                ("lat", models.FloatField(blank=True, null=True)),
+                ("lng", models.FloatField(blank=True, null=True)),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "region_occupancy",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("state", "city"), name="uq_region_occupancy_state_city"
+                    )
+                ],
+            },
+        ),
+    ]
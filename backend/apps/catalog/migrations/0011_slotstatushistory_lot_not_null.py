@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_lot(apps, schema_editor):
+    """Preenche o lote de linhas gravadas sem ele (ex.: via bulk_create)"""
+    SlotStatusHistory = apps.get_model("catalog", "SlotStatusHistory")
+    Slots = apps.get_model("catalog", "Slots")
+    SlotStatusHistory.objects.filter(lot__isnull=True).update(
+        lot=Subquery(Slots.objects.filter(pk=OuterRef("slot_id")).values("lot_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_slot_status_history_global_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_lot, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="slotstatushistory",
+            name="lot",
+            field=models.ForeignKey(
+                db_column="lot_id",
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="status_history",
+                to="catalog.lots",
+            ),
+        ),
+    ]
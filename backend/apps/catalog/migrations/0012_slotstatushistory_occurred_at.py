@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_slotstatushistory_lot_not_null"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="slotstatushistory",
+            name="occurred_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="slotstatushistory",
+            index=models.Index(
+                fields=["slot", "occurred_at"], name="ix_slot_hist_slot_occ_at"
+            ),
+        ),
+    ]
@@ -168,6 +168,30 @@ class SlotStatus(models.Model):
         return f"{self.slot.slot_code} - {self.get_status_display()}"
 
 
+class SlotStatusHistoryQuerySet(models.QuerySet):
+    """
+    QuerySet do histórico: bulk_create também copia o lote da vaga
+    """
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        lots = dict(
+            Slots.objects.with_deleted()
+            .filter(id__in={obj.slot_id for obj in objs})
+            .values_list("id", "lot_id")
+        )
+        for obj in objs:
+            obj.lot_id = lots.get(obj.slot_id)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class SlotStatusHistoryManager(
+    SoftDeleteManager.from_queryset(SlotStatusHistoryQuerySet)
+):
+    """
+    Manager do histórico (soft delete + bulk_create com o lote preenchido)
+    """
+
+
 class SlotStatusHistory(BaseModel):
     slot = models.ForeignKey(
         "Slots",
@@ -175,6 +199,15 @@ class SlotStatusHistory(BaseModel):
         db_column="slot_id",
         related_name="status_history",
     )
+    # Cópia de slot.lot, para o feed do lote seguir o índice (lot, recorded_at).
+    # Sempre copiada da vaga ao inserir, em save() e em bulk_create().
+    lot = models.ForeignKey(
+        "Lots",
+        on_delete=models.PROTECT,
+        db_column="lot_id",
+        db_index=False,
+        related_name="status_history",
+    )
     status = models.CharField(max_length=16)
     vehicle_type = models.ForeignKey(
         "VehicleTypes",
@@ -188,9 +221,13 @@ class SlotStatusHistory(BaseModel):
         max_digits=4, decimal_places=3, null=True, blank=True
     )
     event_id = models.UUIDField(null=True, blank=True)
+    # Hora da detecção informada pela câmera (eventos reenviados chegam
+    # atrasados). recorded_at continua sendo a hora de gravação no servidor,
+    # em ordem de inserção, que é o que rollups, snapshots e cursores leem.
+    occurred_at = models.DateTimeField(null=True, blank=True)
     recorded_at = models.DateTimeField(auto_now_add=True)
 
-    objects = SoftDeleteManager()
+    objects = SlotStatusHistoryManager()
 
     class Meta:
         db_table = "slot_status_history"
@@ -198,7 +235,228 @@ class SlotStatusHistory(BaseModel):
             models.Index(
                 fields=["slot", "recorded_at"], name="ix_slot_hist_slot_rec_at"
             ),
+            models.Index(
+                fields=["lot", "recorded_at", "id"], name="ix_slot_hist_lot_rec_at"
+            ),
+            models.Index(
+                fields=["slot", "occurred_at"], name="ix_slot_hist_slot_occ_at"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.slot_id is not None:
+            self.lot_id = self.slot.lot_id
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.slot.slot_code} - {self.status} ({self.recorded_at})"
+
+
+class SlotStatusHistorySummaries(models.Model):
+    """Resumo do histórico de status por intervalo, gerado pela política de retenção"""
+    id = models.BigAutoField(primary_key=True)
+    slot = models.ForeignKey(
+        "Slots",
+        on_delete=models.PROTECT,
+        db_column="slot_id",
+        related_name="status_history_summaries",
+    )
+    interval_seconds = models.PositiveIntegerField()
+    bucket_start = models.DateTimeField()
+    change_count = models.PositiveIntegerField(default=0)
+    occupied_count = models.PositiveIntegerField(default=0)
+    confidence_sum = models.DecimalField(max_digits=12, decimal_places=3, default=0)
+    confidence_samples = models.PositiveIntegerField(default=0)
+    last_status = models.CharField(max_length=16)
+    last_recorded_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "slot_status_history_summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["slot", "interval_seconds", "bucket_start"],
+                name="uq_slot_hist_summaries_bucket",
+            ),
+        ]
+
+    @property
+    def avg_confidence(self):
+        if not self.confidence_samples:
+            return None
+        return self.confidence_sum / self.confidence_samples
+
+    def __str__(self):
+        return f"{self.slot.slot_code} - {self.bucket_start} ({self.change_count})"
+
+
+class OccupancyRollups(models.Model):
+    """
+    Ocupação agregada por lote e tipo de vaga, por minuto, hora ou dia.
+
+    Mantida incrementalmente a partir do histórico de status (ver
+    apps.catalog.rollups). Intervalos alinhados ao TIME_ZONE do projeto.
+    """
+    RESOLUTION_CHOICES = [
+        (60, "Minuto"),
+        (3600, "Hora"),
+        (86400, "Dia"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    resolution = models.PositiveIntegerField(choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+    establishment = models.ForeignKey(
+        "Establishments",
+        on_delete=models.PROTECT,
+        db_column="establishment_id",
+        related_name="occupancy_rollups",
+    )
+    lot = models.ForeignKey(
+        "Lots",
+        on_delete=models.PROTECT,
+        db_column="lot_id",
+        related_name="occupancy_rollups",
+    )
+    slot_type = models.ForeignKey(
+        "SlotTypes",
+        on_delete=models.PROTECT,
+        db_column="slot_type_id",
+        related_name="occupancy_rollups",
+    )
+    # Soma, no intervalo, do tempo de cada vaga ocupada (vagas x segundos)
+    occupied_seconds = models.FloatField(default=0)
+    peak_occupied = models.PositiveIntegerField(default=0)
+    change_count = models.PositiveIntegerField(default=0)
+    confidence_sum = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    confidence_samples = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "occupancy_rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lot", "slot_type", "resolution", "bucket_start"],
+                name="uq_occupancy_rollups_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["lot", "resolution", "bucket_start"],
+                name="ix_occ_rollups_lot_res_bucket",
+            ),
+            models.Index(
+                fields=["establishment", "resolution", "bucket_start"],
+                name="ix_occ_rollups_est_res_bucket",
+            ),
+        ]
+
+    @property
+    def avg_occupied(self):
+        """Média de vagas ocupadas no intervalo"""
+        return self.occupied_seconds / self.resolution
+
+    @property
+    def avg_confidence(self):
+        if not self.confidence_samples:
+            return None
+        return self.confidence_sum / self.confidence_samples
+
+    def __str__(self):
+        return f"{self.lot.lot_code} - {self.bucket_start} ({self.get_resolution_display()})"
+
+
+class SlotStatusSnapshots(models.Model):
+    """
+    Foto periódica do status de todas as vagas de um lote.
+
+    Consultas "as of" partem da foto mais recente anterior ao instante pedido
+    e só leem o histórico posterior a ela (ver apps.catalog.point_in_time).
+    `statuses` mapeia o ID da vaga para [status, vehicle_type_id, recorded_at].
+    """
+    id = models.BigAutoField(primary_key=True)
+    lot = models.ForeignKey(
+        "Lots",
+        on_delete=models.CASCADE,
+        db_column="lot_id",
+        related_name="status_snapshots",
+    )
+    taken_at = models.DateTimeField()
+    statuses = models.JSONField(default=dict)
+
+    class Meta:
+        db_table = "slot_status_snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lot", "taken_at"], name="uq_slot_status_snapshots_lot_at"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.lot.lot_code} - {self.taken_at}"
+
+
+class OccupancyProfiles(models.Model):
+    """
+    Perfil de ocupação por hora da semana de um lote e tipo de vaga.
+
+    Recalculado toda noite a partir dos rollups por hora (ver
+    apps.catalog.forecast). `profile` tem 168 valores (segunda 00h a domingo
+    23h, horário local) com a média ponderada de vagas ocupadas na hora.
+    """
+    id = models.BigAutoField(primary_key=True)
+    lot = models.ForeignKey(
+        "Lots",
+        on_delete=models.CASCADE,
+        db_column="lot_id",
+        related_name="occupancy_profiles",
+    )
+    slot_type = models.ForeignKey(
+        "SlotTypes",
+        on_delete=models.PROTECT,
+        db_column="slot_type_id",
+        related_name="occupancy_profiles",
+    )
+    capacity = models.PositiveIntegerField(default=0)
+    weeks = models.PositiveSmallIntegerField(default=0)
+    profile = models.JSONField(default=list)
+    built_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "occupancy_profiles"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lot", "slot_type"], name="uq_occupancy_profiles_lot_type"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.lot.lot_code} - {self.slot_type.name}"
+
+
+class RegionOccupancy(models.Model):
+    """
+    Vagas livres e totais de cada cidade (estabelecimentos de clientes ativos).
+
+    Recalculada periodicamente a partir de slot_status e ajustada a cada
+    mudança de status recebida pela ingestão (ver apps.catalog.regions), para
+    que o mapa nunca precise somar as vagas de uma região.
+    """
+    id = models.BigAutoField(primary_key=True)
+    state = models.CharField(max_length=50)
+    city = models.CharField(max_length=100, blank=True, default="")
+    establishments = models.PositiveIntegerField(default=0)
+    total_slots = models.PositiveIntegerField(default=0)
+    free_slots = models.IntegerField(default=0)
+    lat = models.FloatField(null=True, blank=True)
+    lng = models.FloatField(null=True, blank=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "region_occupancy"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["state", "city"], name="uq_region_occupancy_state_city"
+            ),
         ]
 
     def __str__(self):
-        return f"{self.slot.slot_code} - {self.status} ({self.recorded_at})"
\ No newline at end of file
+        return f"{self.city or '-'}/{self.state}"
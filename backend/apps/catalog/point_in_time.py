@@ -0,0 +1,141 @@
+"""
+Status das vagas em um instante passado ("as of").
+
+Para cada vaga, o último registro do histórico até o instante é obtido com
+uma subconsulta correlacionada (equivalente a um LATERAL ... LIMIT 1), que
+no PostgreSQL vira uma leitura reversa curta no índice (slot_id, recorded_at).
+
+Quando existe uma foto do lote anterior ao instante, a subconsulta fica
+limitada ao intervalo (foto, instante]: só as partições mensais desse
+intervalo são lidas e as vagas sem mudanças desde a foto usam o status dela.
+"""
+
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import Lots, Slots, SlotStatusHistory, SlotStatusSnapshots
+
+# Fotos mais recentes que isso podem perder inserções de transações abertas
+DEFAULT_SNAPSHOT_LAG_SECONDS = 60
+
+
+def slots_at(lot, moment):
+    """Vagas do lote existentes no instante (inclui as removidas depois)"""
+    return (
+        Slots.objects.with_deleted()
+        .filter(lot=lot, created_at__lte=moment)
+        .filter(Q(deleted_at__isnull=True) | Q(deleted_at__gt=moment))
+    )
+
+
+def latest_snapshot(lot, moment):
+    """Foto mais recente do lote tirada até o instante"""
+    return (
+        SlotStatusSnapshots.objects.filter(lot=lot, taken_at__lte=moment)
+        .order_by("-taken_at")
+        .first()
+    )
+
+
+def lot_status_as_of(lot, moment):
+    """
+    Status de cada vaga do lote em `moment`
+
+    Retorna (foto usada ou None, lista de vagas). Vagas sem nenhuma informação
+    até o instante têm status None.
+    """
+    snapshot = latest_snapshot(lot, moment)
+
+    history = SlotStatusHistory.objects.filter(recorded_at__lte=moment)
+    if snapshot is not None:
+        history = history.filter(recorded_at__gt=snapshot.taken_at)
+    latest = (
+        history.filter(slot=OuterRef("pk"))
+        .order_by("-recorded_at", "-id")
+        .values("id")[:1]
+    )
+    slots = list(
+        slots_at(lot, moment)
+        .annotate(history_id=Subquery(latest))
+        .order_by("slot_code", "id")
+        .values("id", "slot_code", "slot_type_id", "history_id")
+    )
+
+    ids = [slot["history_id"] for slot in slots if slot["history_id"]]
+    rows = {
+        row["id"]: row
+        for row in history.filter(id__in=ids).values(
+            "id", "status", "vehicle_type_id", "recorded_at"
+        )
+    }
+    known = snapshot.statuses if snapshot is not None else {}
+
+    results = []
+    for slot in slots:
+        row = rows.get(slot["history_id"])
+        if row is not None:
+            state = (row["status"], row["vehicle_type_id"], row["recorded_at"])
+        elif str(slot["id"]) in known:
+            status, vehicle_type_id, since = known[str(slot["id"])]
+            state = (status, vehicle_type_id, datetime.fromisoformat(since))
+        else:
+            state = (None, None, None)
+
+        results.append(
+            {
+                "slot_id": slot["id"],
+                "slot_code": slot["slot_code"],
+                "slot_type_id": slot["slot_type_id"],
+                "lot_id": lot.id,
+                "status": state[0],
+                "vehicle_type_id": state[1],
+                "since": state[2],
+            }
+        )
+    return snapshot, results
+
+
+def take_snapshot(lot, moment):
+    """Grava a foto do lote em `moment` (a partir da foto anterior)"""
+    _, results = lot_status_as_of(lot, moment)
+    return SlotStatusSnapshots.objects.create(
+        lot=lot,
+        taken_at=moment,
+        statuses={
+            str(row["slot_id"]): [
+                row["status"],
+                row["vehicle_type_id"],
+                row["since"].isoformat(),
+            ]
+            for row in results
+            if row["status"] is not None
+        },
+    )
+
+
+def take_snapshots(lots=None, moment=None, keep_days=None):
+    """
+    Tira uma foto de cada lote e apaga as fotos mais antigas que `keep_days`
+
+    Retorna {"created": fotos criadas, "deleted": fotos apagadas}.
+    """
+    moment = moment or timezone.now() - timedelta(seconds=DEFAULT_SNAPSHOT_LAG_SECONDS)
+    lots = Lots.objects.all() if lots is None else lots
+
+    created = 0
+    for lot in lots.iterator():
+        if SlotStatusSnapshots.objects.filter(lot=lot, taken_at=moment).exists():
+            continue
+        with transaction.atomic():
+            take_snapshot(lot, moment)
+        created += 1
+
+    deleted = 0
+    if keep_days is not None:
+        deleted, _ = SlotStatusSnapshots.objects.filter(
+            lot__in=lots, taken_at__lt=moment - timedelta(days=keep_days)
+        ).delete()
+    return {"created": created, "deleted": deleted}
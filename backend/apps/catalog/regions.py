@@ -0,0 +1,183 @@
+"""
+Ocupação agregada por estado e cidade, para o mapa público.
+
+A tabela region_occupancy tem uma linha por cidade com estabelecimentos de
+clientes ativos. Ela é recalculada periodicamente (duas consultas agregadas,
+uma sobre estabelecimentos e outra sobre vagas) e, entre um recálculo e
+outro, cada mudança de status recebida pela ingestão ajusta `free_slots` da
+cidade com um UPDATE ... SET free_slots = free_slots + delta.
+
+Vagas e estabelecimentos criados ou removidos só aparecem no recálculo
+seguinte, que também corrige qualquer diferença acumulada. As leituras usam
+o cache por alguns segundos: o mapa nunca soma as vagas de uma região.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, F, Q, Sum
+from django.utils import timezone
+
+from .facets import establishment_index
+from .models import Establishments, Lots, RegionOccupancy, Slots
+
+FREE_STATUS = "FREE"
+ACTIVE_CLIENT = "ACTIVE"
+
+CACHE_PREFIX = "region-occupancy"
+CACHE_TIMEOUT = 30
+
+
+def region_key(state, city):
+    """Chave (estado, cidade) de region_occupancy; None sem estado"""
+    if not state:
+        return None
+    return state, city or ""
+
+
+def rebuild_region_occupancy(now=None):
+    """
+    Recalcula todas as cidades a partir de slot_status
+
+    Retorna {"regions": cidades gravadas, "deleted": cidades removidas}.
+    """
+    now = now or timezone.now()
+    establishments = Establishments.objects.filter(
+        client__onboarding_status=ACTIVE_CLIENT
+    )
+
+    regions = {}
+    for row in establishments.values("state", "city").annotate(
+        count=Count("id"), lat=Avg("lat"), lng=Avg("lng")
+    ):
+        key = region_key(row["state"], row["city"])
+        if key is None:
+            continue
+        region = regions.get(key)
+        if region is None:
+            region = regions[key] = RegionOccupancy(
+                state=key[0], city=key[1], lat=row["lat"], lng=row["lng"]
+            )
+        # Cidade nula e vazia caem na mesma linha
+        region.establishments += row["count"]
+        region.refreshed_at = now
+
+    slots = Slots.objects.filter(
+        active=True, lot__establishment__client__onboarding_status=ACTIVE_CLIENT
+    )
+    for row in slots.values(
+        "lot__establishment__state", "lot__establishment__city"
+    ).annotate(
+        total=Count("id"),
+        free=Count("id", filter=Q(current_status__status=FREE_STATUS)),
+    ):
+        key = region_key(
+            row["lot__establishment__state"], row["lot__establishment__city"]
+        )
+        if key in regions:
+            regions[key].total_slots += row["total"]
+            regions[key].free_slots += row["free"]
+
+    with transaction.atomic():
+        if regions:
+            RegionOccupancy.objects.bulk_create(
+                regions.values(),
+                update_conflicts=True,
+                unique_fields=["state", "city"],
+                update_fields=[
+                    "establishments",
+                    "total_slots",
+                    "free_slots",
+                    "lat",
+                    "lng",
+                    "refreshed_at",
+                ],
+            )
+        deleted, _ = RegionOccupancy.objects.filter(refreshed_at__lt=now).delete()
+    return {"regions": len(regions), "deleted": deleted}
+
+
+def record_status_change(slot, previous, current):
+    """
+    Agenda o ajuste de vagas livres da cidade da vaga (e do índice de
+    estabelecimentos deste processo) para depois do commit
+
+    `previous` é o status anterior da vaga (None se ela não tinha status).
+    """
+    delta = (current == FREE_STATUS) - (previous == FREE_STATUS)
+    if not delta or not slot.active:
+        return
+    transaction.on_commit(lambda: apply_free_delta(slot.lot_id, delta))
+
+
+def apply_free_delta(lot_id, delta):
+    establishment_index.record_free_delta(lot_id, delta)
+    region = (
+        Lots.objects.filter(
+            id=lot_id, establishment__client__onboarding_status=ACTIVE_CLIENT
+        )
+        .values_list("establishment__state", "establishment__city")
+        .first()
+    )
+    key = region_key(*region) if region else None
+    if key is None:
+        return
+    RegionOccupancy.objects.filter(state=key[0], city=key[1]).update(
+        free_slots=F("free_slots") + delta
+    )
+
+
+def serialize(row):
+    return {
+        "state": row["state"],
+        **({"city": row["city"]} if "city" in row else {}),
+        "establishments": row["establishments"],
+        "total_slots": row["total_slots"],
+        # Ajustes concorrentes com o recálculo podem sair do intervalo
+        "free_slots": min(max(row["free_slots"], 0), row["total_slots"]),
+        "lat": row["lat"],
+        "lng": row["lng"],
+    }
+
+
+def state_occupancy():
+    """Totais por estado (soma das cidades), com cache"""
+    key = f"{CACHE_PREFIX}:states"
+    results = cache.get(key)
+    if results is None:
+        rows = (
+            RegionOccupancy.objects.values("state")
+            .annotate(
+                establishments=Sum("establishments"),
+                total_slots=Sum("total_slots"),
+                free_slots=Sum("free_slots"),
+                lat=Avg("lat"),
+                lng=Avg("lng"),
+            )
+            .order_by("state")
+        )
+        results = [serialize(row) for row in rows]
+        cache.set(key, results, CACHE_TIMEOUT)
+    return results
+
+
+def city_occupancy(state):
+    """Totais por cidade de um estado, com cache"""
+    key = f"{CACHE_PREFIX}:cities:{state}"
+    results = cache.get(key)
+    if results is None:
+        rows = (
+            RegionOccupancy.objects.filter(state=state)
+            .order_by("city")
+            .values(
+                "state",
+                "city",
+                "establishments",
+                "total_slots",
+                "free_slots",
+                "lat",
+                "lng",
+            )
+        )
+        results = [serialize(row) for row in rows]
+        cache.set(key, results, CACHE_TIMEOUT)
+    return results
@@ -0,0 +1,319 @@
+"""
+Rollups de ocupação por lote e tipo de vaga (minuto, hora e dia).
+
+O histórico de status é varrido em ordem (recorded_at, id) a partir de um
+checkpoint, então cada execução processa apenas as linhas novas. O estado
+necessário para continuar (vagas ocupadas no ponto do checkpoint) fica salvo
+junto com o checkpoint, na mesma transação dos rollups.
+
+Para cada grupo (lote, tipo de vaga) a ocupação é integrada no tempo:
+`occupied_seconds` soma vagas x segundos ocupados em cada intervalo e
+`peak_occupied` guarda o maior número de vagas ocupadas ao mesmo tempo.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from apps.core.models import ProcessingCheckpoints
+from apps.core.retention import bucket_start
+
+from .models import OccupancyRollups, Slots, SlotStatusHistory
+
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+
+OCCUPIED_STATUS = "OCCUPIED"
+CHECKPOINT_NAME = "occupancy_rollups"
+
+DEFAULT_BATCH_SIZE = 5000
+# Linhas mais recentes que isso ficam para a próxima execução, para não
+# perder inserções de transações ainda abertas
+DEFAULT_LAG_SECONDS = 60
+# Quantidade de intervalos acumulados em memória antes de gravar
+FLUSH_THRESHOLD = 20000
+
+
+def next_bucket(start, interval):
+    return start + timedelta(seconds=interval)
+
+
+class _Bucket:
+    __slots__ = (
+        "occupied_seconds",
+        "peak_occupied",
+        "change_count",
+        "confidence_sum",
+        "confidence_samples",
+    )
+
+    def __init__(self):
+        self.occupied_seconds = 0.0
+        self.peak_occupied = 0
+        self.change_count = 0
+        self.confidence_sum = 0
+        self.confidence_samples = 0
+
+
+class OccupancyRollupBuilder:
+    """
+    Atualiza os rollups de ocupação com o histórico ainda não processado
+    """
+
+    def __init__(
+        self,
+        batch_size=DEFAULT_BATCH_SIZE,
+        lag_seconds=DEFAULT_LAG_SECONDS,
+        resolutions=None,
+        now=None,
+    ):
+        self.batch_size = batch_size
+        self.lag = timedelta(seconds=lag_seconds)
+        self.intervals = sorted(
+            RESOLUTIONS[name] for name in (resolutions or RESOLUTIONS)
+        )
+        self.now = now or timezone.now()
+
+    def run(self, until=None):
+        """
+        Processa o histórico até `until` (padrão: agora - lag)
+
+        Retorna {"rows": linhas processadas, "buckets": intervalos gravados}.
+        """
+        until = until or self.now - self.lag
+        checkpoint, _ = ProcessingCheckpoints.objects.get_or_create(
+            name=CHECKPOINT_NAME
+        )
+        history = SlotStatusHistory.objects.all()
+
+        position, last_id = checkpoint.position, checkpoint.last_id
+        if position is None:
+            first = history.order_by("recorded_at", "id").first()
+            if first is None:
+                return {"rows": 0, "buckets": 0}
+            # Antes do primeiro registro nenhuma vaga está ocupada
+            position, last_id = first.recorded_at, 0
+
+        self.stats = {"rows": 0, "buckets": 0}
+        if position >= until:
+            return self.stats
+
+        self.slots = {}
+        self.load_slots()
+        self.occupied = set(checkpoint.state.get("occupied_slots", []))
+        self.counts = Counter(
+            self.group_for(slot_id)
+            for slot_id in self.occupied
+            if self.group_for(slot_id)
+        )
+        self.start = position
+        self.since = {}
+        self.buckets = defaultdict(_Bucket)
+
+        while True:
+            rows = list(
+                history.filter(
+                    Q(recorded_at__gt=position)
+                    | Q(recorded_at=position, id__gt=last_id),
+                    recorded_at__lt=until,
+                )
+                .order_by("recorded_at", "id")
+                .values("id", "slot_id", "status", "confidence", "recorded_at")[
+                    : self.batch_size
+                ]
+            )
+            finished = len(rows) < self.batch_size
+            if finished:
+                position, last_id = until, 0
+            else:
+                position, last_id = rows[-1]["recorded_at"], rows[-1]["id"]
+
+            with transaction.atomic():
+                for row in rows:
+                    self.apply(row)
+                self.integrate_all(position)
+                self.flush()
+                checkpoint.position = position
+                checkpoint.last_id = last_id
+                checkpoint.state = {"occupied_slots": sorted(self.occupied)}
+                checkpoint.save()
+
+            self.stats["rows"] += len(rows)
+            if finished:
+                return self.stats
+
+    def load_slots(self):
+        for slot_id, establishment_id, lot_id, slot_type_id in (
+            Slots.objects.with_deleted()
+            .values_list("id", "lot__establishment_id", "lot_id", "slot_type_id")
+            .iterator()
+        ):
+            self.slots[slot_id] = (establishment_id, lot_id, slot_type_id)
+
+    def group_for(self, slot_id):
+        """(estabelecimento, lote, tipo de vaga) da vaga"""
+        if slot_id not in self.slots:
+            # Vaga criada depois do início da execução
+            self.slots[slot_id] = (
+                Slots.objects.with_deleted()
+                .filter(id=slot_id)
+                .values_list("lot__establishment_id", "lot_id", "slot_type_id")
+                .first()
+            )
+        return self.slots[slot_id]
+
+    def bucket(self, interval, group, start):
+        return self.buckets[(interval, group, start)]
+
+    def apply(self, row):
+        """Aplica uma mudança de status"""
+        group = self.group_for(row["slot_id"])
+        if group is None:
+            return
+        moment = row["recorded_at"]
+        self.integrate(group, moment)
+
+        occupied = row["status"] == OCCUPIED_STATUS
+        if occupied and row["slot_id"] not in self.occupied:
+            self.occupied.add(row["slot_id"])
+            self.counts[group] += 1
+        elif not occupied and row["slot_id"] in self.occupied:
+            self.occupied.discard(row["slot_id"])
+            self.counts[group] -= 1
+
+        for interval in self.intervals:
+            bucket = self.bucket(interval, group, bucket_start(moment, interval))
+            bucket.change_count += 1
+            bucket.peak_occupied = max(bucket.peak_occupied, self.counts[group])
+            if row["confidence"] is not None:
+                bucket.confidence_sum += row["confidence"]
+                bucket.confidence_samples += 1
+
+        if len(self.buckets) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def integrate(self, group, until):
+        """Acumula a ocupação do grupo desde a última mudança até `until`"""
+        since = self.since.get(group, self.start)
+        count = self.counts[group]
+        if count and until > since:
+            for interval in self.intervals:
+                start = bucket_start(since, interval)
+                while start < until:
+                    end = next_bucket(start, interval)
+                    overlap = min(end, until) - max(start, since)
+                    bucket = self.bucket(interval, group, start)
+                    bucket.occupied_seconds += count * overlap.total_seconds()
+                    bucket.peak_occupied = max(bucket.peak_occupied, count)
+                    start = end
+                if len(self.buckets) >= FLUSH_THRESHOLD:
+                    self.flush()
+        self.since[group] = until
+
+    def integrate_all(self, until):
+        """Integra todos os grupos com vagas ocupadas até `until`"""
+        for group, count in list(self.counts.items()):
+            if count:
+                self.integrate(group, until)
+        self.start = until
+        self.since = {}
+
+    def flush(self):
+        """Soma os intervalos acumulados aos rollups gravados"""
+        if not self.buckets:
+            return
+
+        by_interval = defaultdict(dict)
+        for (interval, group, start), bucket in self.buckets.items():
+            _, lot_id, slot_type_id = group
+            by_interval[interval][(lot_id, slot_type_id, start)] = (group, bucket)
+
+        for interval, pending in by_interval.items():
+            starts = [key[2] for key in pending]
+            existing = {
+                (row.lot_id, row.slot_type_id, row.bucket_start): row
+                for row in OccupancyRollups.objects.filter(
+                    resolution=interval,
+                    lot_id__in={key[0] for key in pending},
+                    bucket_start__gte=min(starts),
+                    bucket_start__lte=max(starts),
+                )
+            }
+
+            to_create, to_update = [], []
+            for key, (group, bucket) in pending.items():
+                row = existing.get(key)
+                if row is None:
+                    row = OccupancyRollups(
+                        resolution=interval,
+                        bucket_start=key[2],
+                        establishment_id=group[0],
+                        lot_id=group[1],
+                        slot_type_id=group[2],
+                    )
+                    to_create.append(row)
+                else:
+                    to_update.append(row)
+                row.occupied_seconds += bucket.occupied_seconds
+                row.peak_occupied = max(row.peak_occupied, bucket.peak_occupied)
+                row.change_count += bucket.change_count
+                row.confidence_sum += bucket.confidence_sum
+                row.confidence_samples += bucket.confidence_samples
+
+            OccupancyRollups.objects.bulk_create(to_create, batch_size=1000)
+            OccupancyRollups.objects.bulk_update(
+                to_update,
+                [
+                    "occupied_seconds",
+                    "peak_occupied",
+                    "change_count",
+                    "confidence_sum",
+                    "confidence_samples",
+                ],
+                batch_size=1000,
+            )
+            self.stats["buckets"] += len(pending)
+
+        self.buckets = defaultdict(_Bucket)
+
+
+def reset_rollups():
+    """Apaga os rollups e o checkpoint (para reconstruir do zero)"""
+    with transaction.atomic():
+        OccupancyRollups.objects.all().delete()
+        ProcessingCheckpoints.objects.filter(name=CHECKPOINT_NAME).delete()
+
+
+def occupancy_series(queryset, resolution, start, end):
+    """
+    Série de ocupação somando os grupos do queryset (lote ou estabelecimento)
+
+    `peak_occupied` é a soma dos picos de cada tipo de vaga (limite superior
+    do pico do conjunto).
+    """
+    interval = RESOLUTIONS[resolution]
+    rows = (
+        queryset.filter(
+            resolution=interval, bucket_start__gte=start, bucket_start__lt=end
+        )
+        .values("bucket_start")
+        .annotate(
+            occupied_seconds=Sum("occupied_seconds"),
+            peak_occupied=Sum("peak_occupied"),
+            change_count=Sum("change_count"),
+            confidence_sum=Sum("confidence_sum"),
+            confidence_samples=Sum("confidence_samples"),
+        )
+        .order_by("bucket_start")
+    )
+    for row in rows:
+        samples = row["confidence_samples"]
+        yield {
+            "bucket_start": row["bucket_start"],
+            "avg_occupied": row["occupied_seconds"] / interval,
+            "peak_occupied": row["peak_occupied"],
+            "change_count": row["change_count"],
+            "avg_confidence": (row["confidence_sum"] / samples) if samples else None,
+        }
@@ -135,6 +135,28 @@ class SlotStatusHistorySerializer(BaseModelSerializer, SoftDeleteSerializerMixin
             "vehicle_type",
             "confidence",
             "event_id",
+            "occurred_at",
+            "recorded_at",
+        ]
+
+
+class SlotStatusHistoryFeedSerializer(serializers.ModelSerializer):
+    """Item do feed de mudanças de status de um lote/estabelecimento"""
+
+    slot_code = serializers.CharField(source="slot.slot_code", read_only=True)
+
+    class Meta:
+        model = SlotStatusHistory
+        fields = [
+            "id",
+            "slot_id",
+            "slot_code",
+            "lot_id",
+            "status",
+            "vehicle_type_id",
+            "confidence",
+            "event_id",
+            "occurred_at",
             "recorded_at",
         ]
 
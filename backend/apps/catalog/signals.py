@@ -0,0 +1,19 @@
+"""
+Invalidação do índice de estabelecimentos (apps.catalog.facets).
+
+Qualquer gravação ou remoção de estabelecimento (API, admin, comandos)
+invalida o índice depois do commit, em todos os processos.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .facets import establishment_index
+from .models import Establishments
+
+
+@receiver(post_save, sender=Establishments)
+@receiver(post_delete, sender=Establishments)
+def invalidate_establishment_index(sender, **kwargs):
+    transaction.on_commit(establishment_index.invalidate)
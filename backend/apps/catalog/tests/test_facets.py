@@ -0,0 +1,195 @@
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.facets import EstablishmentIndex, establishment_index, positions
+from apps.catalog.regions import record_status_change
+from .test_utils import TestDataMixin
+
+
+class FacetDataMixin(TestDataMixin):
+    """Cenário: 2 shoppings em Campinas (um com vaga livre) e 1 mercado em Santos"""
+
+    def create_scenario(self):
+        self.mall = self.create_store_type(name="Shopping")
+        market = self.create_store_type(name="Mercado")
+        self.campinas_a = self.create_establishment(
+            name="A", store_type=self.mall, city="Campinas", state="SP"
+        )
+        self.create_establishment(
+            name="B", store_type=self.mall, city="Campinas", state="SP"
+        )
+        self.create_establishment(
+            name="C", store_type=market, city="Santos", state="SP"
+        )
+        self.create_establishment(
+            name="Inativo",
+            client=self.create_client(onboarding_status="PENDING"),
+            store_type=market,
+        )
+
+        lot = self.create_lot(establishment=self.campinas_a)
+        self.slot = self.create_slot(lot=lot)
+        self.create_slot_status(slot=self.slot, status="FREE")
+
+
+class EstablishmentIndexTest(TestCase, FacetDataMixin):
+    """Testes para EstablishmentIndex"""
+
+    def setUp(self):
+        self.create_scenario()
+        self.index = EstablishmentIndex()
+
+    def names(self, rows):
+        return [row["name"] for row in rows]
+
+    def test_positions(self):
+        """Testa a leitura dos bits ligados"""
+        self.assertEqual(positions(0b101001), [0, 3, 5])
+        self.assertEqual(positions(0), [])
+
+    def test_search_without_filters(self):
+        """Testa a lista completa (só clientes ativos) e as contagens"""
+        rows, facets = self.index.search({})
+
+        self.assertEqual(self.names(rows), ["A", "B", "C"])
+        self.assertEqual(rows[0]["store_type"], "Shopping")
+        self.assertEqual(facets["store_type"], {"Mercado": 1, "Shopping": 2})
+        self.assertEqual(facets["city"], {"Campinas": 2, "Santos": 1})
+        self.assertEqual(facets["has_free"], {"true": 1, "false": 2})
+
+    def test_facets_count_under_other_filters(self):
+        """Testa que cada faceta é contada com os filtros das outras"""
+        rows, facets = self.index.search({"city": ["Campinas"]}, has_free=True)
+
+        self.assertEqual(self.names(rows), ["A"])
+        self.assertEqual(facets["city"], {"Campinas": 1})
+        self.assertEqual(facets["store_type"], {"Shopping": 1})
+        self.assertEqual(facets["has_free"], {"true": 1, "false": 1})
+
+    def test_values_of_a_facet_are_combined(self):
+        """Testa o OR entre valores da mesma faceta"""
+        rows, _ = self.index.search({"city": ["Campinas", "Santos"]}, has_free=False)
+
+        self.assertEqual(self.names(rows), ["B", "C"])
+
+    def test_search_without_queries(self):
+        """Testa que buscas com o índice carregado não consultam o banco"""
+        self.index.search({})
+
+        with self.assertNumQueries(0):
+            self.index.search({"state": ["SP"]}, has_free=True)
+            self.index.search({"store_type": ["Mercado"]})
+
+    def test_free_delta(self):
+        """Testa o ajuste do bitset de vagas livres pela ingestão"""
+        self.index.search({})
+
+        self.index.record_free_delta(self.slot.lot_id, -1)
+
+        rows, _ = self.index.search({}, has_free=True)
+        self.assertEqual(rows, [])
+
+    def test_invalidate(self):
+        """Testa que a invalidação remonta o índice"""
+        self.index.search({})
+        self.campinas_a.city = "Valinhos"
+        self.campinas_a.save()
+
+        self.index.invalidate()
+
+        _, facets = self.index.search({})
+        self.assertEqual(facets["city"], {"Campinas": 1, "Santos": 1, "Valinhos": 1})
+
+    def test_invalidate_reaches_other_processes(self):
+        """Testa que a versão no banco invalida o índice de outro processo"""
+        other = EstablishmentIndex(version_check_seconds=0)
+        other.search({})
+        self.campinas_a.city = "Valinhos"
+        self.campinas_a.save()
+
+        self.index.invalidate()
+
+        _, facets = other.search({})
+        self.assertEqual(facets["city"], {"Campinas": 1, "Santos": 1, "Valinhos": 1})
+
+    def test_saving_establishment_invalidates_after_commit(self):
+        """Testa a invalidação por signal ao gravar e remover estabelecimentos"""
+        index = EstablishmentIndex(version_check_seconds=0)
+        index.search({})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campinas_a.city = "Valinhos"
+            self.campinas_a.save()
+        _, facets = index.search({})
+        self.assertEqual(facets["city"], {"Campinas": 1, "Santos": 1, "Valinhos": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            establishment = self.create_establishment(
+                name="D", store_type=self.mall, city="Santos", state="SP"
+            )
+        self.assertEqual(self.names(index.search({})[0]), ["A", "B", "C", "D"])
+        with self.captureOnCommitCallbacks(execute=True):
+            establishment.delete()
+        rows, _ = index.search({})
+        self.assertEqual(self.names(rows), ["A", "B", "C"])
+
+
+class PublicEstablishmentsFacetViewTest(APITestCase, FacetDataMixin):
+    """Testes para os filtros de public_establishments_view"""
+
+    def setUp(self):
+        self.create_scenario()
+        establishment_index.clear()
+        self.addCleanup(establishment_index.clear)
+        self.url = reverse("catalog:public-establishments")
+
+    def test_filtered_list_is_paginated(self):
+        """Testa a resposta paginada com contagens das facetas"""
+        response = self.client.get(self.url, {"store_type": "Shopping", "limit": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertTrue(response.data["has_next"])
+        self.assertEqual([row["name"] for row in response.data["results"]], ["A"])
+        self.assertEqual(response.data["facets"]["city"], {"Campinas": 2})
+
+    def test_has_free(self):
+        """Testa o filtro por vaga livre, inclusive após a ingestão"""
+        response = self.client.get(self.url, {"has_free": "true"})
+        self.assertEqual(response.data["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_status_change(self.slot, "FREE", "OCCUPIED")
+
+        response = self.client.get(self.url, {"has_free": "true"})
+        self.assertEqual(response.data["count"], 0)
+
+    def test_invalid_has_free(self):
+        """Testa has_free inválido"""
+        response = self.client.get(self.url, {"has_free": "talvez"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_refreshes_index(self):
+        """Testa que alterar um estabelecimento atualiza as facetas"""
+        self.client.get(self.url, {"state": "SP"})
+        user = self.create_user()
+        role, _ = Group.objects.get_or_create(name="client_admin")
+        user.client_members.create(client=self.campinas_a.client, role=role)
+        self.client.force_authenticate(user=user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse(
+                    "catalog:establishment-detail", kwargs={"pk": self.campinas_a.id}
+                ),
+                {"city": "Valinhos"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url, {"city": "Valinhos"})
+        self.assertEqual([row["name"] for row in response.data["results"]], ["A"])
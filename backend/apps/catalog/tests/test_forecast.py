@@ -0,0 +1,128 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.forecast import OccupancyProfileBuilder, hour_of_week
+from apps.catalog.models import OccupancyProfiles, OccupancyRollups
+from .test_utils import TestDataMixin, local
+
+
+class ForecastDataMixin(TestDataMixin):
+    """Cenário: lote com 4 vagas de um tipo; rollups nas segundas às 8h"""
+
+    # Quarta-feira: a última semana completa começa na segunda 03/03
+    now = local(10, day=12)
+
+    def create_scenario(self):
+        self.lot = self.create_lot()
+        self.slot_type = self.create_slot_type()
+        for _ in range(4):
+            self.create_slot(lot=self.lot, slot_type=self.slot_type)
+
+        self.rollup(local(8, day=3), 2 * 3600)
+        self.rollup(local(8, day=24, month=2), 3600)
+        # Semana atual (incompleta) fica de fora
+        self.rollup(local(8, day=10), 4 * 3600)
+
+    def rollup(self, bucket_start, occupied_seconds):
+        OccupancyRollups.objects.create(
+            resolution=3600,
+            bucket_start=bucket_start,
+            establishment=self.lot.establishment,
+            lot=self.lot,
+            slot_type=self.slot_type,
+            occupied_seconds=occupied_seconds,
+        )
+
+    def build(self, **kwargs):
+        return OccupancyProfileBuilder(now=self.now, **kwargs).run()
+
+
+class OccupancyProfileBuilderTest(TestCase, ForecastDataMixin):
+    """Testes para OccupancyProfileBuilder"""
+
+    def setUp(self):
+        self.create_scenario()
+
+    def test_hour_of_week(self):
+        """Testa a posição no perfil"""
+        self.assertEqual(hour_of_week(local(8, day=3)), 8)
+        self.assertEqual(hour_of_week(local(23, day=9)), 167)
+
+    def test_weighted_profile(self):
+        """Testa a média com peso maior para a semana mais recente"""
+        stats = self.build(weeks=2, decay=0.5)
+
+        self.assertEqual(stats["profiles"], 1)
+        self.assertEqual(stats["rows"], 2)
+        profile = OccupancyProfiles.objects.get(lot=self.lot)
+        self.assertEqual(profile.capacity, 4)
+        self.assertEqual(profile.weeks, 2)
+        self.assertEqual(len(profile.profile), 168)
+        self.assertEqual(profile.profile[8], round(2.5 / 1.5, 3))
+        self.assertEqual(profile.profile[9], 0)
+
+    def test_recent_group_uses_observed_weeks(self):
+        """Testa grupo com rollups só na última semana"""
+        OccupancyRollups.objects.filter(bucket_start=local(8, day=24, month=2)).delete()
+        self.build(weeks=4, decay=0.5)
+
+        profile = OccupancyProfiles.objects.get(lot=self.lot)
+        self.assertEqual(profile.weeks, 1)
+        self.assertEqual(profile.profile[8], 2)
+
+    def test_rebuild_updates_and_removes_stale_profiles(self):
+        """Testa a atualização e a remoção de perfis sem dados"""
+        self.build(weeks=2, decay=0.5)
+        OccupancyRollups.objects.all().delete()
+
+        stats = OccupancyProfileBuilder(now=local(10, day=19), weeks=2).run()
+
+        self.assertEqual(stats["deleted"], 1)
+        self.assertFalse(OccupancyProfiles.objects.exists())
+
+    def test_command(self):
+        """Testa o comando build_occupancy_profiles"""
+        out = StringIO()
+        call_command("build_occupancy_profiles", "--weeks", "2", stdout=out)
+
+        self.assertIn("perfis gravados", out.getvalue())
+
+
+class PublicOccupancyForecastViewTest(APITestCase, ForecastDataMixin):
+    """Testes para public_occupancy_forecast_view"""
+
+    def setUp(self):
+        self.create_scenario()
+        self.build(weeks=2, decay=0.5)
+        self.url = reverse(
+            "catalog:public-occupancy-forecast",
+            kwargs={"establishment_id": self.lot.establishment_id},
+        )
+
+    def test_forecast(self):
+        """Testa a previsão para uma segunda-feira às 8h30"""
+        response = self.client.get(self.url, {"at": local(8, 30, day=17).isoformat()})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data["results"][0]
+        self.assertEqual(result["lot_id"], self.lot.id)
+        self.assertEqual(result["capacity"], 4)
+        self.assertAlmostEqual(result["expected_free"], 4 - 1.667)
+        self.assertAlmostEqual(result["occupancy_rate"], 1.667 / 4)
+
+    def test_invalid_instant(self):
+        """Testa instante inválido"""
+        response = self.client.get(self.url, {"at": "amanhã"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_establishment(self):
+        """Testa estabelecimento inexistente"""
+        url = reverse(
+            "catalog:public-occupancy-forecast", kwargs={"establishment_id": 99999}
+        )
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
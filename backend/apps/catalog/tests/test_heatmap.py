@@ -0,0 +1,134 @@
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.heatmap import cached_slot_heatmap, slot_heatmap
+from .test_utils import TestDataMixin, local
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class HeatmapDataMixin(TestDataMixin):
+    """Cenário: vaga A ocupada às 9h, 10:30-11:00 livre, 11:30 livre; B sem histórico"""
+
+    def create_scenario(self):
+        self.lot = self.create_lot()
+        self.slot_a = self.create_slot(lot=self.lot, slot_code="A1")
+        self.slot_b = self.create_slot(lot=self.lot, slot_code="B1")
+        self.create_slot_status_history(
+            slot=self.slot_a, status="OCCUPIED", recorded_at=local(9)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_a, status="FREE", recorded_at=local(10, 30)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_a, status="OCCUPIED", recorded_at=local(11)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_a, status="FREE", recorded_at=local(11, 30)
+        )
+
+
+class SlotHeatmapTest(TestCase, HeatmapDataMixin):
+    """Testes para slot_heatmap"""
+
+    def setUp(self):
+        self.create_scenario()
+
+    def test_utilization_and_turnover(self):
+        """Testa utilização com o status anterior ao intervalo"""
+        results = slot_heatmap(self.lot, local(10), local(12))
+
+        by_code = {row["slot_code"]: row for row in results}
+        self.assertEqual(by_code["A1"]["utilization"], 0.5)
+        self.assertEqual(by_code["A1"]["turnover"], 1)
+        self.assertEqual(by_code["A1"]["transitions"], 3)
+        self.assertEqual(by_code["A1"]["polygon_json"], self.slot_a.polygon_json)
+        self.assertEqual(by_code["B1"]["utilization"], 0)
+        self.assertEqual(by_code["B1"]["turnover"], 0)
+
+    def test_repeated_occupied_is_one_arrival(self):
+        """Testa OCCUPIED enviado duas vezes seguidas: uma chegada só"""
+        self.create_slot_status_history(
+            slot=self.slot_b, status="OCCUPIED", recorded_at=local(10)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_b, status="OCCUPIED", recorded_at=local(10, 15)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_b, status="FREE", recorded_at=local(10, 45)
+        )
+        # Repetição logo no início do intervalo: a vaga já estava ocupada
+        self.create_slot_status_history(
+            slot=self.slot_a, status="OCCUPIED", recorded_at=local(11, 30, day=9)
+        )
+
+        results = slot_heatmap(self.lot, local(10), local(12))
+
+        by_code = {row["slot_code"]: row for row in results}
+        self.assertEqual(by_code["B1"]["turnover"], 1)
+        self.assertEqual(by_code["B1"]["transitions"], 3)
+        self.assertEqual(by_code["B1"]["utilization"], 0.375)
+        self.assertEqual(by_code["A1"]["turnover"], 1)
+
+        results = slot_heatmap(self.lot, local(9), local(10))
+        self.assertEqual(results[0]["turnover"], 0)
+
+    def test_slot_occupied_for_whole_range(self):
+        """Testa vaga ocupada durante todo o intervalo, sem registros nele"""
+        results = slot_heatmap(self.lot, local(9, 30), local(10))
+
+        self.assertEqual(results[0]["utilization"], 1)
+        self.assertEqual(results[0]["transitions"], 0)
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_cached_per_lot_and_range(self):
+        """Testa que o resultado vem do cache na segunda chamada"""
+        cache.clear()
+        first = cached_slot_heatmap(self.lot, local(10), local(12))
+        self.create_slot_status_history(
+            slot=self.slot_b, status="OCCUPIED", recorded_at=local(10)
+        )
+
+        with self.assertNumQueries(0):
+            second = cached_slot_heatmap(self.lot, local(10), local(12))
+        self.assertEqual(first, second)
+        cache.clear()
+
+
+class SlotHeatmapViewTest(APITestCase, HeatmapDataMixin):
+    """Testes para SlotHeatmapView"""
+
+    def setUp(self):
+        self.create_scenario()
+        self.user = self.create_app_user()
+        role, _ = Group.objects.get_or_create(name="client_member")
+        self.user.client_members.create(client=self.lot.client, role=role)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("catalog:lot-heatmap", kwargs={"lot_id": self.lot.id})
+
+    def test_heatmap(self):
+        """Testa o mapa de calor do lote"""
+        response = self.client.get(
+            self.url, {"from": local(10).isoformat(), "to": local(12).isoformat()}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][0]["utilization"], 0.5)
+
+    def test_range_too_long(self):
+        """Testa intervalo maior que o máximo"""
+        response = self.client.get(
+            self.url,
+            {"from": local(0, day=1).isoformat(), "to": "2025-07-01T00:00:00-03:00"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_client_lot_not_found(self):
+        """Testa que lotes de outros clientes não são acessíveis"""
+        url = reverse("catalog:lot-heatmap", kwargs={"lot_id": self.create_lot().id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,125 @@
+from django.contrib.auth.models import Group
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.models import SlotStatusHistory
+from .test_utils import TestDataMixin, local
+
+
+class SlotStatusHistoryFeedViewTest(APITestCase, TestDataMixin):
+    """Testes para SlotStatusHistoryFeedView"""
+
+    def setUp(self):
+        self.lot = self.create_lot()
+        self.other_lot = self.create_lot(establishment=self.lot.establishment)
+        self.slot_a = self.create_slot(lot=self.lot, slot_code="A1")
+        self.slot_b = self.create_slot(lot=self.lot, slot_code="B1")
+        self.slot_c = self.create_slot(lot=self.other_lot, slot_code="C1")
+
+        self.create_slot_status_history(
+            slot=self.slot_a, status="OCCUPIED", recorded_at=local(10)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_b, status="OCCUPIED", recorded_at=local(10, 5)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_c, status="OCCUPIED", recorded_at=local(10, 7)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_a, status="FREE", recorded_at=local(10, 10)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_b, status="FREE", recorded_at=local(10, 10)
+        )
+
+        self.user = self.create_app_user()
+        role, _ = Group.objects.get_or_create(name="client_member")
+        self.user.client_members.create(client=self.lot.client, role=role)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("catalog:lot-status-history", kwargs={"lot_id": self.lot.id})
+
+    def test_history_lot_is_filled_from_slot(self):
+        """Testa que o lote do histórico vem da vaga"""
+        history = SlotStatusHistory.objects.filter(slot=self.slot_c).get()
+        self.assertEqual(history.lot, self.other_lot)
+
+    def test_bulk_create_fills_lot_from_slot(self):
+        """Testa que bulk_create também preenche o lote a partir da vaga"""
+        created = SlotStatusHistory.objects.bulk_create(
+            [
+                SlotStatusHistory(slot=self.slot_a, status="OCCUPIED"),
+                SlotStatusHistory(slot=self.slot_c, status="FREE"),
+            ]
+        )
+
+        self.assertEqual(
+            [row.lot_id for row in created], [self.lot.id, self.other_lot.id]
+        )
+        lots = SlotStatusHistory.objects.filter(
+            pk__in=[row.pk for row in created]
+        ).values_list("slot_id", "lot_id")
+        self.assertEqual(
+            set(lots),
+            {(self.slot_a.id, self.lot.id), (self.slot_c.id, self.other_lot.id)},
+        )
+
+    def test_lot_feed_is_newest_first(self):
+        """Testa o feed do lote em ordem decrescente"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(len(results), 4)
+        self.assertEqual(
+            [row["slot_code"] for row in results], ["B1", "A1", "B1", "A1"]
+        )
+        self.assertFalse(response.data["has_next"])
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_keyset_pagination(self):
+        """Testa que as páginas seguem o cursor sem repetir linhas"""
+        seen = []
+        response = self.client.get(self.url, {"page_size": 3})
+        seen += [row["id"] for row in response.data["results"]]
+        self.assertTrue(response.data["has_next"])
+
+        response = self.client.get(
+            self.url, {"page_size": 3, "cursor": response.data["next_cursor"]}
+        )
+        seen += [row["id"] for row in response.data["results"]]
+
+        self.assertFalse(response.data["has_next"])
+        expected = SlotStatusHistory.objects.filter(lot=self.lot).order_by(
+            "-recorded_at", "-id"
+        )
+        self.assertEqual(seen, [history.id for history in expected])
+
+    def test_establishment_feed_merges_lots(self):
+        """Testa o feed do estabelecimento mesclando os lotes"""
+        url = reverse(
+            "catalog:establishment-status-history",
+            kwargs={"establishment_id": self.lot.establishment_id},
+        )
+        response = self.client.get(url, {"page_size": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["slot_code"] for row in response.data["results"]],
+            ["B1", "A1", "C1"],
+        )
+
+    def test_time_range_and_invalid_cursor(self):
+        """Testa o filtro de intervalo e cursor inválido"""
+        response = self.client.get(self.url, {"to": local(10, 10).isoformat()})
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get(self.url, {"cursor": "invalido"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_client_lot_not_found(self):
+        """Testa que lotes de outros clientes não são acessíveis"""
+        url = reverse(
+            "catalog:lot-status-history", kwargs={"lot_id": self.create_lot().id}
+        )
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
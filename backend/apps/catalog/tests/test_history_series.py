@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.history_series import slot_history_series
+from apps.catalog.models import SlotStatusHistorySummaries
+from .test_utils import TestDataMixin, local
+
+
+class HistorySeriesDataMixin(TestDataMixin):
+    """Cenário: 10:00 ocupa, 10:40 libera, 12:20 ocupa"""
+
+    def create_scenario(self):
+        self.slot = self.create_slot()
+        self.create_slot_status_history(
+            slot=self.slot, status="OCCUPIED", recorded_at=local(10)
+        )
+        self.create_slot_status_history(
+            slot=self.slot, status="FREE", recorded_at=local(10, 40)
+        )
+        self.create_slot_status_history(
+            slot=self.slot, status="OCCUPIED", recorded_at=local(12, 20)
+        )
+
+
+class SlotHistorySeriesTest(TestCase, HistorySeriesDataMixin):
+    """Testes para slot_history_series"""
+
+    def setUp(self):
+        self.create_scenario()
+
+    def test_hourly_series(self):
+        """Testa status predominante, fração ocupada e transições por hora"""
+        series = list(slot_history_series(self.slot.id, "hour", local(10), local(14)))
+
+        self.assertEqual(
+            [item["dominant_status"] for item in series],
+            ["OCCUPIED", "FREE", "OCCUPIED", "OCCUPIED"],
+        )
+        self.assertEqual(
+            [round(item["occupied_fraction"], 3) for item in series],
+            [0.667, 0, 0.667, 1],
+        )
+        self.assertEqual([item["transitions"] for item in series], [2, 0, 1, 0])
+
+    def test_partial_first_bucket_uses_previous_status(self):
+        """Testa o início no meio de um intervalo"""
+        series = list(
+            slot_history_series(self.slot.id, "hour", local(10, 30), local(11))
+        )
+
+        self.assertEqual(len(series), 1)
+        self.assertEqual(series[0]["bucket_start"], local(10))
+        self.assertAlmostEqual(series[0]["occupied_fraction"], 1 / 3)
+        self.assertEqual(series[0]["transitions"], 1)
+
+    def test_daily_series(self):
+        """Testa um único intervalo diário"""
+        series = list(
+            slot_history_series(self.slot.id, "day", local(0), local(0, day=11))
+        )
+
+        self.assertEqual(len(series), 1)
+        self.assertEqual(series[0]["transitions"], 3)
+        self.assertEqual(series[0]["dominant_status"], "OCCUPIED")
+
+    def test_summaries_used_without_raw_history(self):
+        """Testa o uso dos resumos da retenção onde não há histórico bruto"""
+        SlotStatusHistorySummaries.objects.create(
+            slot=self.slot,
+            interval_seconds=3600,
+            bucket_start=local(10, day=9),
+            change_count=4,
+            occupied_count=1,
+            last_status="FREE",
+            last_recorded_at=local(10, 50, day=9),
+        )
+
+        series = list(
+            slot_history_series(
+                self.slot.id, "hour", local(10, day=9), local(12, day=9)
+            )
+        )
+
+        self.assertEqual(series[0]["transitions"], 4)
+        self.assertEqual(series[0]["occupied_fraction"], 0.25)
+        self.assertEqual(series[1]["dominant_status"], "FREE")
+
+
+class SlotStatusHistoryBucketViewTest(APITestCase, HistorySeriesDataMixin):
+    """Testes para a série reduzida de SlotStatusHistoryListView"""
+
+    def setUp(self):
+        self.create_scenario()
+        self.user = self.create_app_user()
+        role, _ = Group.objects.get_or_create(name="client_member")
+        self.user.client_members.create(client=self.slot.client, role=role)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse(
+            "catalog:slot-status-history", kwargs={"slot_id": self.slot.id}
+        )
+
+    def test_bucketed_history(self):
+        """Testa a série por hora"""
+        response = self.client.get(
+            self.url,
+            {
+                "bucket": "hour",
+                "from": local(10).isoformat(),
+                "to": local(14).isoformat(),
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["bucket"], "hour")
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertEqual(response.data["results"][1]["dominant_status"], "FREE")
+
+    def test_invalid_bucket_parameters(self):
+        """Testa agrupamento inválido e intervalo longo demais"""
+        response = self.client.get(self.url, {"bucket": "week"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            self.url,
+            {
+                "bucket": "minute",
+                "from": local(0).isoformat(),
+                "to": (local(0) + timedelta(days=30)).isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_client_slot_not_found(self):
+        """Testa que vagas de outros clientes não são acessíveis"""
+        other_slot = self.create_slot()
+        url = reverse("catalog:slot-status-history", kwargs={"slot_id": other_slot.id})
+
+        response = self.client.get(url, {"bucket": "hour"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
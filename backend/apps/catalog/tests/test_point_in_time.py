@@ -0,0 +1,128 @@
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.models import Slots, SlotStatusHistory, SlotStatusSnapshots
+from apps.catalog.point_in_time import lot_status_as_of, take_snapshot
+from .test_utils import TestDataMixin, local
+
+
+class AsOfDataMixin(TestDataMixin):
+    """Cenário: três vagas de um lote, criadas em 01/03"""
+
+    def create_scenario(self):
+        self.lot = self.create_lot()
+        self.slot_a = self.create_slot(lot=self.lot, slot_code="A1")
+        self.slot_b = self.create_slot(lot=self.lot, slot_code="B1")
+        self.slot_c = self.create_slot(lot=self.lot, slot_code="C1")
+        Slots.objects.filter(lot=self.lot).update(created_at=local(0, day=1))
+
+        self.create_slot_status_history(
+            slot=self.slot_a, status="OCCUPIED", recorded_at=local(10)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_b, status="OCCUPIED", recorded_at=local(10, 30)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_a, status="FREE", recorded_at=local(11)
+        )
+
+    def statuses(self, moment):
+        _, results = lot_status_as_of(self.lot, moment)
+        return {row["slot_code"]: row["status"] for row in results}
+
+
+class LotStatusAsOfTest(TestCase, AsOfDataMixin):
+    """Testes para lot_status_as_of"""
+
+    def setUp(self):
+        self.create_scenario()
+
+    def test_status_from_history(self):
+        """Testa o último status de cada vaga até o instante"""
+        self.assertEqual(
+            self.statuses(local(10, 45)),
+            {"A1": "OCCUPIED", "B1": "OCCUPIED", "C1": None},
+        )
+        self.assertEqual(self.statuses(local(11))["A1"], "FREE")
+        self.assertEqual(self.statuses(local(9))["A1"], None)
+
+    def test_snapshot_is_used(self):
+        """Testa que a foto cobre vagas sem histórico posterior a ela"""
+        snapshot = take_snapshot(self.lot, local(10, 45))
+        self.assertEqual(
+            set(snapshot.statuses), {str(self.slot_a.id), str(self.slot_b.id)}
+        )
+
+        # Histórico anterior à foto não é mais lido
+        SlotStatusHistory.objects.filter(recorded_at__lte=local(10, 45)).delete()
+        used, results = lot_status_as_of(self.lot, local(12))
+
+        self.assertEqual(used, snapshot)
+        by_code = {row["slot_code"]: row for row in results}
+        self.assertEqual(by_code["A1"]["status"], "FREE")
+        self.assertEqual(by_code["B1"]["status"], "OCCUPIED")
+        self.assertEqual(by_code["B1"]["since"], local(10, 30))
+
+    def test_slots_created_or_deleted_outside_instant(self):
+        """Testa que só vagas existentes no instante são retornadas"""
+        Slots.objects.filter(pk=self.slot_c.pk).update(created_at=local(12))
+        Slots.objects.filter(pk=self.slot_b.pk).update(deleted_at=local(11, 30))
+
+        self.assertEqual(set(self.statuses(local(11))), {"A1", "B1"})
+        self.assertEqual(set(self.statuses(local(13))), {"A1", "C1"})
+
+    def test_command(self):
+        """Testa o comando take_status_snapshots"""
+        out = StringIO()
+        call_command("take_status_snapshots", "--lot", str(self.lot.id), stdout=out)
+
+        self.assertIn("1 fotos criadas", out.getvalue())
+        snapshot = SlotStatusSnapshots.objects.get(lot=self.lot)
+        self.assertEqual(snapshot.statuses[str(self.slot_a.id)][0], "FREE")
+
+
+class SlotStatusAsOfViewTest(APITestCase, AsOfDataMixin):
+    """Testes para SlotStatusAsOfView"""
+
+    def setUp(self):
+        self.create_scenario()
+        self.user = self.create_app_user()
+        role, _ = Group.objects.get_or_create(name="client_member")
+        self.user.client_members.create(client=self.lot.client, role=role)
+        self.client.force_authenticate(user=self.user)
+
+    def test_lot_as_of(self):
+        """Testa o status do lote em um instante"""
+        url = reverse("catalog:lot-status-as-of", kwargs={"lot_id": self.lot.id})
+        response = self.client.get(url, {"at": local(10, 45).isoformat()})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["counts"], {"OCCUPIED": 2, "UNKNOWN": 1})
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_establishment_as_of(self):
+        """Testa o status do estabelecimento em um instante"""
+        url = reverse(
+            "catalog:establishment-status-as-of",
+            kwargs={"establishment_id": self.lot.establishment_id},
+        )
+        response = self.client.get(url, {"at": local(12).isoformat()})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["counts"]["FREE"], 1)
+
+    def test_invalid_instant_and_other_client(self):
+        """Testa instante inválido e lote de outro cliente"""
+        url = reverse("catalog:lot-status-as-of", kwargs={"lot_id": self.lot.id})
+        response = self.client.get(url, {"at": "ontem"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        other_lot = self.create_lot()
+        url = reverse("catalog:lot-status-as-of", kwargs={"lot_id": other_lot.id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,149 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.models import RegionOccupancy
+from apps.catalog.regions import (
+    rebuild_region_occupancy,
+    record_status_change,
+    state_occupancy,
+)
+from .test_utils import TestDataMixin
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class RegionDataMixin(TestDataMixin):
+    """Cenário: Campinas com 2 estabelecimentos, Santos com 1, RJ com 1"""
+
+    def create_scenario(self):
+        self.campinas = [
+            self.create_establishment(city="Campinas", state="SP", lat=-22.0)
+            for _ in range(2)
+        ]
+        santos = self.create_establishment(city="Santos", state="SP", lat=-24.0)
+        rio = self.create_establishment(city="Rio de Janeiro", state="RJ")
+        inactive = self.create_establishment(
+            client=self.create_client(onboarding_status="PENDING"),
+            city="Campinas",
+            state="SP",
+        )
+
+        self.slot = self.add_slot(self.campinas[0], "FREE")
+        self.add_slot(self.campinas[0], "OCCUPIED")
+        self.add_slot(self.campinas[1], "FREE")
+        self.add_slot(self.campinas[1], None)
+        self.add_slot(self.campinas[1], "FREE", active=False)
+        self.add_slot(santos, "OCCUPIED")
+        self.add_slot(rio, "FREE")
+        self.add_slot(inactive, "FREE")
+
+    def add_slot(self, establishment, status_value, **kwargs):
+        lot = establishment.lots.first() or self.create_lot(establishment=establishment)
+        slot = self.create_slot(lot=lot, **kwargs)
+        if status_value:
+            self.create_slot_status(slot=slot, status=status_value)
+        return slot
+
+
+class RebuildRegionOccupancyTest(TestCase, RegionDataMixin):
+    """Testes para rebuild_region_occupancy"""
+
+    def setUp(self):
+        self.create_scenario()
+
+    def test_rebuild(self):
+        """Testa os totais por cidade (só clientes ativos e vagas ativas)"""
+        stats = rebuild_region_occupancy()
+
+        self.assertEqual(stats, {"regions": 3, "deleted": 0})
+        campinas = RegionOccupancy.objects.get(state="SP", city="Campinas")
+        self.assertEqual(campinas.establishments, 2)
+        self.assertEqual(campinas.total_slots, 4)
+        self.assertEqual(campinas.free_slots, 2)
+        self.assertEqual(campinas.lat, -22.0)
+
+    def test_rebuild_removes_empty_regions(self):
+        """Testa que cidades sem estabelecimentos ativos são removidas"""
+        rebuild_region_occupancy()
+        for establishment in self.campinas:
+            establishment.client.onboarding_status = "SUSPENDED"
+            establishment.client.save()
+
+        stats = rebuild_region_occupancy()
+
+        self.assertEqual(stats["deleted"], 1)
+        self.assertFalse(RegionOccupancy.objects.filter(city="Campinas").exists())
+
+    def test_status_change_adjusts_free_slots(self):
+        """Testa o ajuste incremental das vagas livres após o commit"""
+        rebuild_region_occupancy()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_status_change(self.slot, "FREE", "OCCUPIED")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            record_status_change(self.slot, "OCCUPIED", "RESERVED")
+
+        self.assertEqual(callbacks, [])
+        campinas = RegionOccupancy.objects.get(state="SP", city="Campinas")
+        self.assertEqual(campinas.free_slots, 1)
+
+    def test_ingestion_adjusts_free_slots(self):
+        """Testa que eventos do hardware ajustam a cidade sem recálculo"""
+        rebuild_region_occupancy()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("hardware:slot-status-event"),
+                {"slot_id": self.slot.id, "status": "OCCUPIED"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        campinas = RegionOccupancy.objects.get(state="SP", city="Campinas")
+        self.assertEqual(campinas.free_slots, 1)
+
+
+class PublicRegionOccupancyViewTest(APITestCase, RegionDataMixin):
+    """Testes para as views públicas de ocupação por região"""
+
+    def setUp(self):
+        self.create_scenario()
+        rebuild_region_occupancy()
+
+    def test_states(self):
+        """Testa os totais por estado"""
+        response = self.client.get(reverse("catalog:public-state-occupancy"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["state"] for row in response.data], ["RJ", "SP"])
+        sp = response.data[1]
+        self.assertEqual(sp["establishments"], 3)
+        self.assertEqual(sp["total_slots"], 5)
+        self.assertEqual(sp["free_slots"], 2)
+
+    def test_cities(self):
+        """Testa os totais por cidade de um estado"""
+        response = self.client.get(
+            reverse("catalog:public-city-occupancy", kwargs={"state": "SP"})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["city"], row["free_slots"]) for row in response.data],
+            [("Campinas", 2), ("Santos", 0)],
+        )
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_cached(self):
+        """Testa que leituras seguidas não consultam o banco"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        state_occupancy()
+
+        with self.assertNumQueries(0):
+            results = state_occupancy()
+
+        self.assertEqual(len(results), 2)
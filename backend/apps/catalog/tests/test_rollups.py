@@ -0,0 +1,183 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.models import OccupancyRollups
+from apps.catalog.rollups import OccupancyRollupBuilder
+from apps.core.models import ProcessingCheckpoints
+from .test_utils import TestDataMixin, local
+
+
+class RollupDataMixin(TestDataMixin):
+    """Cenário: duas vagas do mesmo lote e tipo"""
+
+    def create_scenario(self):
+        self.lot = self.create_lot()
+        self.slot_type = self.create_slot_type()
+        self.slot_a = self.create_slot(lot=self.lot, slot_type=self.slot_type)
+        self.slot_b = self.create_slot(lot=self.lot, slot_type=self.slot_type)
+
+        # 10:00 A ocupa, 10:30 B ocupa, 11:15 A libera
+        self.create_slot_status_history(
+            slot=self.slot_a, status="OCCUPIED", recorded_at=local(10)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_b, status="OCCUPIED", recorded_at=local(10, 30)
+        )
+        self.create_slot_status_history(
+            slot=self.slot_a, status="FREE", recorded_at=local(11, 15)
+        )
+
+    def rollup(self, resolution, start):
+        return OccupancyRollups.objects.get(
+            lot=self.lot, resolution=resolution, bucket_start=start
+        )
+
+
+class OccupancyRollupBuilderTest(TestCase, RollupDataMixin):
+    """Testes para OccupancyRollupBuilder"""
+
+    def setUp(self):
+        self.create_scenario()
+
+    def test_hourly_rollups(self):
+        """Testa ocupação integrada por hora"""
+        stats = OccupancyRollupBuilder(lag_seconds=0).run(until=local(12))
+
+        self.assertEqual(stats["rows"], 3)
+        ten = self.rollup(3600, local(10))
+        self.assertEqual(ten.occupied_seconds, 1800 + 2 * 1800)
+        self.assertEqual(ten.peak_occupied, 2)
+        self.assertEqual(ten.change_count, 2)
+        self.assertEqual(ten.avg_confidence, Decimal("0.95"))
+
+        eleven = self.rollup(3600, local(11))
+        self.assertEqual(eleven.occupied_seconds, 2 * 900 + 2700)
+        self.assertEqual(eleven.peak_occupied, 2)
+        self.assertEqual(eleven.change_count, 1)
+
+    def test_daily_and_minute_rollups(self):
+        """Testa resoluções de dia e minuto"""
+        OccupancyRollupBuilder(lag_seconds=0).run(until=local(12))
+
+        day = self.rollup(86400, local(0))
+        self.assertEqual(day.occupied_seconds, 5400 + 4500)
+        self.assertEqual(day.change_count, 3)
+        self.assertEqual(self.rollup(60, local(10, 45)).occupied_seconds, 120)
+
+    def test_incremental_runs_match_single_run(self):
+        """Testa que execuções incrementais somam o mesmo que uma execução única"""
+        builder = OccupancyRollupBuilder(lag_seconds=0, batch_size=1)
+        first = builder.run(until=local(11))
+        second = builder.run(until=local(12))
+
+        self.assertEqual(first["rows"], 2)
+        self.assertEqual(second["rows"], 1)
+        self.assertEqual(self.rollup(3600, local(10)).occupied_seconds, 5400)
+        self.assertEqual(self.rollup(3600, local(11)).occupied_seconds, 4500)
+        self.assertEqual(self.rollup(3600, local(11)).peak_occupied, 2)
+
+        checkpoint = ProcessingCheckpoints.objects.get(name="occupancy_rollups")
+        self.assertEqual(checkpoint.position, local(12))
+        self.assertEqual(checkpoint.state["occupied_slots"], [self.slot_b.id])
+
+    def test_rerun_without_new_rows_only_extends_occupancy(self):
+        """Testa execução sem histórico novo"""
+        builder = OccupancyRollupBuilder(lag_seconds=0)
+        builder.run(until=local(12))
+        stats = builder.run(until=local(13))
+
+        self.assertEqual(stats["rows"], 0)
+        self.assertEqual(self.rollup(3600, local(12)).occupied_seconds, 3600)
+
+    def test_command_reset(self):
+        """Testa o comando build_occupancy_rollups com --reset"""
+        # Sem vagas ocupadas no fim, a reconstrução não integra até hoje
+        self.create_slot_status_history(
+            slot=self.slot_b, status="FREE", recorded_at=local(11, 30)
+        )
+        OccupancyRollupBuilder(lag_seconds=0).run(until=local(12))
+        out = StringIO()
+        call_command("build_occupancy_rollups", "--reset", stdout=out)
+
+        self.assertIn("4 registros", out.getvalue())
+        self.assertEqual(self.rollup(3600, local(10)).occupied_seconds, 5400)
+
+
+class OccupancySeriesViewTest(APITestCase, RollupDataMixin):
+    """Testes para OccupancySeriesView"""
+
+    def setUp(self):
+        self.create_scenario()
+        OccupancyRollupBuilder(lag_seconds=0).run(until=local(12))
+
+        self.user = self.create_app_user()
+        role, _ = Group.objects.get_or_create(name="client_member")
+        self.user.client_members.create(client=self.lot.client, role=role)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("catalog:lot-occupancy", kwargs={"lot_id": self.lot.id})
+
+    def test_hourly_series(self):
+        """Testa a série por hora do lote"""
+        response = self.client.get(
+            self.url,
+            {"from": local(9).isoformat(), "to": local(12).isoformat()},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["capacity"], 2)
+        results = response.data["results"]
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["avg_occupied"], 1.5)
+        self.assertEqual(results[0]["occupancy_rate"], 0.75)
+        self.assertEqual(results[1]["change_count"], 1)
+
+    def test_establishment_series(self):
+        """Testa a série diária do estabelecimento"""
+        url = reverse(
+            "catalog:establishment-occupancy",
+            kwargs={"establishment_id": self.lot.establishment_id},
+        )
+        response = self.client.get(
+            url,
+            {
+                "resolution": "day",
+                "from": local(0).isoformat(),
+                "to": local(0, day=11).isoformat(),
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["change_count"], 3)
+
+    def test_invalid_parameters(self):
+        """Testa resolução inválida e intervalo longo demais"""
+        response = self.client.get(self.url, {"resolution": "week"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            self.url,
+            {
+                "resolution": "minute",
+                "from": local(0).isoformat(),
+                "to": (local(0) + timedelta(days=30)).isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_client_lot_not_found(self):
+        """Testa que lotes de outros clientes não são acessíveis"""
+        other_lot = self.create_lot()
+        url = reverse("catalog:lot-occupancy", kwargs={"lot_id": other_lot.id})
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
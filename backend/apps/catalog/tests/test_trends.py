@@ -0,0 +1,158 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.trends import TrendBuffers, trends
+from .test_utils import TestDataMixin
+
+
+class TrendDataMixin(TestDataMixin):
+    """Cenário: B ocupada antes da janela; A ocupada há 90 min e livre há 30"""
+
+    def create_scenario(self):
+        self.now = timezone.now()
+        self.lot = self.create_lot()
+        self.slot_a = self.create_slot(lot=self.lot, slot_code="A1")
+        self.slot_b = self.create_slot(lot=self.lot, slot_code="B1")
+        self.create_slot_status_history(
+            slot=self.slot_b,
+            status="OCCUPIED",
+            recorded_at=self.now - timedelta(hours=3),
+        )
+        self.create_slot_status_history(
+            slot=self.slot_a,
+            status="OCCUPIED",
+            recorded_at=self.now - timedelta(minutes=90),
+        )
+        self.create_slot_status_history(
+            slot=self.slot_a,
+            status="FREE",
+            recorded_at=self.now - timedelta(minutes=30),
+        )
+
+
+class TrendBuffersTest(TestCase, TrendDataMixin):
+    """Testes para TrendBuffers"""
+
+    def setUp(self):
+        self.create_scenario()
+        self.buffers = TrendBuffers(background=False)
+
+    def test_rebuilt_from_history(self):
+        """Testa a montagem do buffer a partir do histórico recente"""
+        start, samples = self.buffers.lot_series(self.lot.id, self.now)
+
+        self.assertEqual(len(samples), 120)
+        self.assertLessEqual(start, self.now - timedelta(minutes=119))
+        self.assertEqual(samples[0], 1)
+        self.assertEqual(samples[60], 2)
+        self.assertEqual(samples[-1], 1)
+
+    def test_reads_and_ingestion_without_queries(self):
+        """Testa que leituras e a ingestão não consultam o banco"""
+        self.buffers.lot_series(self.lot.id, self.now)
+
+        with self.assertNumQueries(0):
+            self.buffers.record(self.lot.id, self.slot_a.id, "OCCUPIED", self.now)
+            _, samples = self.buffers.lot_series(self.lot.id, self.now)
+
+        self.assertEqual(samples[-1], 2)
+
+    def test_refresh_reads_history_from_other_processes(self):
+        """Testa a atualização com o histórico gravado por outros processos"""
+        self.buffers.lot_series(self.lot.id, self.now)
+        self.create_slot_status_history(
+            slot=self.slot_a,
+            status="OCCUPIED",
+            recorded_at=self.now - timedelta(seconds=1),
+        )
+
+        self.buffers.refresh()
+        _, samples = self.buffers.lot_series(self.lot.id, self.now)
+
+        self.assertEqual(samples[-1], 2)
+
+    def test_stale_reads_do_not_query(self):
+        """Testa que leituras com dados vencidos não consultam o banco"""
+        buffers = TrendBuffers(sync_seconds=0, background=False)
+        buffers.establishment_lots(self.lot.establishment_id)
+        buffers.lot_series(self.lot.id, self.now)
+
+        with self.assertNumQueries(0):
+            lots = buffers.establishment_lots(self.lot.establishment_id)
+            buffers.lot_series(self.lot.id, self.now)
+
+        self.assertEqual(lots, {self.lot.id: 2})
+
+    def test_refresh_does_not_undo_newer_ingestion(self):
+        """Testa que histórico antigo lido depois não desfaz mudança mais nova"""
+        self.buffers.lot_series(self.lot.id, self.now)
+        self.create_slot_status_history(
+            slot=self.slot_a,
+            status="OCCUPIED",
+            recorded_at=self.now - timedelta(minutes=5),
+        )
+        self.buffers.record(self.lot.id, self.slot_a.id, "FREE", self.now)
+
+        self.buffers.refresh()
+        _, samples = self.buffers.lot_series(self.lot.id, self.now)
+
+        self.assertEqual(samples[-1], 1)
+
+    def test_refresh_reloads_expired_capacities(self):
+        """Testa que a atualização recarrega as capacidades vencidas"""
+        self.buffers.establishment_lots(self.lot.establishment_id)
+        self.create_slot(lot=self.lot, slot_code="C1")
+
+        with patch("apps.catalog.trends.LOTS_REFRESH_SECONDS", 0):
+            self.buffers.refresh()
+
+        lots = self.buffers.establishment_lots(self.lot.establishment_id)
+        self.assertEqual(lots, {self.lot.id: 3})
+
+    def test_ingestion_records_after_commit(self):
+        """Testa que a ingestão alimenta o buffer só após o commit"""
+        self.buffers.lot_series(self.lot.id, self.now)
+        history = self.create_slot_status_history(slot=self.slot_a, status="OCCUPIED")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.buffers.record_on_commit(history)
+
+        _, samples = self.buffers.lot_series(self.lot.id)
+        self.assertEqual(samples[-1], 2)
+
+
+class PublicOccupancyTrendViewTest(APITestCase, TrendDataMixin):
+    """Testes para public_occupancy_trend_view"""
+
+    def setUp(self):
+        self.create_scenario()
+        trends.clear()
+        self.addCleanup(trends.clear)
+
+    def test_trend(self):
+        """Testa a tendência dos lotes do estabelecimento"""
+        url = reverse(
+            "catalog:public-occupancy-trend",
+            kwargs={"establishment_id": self.lot.establishment_id},
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["resolution_seconds"], 60)
+        result = response.data["results"][0]
+        self.assertEqual(result["lot_id"], self.lot.id)
+        self.assertEqual(result["capacity"], 2)
+        self.assertEqual(len(result["samples"]), 120)
+
+    def test_unknown_establishment(self):
+        """Testa estabelecimento inexistente"""
+        url = reverse(
+            "catalog:public-occupancy-trend", kwargs={"establishment_id": 99999}
+        )
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
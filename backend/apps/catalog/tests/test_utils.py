@@ -1,5 +1,9 @@
+from datetime import datetime
+from itertools import count
+
 from model_bakery import baker
 from django.contrib.auth.models import User, Group
+from apps.core.partitioning import local_timezone
 from apps.tenants.models import Clients
 from apps.catalog.models import (
     StoreTypes,
@@ -12,6 +16,15 @@ from apps.catalog.models import (
     SlotStatusHistory,
 )
 
+# Códigos sequenciais: códigos aleatórios repetidos no mesmo lote quebram a
+# constraint (lot, slot_code)
+SLOT_CODES = count(1)
+
+
+def local(hour, minute=0, day=10, month=3):
+    """Instante de 2025 no fuso local (settings.TIME_ZONE)"""
+    return datetime(2025, month, day, hour, minute, tzinfo=local_timezone())
+
 
 class TestDataMixin:
     """Mixin com métodos auxiliares para criar dados de teste"""
@@ -105,7 +118,7 @@ class TestDataMixin:
             "lot": lot,
             "client": client or lot.client,
             "slot_type": slot_type or cls.create_slot_type(),
-            "slot_code": slot_code or f"S{baker.random_gen.gen_integer(1, 999)}",
+            "slot_code": slot_code or f"S{next(SLOT_CODES)}",
             "polygon_json": {"coordinates": [[0, 0], [1, 0], [1, 1], [0, 1]]},
             "active": True,
             **kwargs,
@@ -131,7 +144,7 @@ class TestDataMixin:
 
     @classmethod
     def create_slot_status_history(
-        cls, slot=None, status="FREE", vehicle_type=None, **kwargs
+        cls, slot=None, status="FREE", vehicle_type=None, recorded_at=None, **kwargs
     ):
         """Cria um histórico de status de vaga de teste"""
         data = {
@@ -141,7 +154,14 @@ class TestDataMixin:
             "confidence": 0.950,  # DecimalField(max_digits=4, decimal_places=3)
             **kwargs,
         }
-        return baker.make(SlotStatusHistory, **data)
+        history = baker.make(SlotStatusHistory, **data)
+        if recorded_at is not None:
+            # recorded_at é auto_now_add: o instante vai depois do insert
+            SlotStatusHistory.objects.filter(pk=history.pk).update(
+                recorded_at=recorded_at
+            )
+            history.recorded_at = recorded_at
+        return history
 
     @classmethod
     def create_admin_user(cls):
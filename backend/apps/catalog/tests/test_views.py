@@ -16,6 +16,7 @@ from apps.catalog.models import (
     SlotStatus,
     SlotStatusHistory,
 )
+from apps.catalog.facets import establishment_index
 from .test_utils import TestDataMixin
 
 User = get_user_model()
@@ -579,13 +580,109 @@ class SlotStatusHistoryViewTest(APITestCase, TestDataMixin):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["results"]), 1)
 
+    def test_filter_slot_status_history_by_time_range(self):
+        """Testa filtro from/to no histórico de status"""
+        from datetime import timedelta
+
+        old = self.create_slot_status_history(slot=self.slot, status="FREE")
+        recent = self.create_slot_status_history(slot=self.slot, status="OCCUPIED")
+        SlotStatusHistory.objects.filter(pk=old.pk).update(
+            recorded_at=timezone.now() - timedelta(days=40)
+        )
+        url = reverse("catalog:slot-status-history", kwargs={"slot_id": self.slot.id})
+
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        response = self.client.get(url, {"from": since})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], recent.id)
+
+        response = self.client.get(url, {"to": since})
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], old.id)
+
+    def test_filter_slot_status_history_invalid_time_range(self):
+        """Testa validação dos parâmetros from/to"""
+        url = reverse("catalog:slot-status-history", kwargs={"slot_id": self.slot.id})
+
+        response = self.client.get(url, {"from": "ontem"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(url, {"from": "2025-02-01", "to": "2025-01-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_slot_status_history_page_size_is_enforced(self):
+        """Testa que page_size respeita max_page_size"""
+        for _ in range(3):
+            self.create_slot_status_history(slot=self.slot)
+        url = reverse("catalog:slot-status-history", kwargs={"slot_id": self.slot.id})
+
+        response = self.client.get(url, {"page_size": 2, "count": "none"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertTrue(response.data["has_next"])
+        self.assertNotIn("count", response.data)
+
+    def test_export_slot_status_history_csv(self):
+        """Testa exportação em CSV do histórico de status"""
+        first = self.create_slot_status_history(slot=self.slot, status="FREE")
+        second = self.create_slot_status_history(slot=self.slot, status="OCCUPIED")
+        url = reverse(
+            "catalog:slot-status-history-export", kwargs={"slot_id": self.slot.id}
+        )
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn("slot-status-history.csv", response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("id,public_id,slot_id"))
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith(f"{first.id},"))
+        self.assertTrue(lines[2].startswith(f"{second.id},"))
+
+    def test_export_slot_status_history_ndjson_gzip(self):
+        """Testa exportação NDJSON compactada com gzip"""
+        import gzip
+        import json
+
+        self.create_slot_status_history(slot=self.slot, status="OCCUPIED")
+        url = reverse(
+            "catalog:slot-status-history-export", kwargs={"slot_id": self.slot.id}
+        )
+
+        response = self.client.get(url, {"export_format": "ndjson", "compress": "gzip"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["status"], "OCCUPIED")
+        self.assertEqual(rows[0]["slot__slot_code"], self.slot.slot_code)
+
+    def test_export_slot_status_history_invalid_format(self):
+        """Testa formato de exportação inválido"""
+        url = reverse(
+            "catalog:slot-status-history-export", kwargs={"slot_id": self.slot.id}
+        )
+
+        response = self.client.get(url, {"export_format": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class PublicAPIViewsTest(APITestCase, TestDataMixin):
     """Testes para endpoints públicos"""
 
     def setUp(self):
         # Public endpoints don't require authentication
-        pass
+        # O índice de estabelecimentos é global do processo
+        establishment_index.clear()
+        self.addCleanup(establishment_index.clear)
 
     def test_public_establishments_list(self):
         """Testa listagem pública de estabelecimentos"""
@@ -0,0 +1,275 @@
+"""
+Tendência de ocupação recente por lote, em memória (sparklines).
+
+Cada processo mantém, por lote, um buffer circular com a quantidade de vagas
+ocupadas em cada minuto das últimas 2 horas (array de inteiros de 16 bits).
+Na primeira leitura de um lote o buffer é montado a partir do histórico
+recente; depois ele é alimentado pela ingestão de status (neste processo) e
+por uma atualização em segundo plano, que lê o histórico gravado por outros
+processos (índice (lot, recorded_at, id)) e as capacidades dos lotes.
+
+Leituras são só consultas em memória: quando os dados passam de
+`sync_seconds`, a leitura dispara (no máximo uma por vez) a atualização em
+uma thread, que consulta o banco sem segurar o lock e só o pega para aplicar
+o resultado.
+"""
+
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connections, transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import Establishments, Lots, Slots, SlotStatusHistory
+
+OCCUPIED_STATUS = "OCCUPIED"
+
+RESOLUTION_SECONDS = 60
+WINDOW_SECONDS = 2 * 3600
+# Intervalo mínimo entre leituras do histórico gravado por outros processos
+SYNC_SECONDS = 60
+# Validade da lista de lotes (e capacidades) de cada estabelecimento
+LOTS_REFRESH_SECONDS = 300
+
+
+class LotTrend:
+    """Buffer circular de amostras de um lote"""
+
+    __slots__ = ("samples", "head", "occupied", "cursor", "changed_at")
+
+    def __init__(self, size, head, occupied):
+        self.occupied = occupied
+        self.samples = array("H", [min(len(occupied), 65535)]) * size
+        self.head = head
+        self.cursor = None
+        # Momento da última mudança aplicada de cada vaga
+        self.changed_at = {}
+
+    def advance(self, index):
+        """Avança até o minuto `index`, repetindo a ocupação atual"""
+        if index <= self.head:
+            return
+        size = len(self.samples)
+        count = min(len(self.occupied), 65535)
+        for position in range(max(self.head + 1, index - size + 1), index + 1):
+            self.samples[position % size] = count
+        self.head = index
+
+    def set_status(self, slot_id, status, moment):
+        """Aplica a mudança, a menos que a vaga já tenha uma mais recente"""
+        if moment < self.changed_at.get(slot_id, moment):
+            return
+        self.changed_at[slot_id] = moment
+        if status == OCCUPIED_STATUS:
+            self.occupied.add(slot_id)
+        else:
+            self.occupied.discard(slot_id)
+        self.samples[self.head % len(self.samples)] = min(len(self.occupied), 65535)
+
+    def series(self):
+        """Amostras da mais antiga para a mais recente"""
+        size = len(self.samples)
+        start = (self.head + 1) % size
+        return self.samples[start:].tolist() + self.samples[:start].tolist()
+
+
+class TrendBuffers:
+    """
+    Buffers de tendência de todos os lotes do processo
+    """
+
+    def __init__(
+        self,
+        resolution=RESOLUTION_SECONDS,
+        window=WINDOW_SECONDS,
+        sync_seconds=SYNC_SECONDS,
+        background=True,
+    ):
+        self.resolution = resolution
+        self.size = window // resolution
+        self.sync_seconds = sync_seconds
+        # Sem `background`, só `refresh()` (chamado por fora) atualiza
+        self.background = background
+        self.lock = threading.Lock()
+        self.refreshing = False
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.lots = {}
+            self.establishments = {}
+            self.refreshed_at = time.monotonic()
+
+    def index(self, moment):
+        return int(moment.timestamp()) // self.resolution
+
+    def record(self, lot_id, slot_id, status, moment):
+        """Aplica uma mudança de status recebida pela ingestão"""
+        with self.lock:
+            trend = self.lots.get(lot_id)
+            if trend is None:
+                # Lote ainda não lido neste processo: será montado do histórico
+                return
+            trend.advance(self.index(moment))
+            trend.set_status(slot_id, status, moment)
+
+    def record_on_commit(self, history):
+        """Agenda `record` para depois do commit da mudança de status"""
+        transaction.on_commit(
+            lambda: self.record(
+                history.lot_id, history.slot_id, history.status, history.recorded_at
+            )
+        )
+
+    def lot_series(self, lot_id, now=None):
+        """(início da primeira amostra, amostras) do lote"""
+        now = now or timezone.now()
+        with self.lock:
+            trend = self.lots.get(lot_id)
+        if trend is None:
+            # Primeira leitura do lote neste processo
+            trend = self.load(lot_id, now)
+            with self.lock:
+                trend = self.lots.setdefault(lot_id, trend)
+
+        with self.lock:
+            trend.advance(self.index(now))
+            start = (trend.head - self.size + 1) * self.resolution
+            series = trend.series()
+        self.refresh_if_stale()
+        return datetime.fromtimestamp(start, tz=dt_timezone.utc), series
+
+    def establishment_lots(self, establishment_id):
+        """{lote: capacidade} do estabelecimento (ou None se não existir)"""
+        with self.lock:
+            cached = self.establishments.get(establishment_id)
+        if cached is None:
+            capacities = self.load_capacities(establishment_id)
+            if capacities is None:
+                return None
+            with self.lock:
+                cached = self.establishments.setdefault(
+                    establishment_id, (time.monotonic(), capacities)
+                )
+        self.refresh_if_stale()
+        return cached[1]
+
+    def refresh_if_stale(self):
+        """Dispara a atualização em segundo plano, se já passou da hora"""
+        if not self.background:
+            return
+        with self.lock:
+            if (
+                self.refreshing
+                or time.monotonic() - self.refreshed_at < self.sync_seconds
+            ):
+                return
+            self.refreshing = True
+        threading.Thread(
+            target=self.refresh_in_background, name="trends", daemon=True
+        ).start()
+
+    def refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            # A thread tem as próprias conexões; não as deixa abertas
+            connections.close_all()
+            with self.lock:
+                self.refreshing = False
+
+    def refresh(self):
+        """
+        Lê o histórico novo de cada lote e as capacidades vencidas
+
+        As consultas rodam sem o lock; ele só é usado para copiar os cursores
+        e para aplicar o resultado.
+        """
+        with self.lock:
+            cursors = {lot_id: trend.cursor for lot_id, trend in self.lots.items()}
+            expired = [
+                establishment_id
+                for establishment_id, (loaded_at, _) in self.establishments.items()
+                if time.monotonic() - loaded_at >= LOTS_REFRESH_SECONDS
+            ]
+
+        for lot_id, cursor in cursors.items():
+            rows = self.fetch(lot_id, cursor)
+            with self.lock:
+                trend = self.lots.get(lot_id)
+                if trend is not None:
+                    self.apply(trend, rows)
+
+        for establishment_id in expired:
+            capacities = self.load_capacities(establishment_id)
+            with self.lock:
+                if capacities is None:
+                    self.establishments.pop(establishment_id, None)
+                else:
+                    self.establishments[establishment_id] = (
+                        time.monotonic(),
+                        capacities,
+                    )
+
+        with self.lock:
+            self.refreshed_at = time.monotonic()
+
+    def load_capacities(self, establishment_id):
+        if not Establishments.objects.filter(id=establishment_id).exists():
+            return None
+        return dict(
+            Lots.objects.filter(establishment_id=establishment_id)
+            .annotate(
+                capacity=Count(
+                    "slots",
+                    filter=Q(slots__active=True, slots__deleted_at__isnull=True),
+                )
+            )
+            .order_by("lot_code", "id")
+            .values_list("id", "capacity")
+        )
+
+    def load(self, lot_id, now):
+        """Monta o buffer do lote a partir do histórico da janela"""
+        start = now - timedelta(seconds=self.size * self.resolution)
+        status_at_start = Subquery(
+            SlotStatusHistory.objects.filter(
+                slot_id=OuterRef("pk"), recorded_at__lt=start
+            )
+            .order_by("-recorded_at", "-id")
+            .values("status")[:1]
+        )
+        occupied = set(
+            Slots.objects.filter(lot_id=lot_id)
+            .annotate(status_at_start=status_at_start)
+            .filter(status_at_start=OCCUPIED_STATUS)
+            .values_list("id", flat=True)
+        )
+        trend = LotTrend(self.size, self.index(start), occupied)
+        trend.cursor = (start, 0)
+        self.apply(trend, self.fetch(lot_id, trend.cursor))
+        return trend
+
+    def fetch(self, lot_id, cursor):
+        """Histórico do lote gravado depois do cursor (também de outros processos)"""
+        moment, last_id = cursor
+        return list(
+            SlotStatusHistory.objects.filter(lot_id=lot_id)
+            .filter(Q(recorded_at__gt=moment) | Q(recorded_at=moment, id__gt=last_id))
+            .order_by("recorded_at", "id")
+            .values_list("id", "slot_id", "status", "recorded_at")
+        )
+
+    def apply(self, trend, rows):
+        for row_id, slot_id, status, recorded_at in rows:
+            if (recorded_at, row_id) <= trend.cursor:
+                continue
+            trend.advance(self.index(recorded_at))
+            trend.set_status(slot_id, status, recorded_at)
+            trend.cursor = (recorded_at, row_id)
+
+
+trends = TrendBuffers()
@@ -15,6 +15,13 @@ urlpatterns = [
     path('lots/', views.LotListCreateView.as_view(), name='lot-list'),
     path('lots/<int:pk>/', views.LotDetailView.as_view(), name='lot-detail'),
     
+    # Ocupação agregada (rollups)
+    path('lots/<int:lot_id>/occupancy/', views.OccupancySeriesView.as_view(), name='lot-occupancy'),
+    path('establishments/<int:establishment_id>/occupancy/', views.OccupancySeriesView.as_view(), name='establishment-occupancy'),
+    path('lots/<int:lot_id>/status-as-of/', views.SlotStatusAsOfView.as_view(), name='lot-status-as-of'),
+    path('establishments/<int:establishment_id>/status-as-of/', views.SlotStatusAsOfView.as_view(), name='establishment-status-as-of'),
+    path('lots/<int:lot_id>/heatmap/', views.SlotHeatmapView.as_view(), name='lot-heatmap'),
+    
     # Vagas
     path('lots/<int:lot_id>/slots/', views.SlotListCreateView.as_view(), name='slot-list'),
     path('slots/<int:pk>/', views.SlotDetailView.as_view(), name='slot-detail'),
@@ -28,8 +35,15 @@ urlpatterns = [
     # Status das vagas
     path('slot-status/<int:pk>/', views.SlotStatusDetailView.as_view(), name='slot-status-detail'),
     path('slots/<int:slot_id>/history/', views.SlotStatusHistoryListView.as_view(), name='slot-status-history'),
+    path('slots/<int:slot_id>/history/export/', views.SlotStatusHistoryExportView.as_view(), name='slot-status-history-export'),
+    path('lots/<int:lot_id>/history/', views.SlotStatusHistoryFeedView.as_view(), name='lot-status-history'),
+    path('establishments/<int:establishment_id>/history/', views.SlotStatusHistoryFeedView.as_view(), name='establishment-status-history'),
     
     # Endpoints públicos
     path('public/establishments/', views.public_establishments_view, name='public-establishments'),
     path('public/establishments/<int:establishment_id>/slots/', views.public_slot_status_view, name='public-slot-status'),
+    path('public/establishments/<int:establishment_id>/forecast/', views.public_occupancy_forecast_view, name='public-occupancy-forecast'),
+    path('public/establishments/<int:establishment_id>/trend/', views.public_occupancy_trend_view, name='public-occupancy-trend'),
+    path('public/regions/', views.public_state_occupancy_view, name='public-state-occupancy'),
+    path('public/regions/<str:state>/cities/', views.public_city_occupancy_view, name='public-city-occupancy'),
 ]
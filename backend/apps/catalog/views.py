@@ -1,8 +1,12 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
 from django.db.models import Q
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
@@ -15,7 +19,17 @@ from .models import (
     VehicleTypes,
     SlotStatus,
     SlotStatusHistory,
+    OccupancyRollups,
+    OccupancyProfiles,
 )
+from .rollups import RESOLUTIONS, occupancy_series
+from .point_in_time import lot_status_as_of
+from .history_series import slot_history_series
+from .forecast import forecast
+from .heatmap import cached_slot_heatmap
+from .trends import trends
+from .regions import city_occupancy, record_status_change, state_occupancy
+from .facets import FACETS, establishment_index
 from .serializers import (
     StoreTypeSerializer,
     EstablishmentSerializer,
@@ -26,14 +40,23 @@ from .serializers import (
     SlotStatusSerializer,
     SlotStatusHistorySerializer,
     SlotStatusUpdateSerializer,
+    SlotStatusHistoryFeedSerializer,
 )
 from apps.core.permissions import IsClientAdminForClient, IsClientMember
+from apps.core.pagination import (
+    COUNT_MODE_ESTIMATED,
+    KeysetPagination,
+    StandardResultsPagination,
+)
+from apps.core.retention import bucket_start
+from apps.core.export import StreamingExportMixin
 from apps.core.views import (
     TenantViewSetMixin,
     BaseViewSetMixin,
     SearchMixin,
     PaginationMixin,
     FilterByClientMixin,
+    TimeRangeFilterMixin,
 )
 
 
@@ -330,6 +353,7 @@ class SlotStatusDetailView(generics.RetrieveUpdateAPIView):
         serializer = SlotStatusUpdateSerializer(data=request.data)
 
         if serializer.is_valid():
+            previous_status = slot_status.status
             # Atualizar o status
             slot_status.status = serializer.validated_data["status"]
             slot_status.changed_at = timezone.now()
@@ -347,12 +371,14 @@ class SlotStatusDetailView(generics.RetrieveUpdateAPIView):
             slot_status.save()
 
             # Criar entrada no histórico
-            SlotStatusHistory.objects.create(
+            history = SlotStatusHistory.objects.create(
                 slot=slot_status.slot,
                 status=slot_status.status,
                 vehicle_type=slot_status.vehicle_type,
                 confidence=slot_status.confidence,
             )
+            trends.record_on_commit(history)
+            record_status_change(slot_status.slot, previous_status, history.status)
 
             return Response(SlotStatusSerializer(slot_status).data)
 
@@ -361,14 +387,70 @@ class SlotStatusDetailView(generics.RetrieveUpdateAPIView):
 
 @extend_schema(
     summary="List slot status history",
-    description="Retrieve paginated history of status changes for a specific slot",
+    description=(
+        "Retrieve paginated history of status changes for a specific slot. "
+        "Use `from`/`to` (ISO 8601) to bound the time range. With "
+        "`bucket=minute|hour|day` the response is a downsampled series instead, "
+        "one item per bucket with `dominant_status`, `occupied_fraction` "
+        "(fraction of the bucket time) and `transitions`."
+    ),
     tags=["Tenants - Slot Status History"],
 )
-class SlotStatusHistoryListView(SearchMixin, PaginationMixin, generics.ListAPIView):
+class SlotStatusHistoryListView(
+    TimeRangeFilterMixin, SearchMixin, PaginationMixin, generics.ListAPIView
+):
     queryset = SlotStatusHistory.objects.all()
     serializer_class = SlotStatusHistorySerializer
     permission_classes = [IsClientMember]
     search_fields = ["status", "event_id"]
+    count_mode = COUNT_MODE_ESTIMATED
+    time_range_field = "recorded_at"
+    bucket_param = "bucket"
+    # Janela padrão da série quando `from` não é informado
+    bucket_windows = {
+        "minute": timedelta(hours=6),
+        "hour": timedelta(days=7),
+        "day": timedelta(days=90),
+    }
+    max_buckets = 2000
+
+    def list(self, request, *args, **kwargs):
+        bucket = request.query_params.get(self.bucket_param)
+        if not bucket:
+            return super().list(request, *args, **kwargs)
+        if bucket not in RESOLUTIONS:
+            raise ValidationError(
+                {
+                    self.bucket_param: (
+                        f"Intervalo inválido. Use: {', '.join(RESOLUTIONS)}."
+                    )
+                }
+            )
+
+        slot = get_object_or_404(
+            Slots.objects.for_user(request.user), pk=self.kwargs["slot_id"]
+        )
+        start, end = self.get_time_range()
+        end = end or timezone.now()
+        start = start or end - self.bucket_windows[bucket]
+        if start >= end:
+            raise ValidationError({"from": "Deve ser anterior ao fim do intervalo."})
+        if (end - start).total_seconds() / RESOLUTIONS[bucket] > self.max_buckets:
+            raise ValidationError(
+                {
+                    self.bucket_param: (
+                        f"Intervalo muito longo para este agrupamento "
+                        f"(máximo de {self.max_buckets} intervalos)."
+                    )
+                }
+            )
+
+        return Response(
+            {
+                "bucket": bucket,
+                "results": list(slot_history_series(slot.id, bucket, start, end)),
+            }
+        )
 
     def get_queryset(self):
         """Override to ensure SearchMixin is called and filter by client and slot"""
@@ -389,55 +471,393 @@ class SlotStatusHistoryListView(SearchMixin, PaginationMixin, generics.ListAPIVi
         return apply_search_filter(self, queryset)
 
 
+@extend_schema(
+    summary="Export slot status history",
+    description=(
+        "Stream the status history of a slot as CSV (default) or NDJSON "
+        "(`export_format=ndjson` or `Accept: application/x-ndjson`), optionally "
+        "gzip-compressed (`compress=gzip`). "
+        "Accepts the same `from`/`to` and `search` filters as the list endpoint."
+    ),
+    tags=["Tenants - Slot Status History"],
+    responses={(200, "text/csv"): str, (200, "application/x-ndjson"): str},
+)
+class SlotStatusHistoryExportView(StreamingExportMixin, SlotStatusHistoryListView):
+    export_fields = [
+        "id",
+        "public_id",
+        "slot_id",
+        "slot__slot_code",
+        "status",
+        "vehicle_type__name",
+        "confidence",
+        "event_id",
+        "recorded_at",
+    ]
+    export_ordering = ["recorded_at", "id"]
+    export_filename = "slot-status-history"
+
+
+@extend_schema(
+    summary="Occupancy series",
+    description=(
+        "Occupancy of a lot (or establishment) from the precomputed rollups. "
+        "`resolution` is `minute`, `hour` (default) or `day`; `from`/`to` "
+        "(ISO 8601) bound the series. `slot_type` restricts to one slot type. "
+        "`avg_occupied` is the average number of occupied slots in the bucket."
+    ),
+    tags=["Tenants - Occupancy"],
+    responses={
+        200: {
+            "type": "object",
+            "properties": {
+                "resolution": {"type": "string"},
+                "capacity": {"type": "integer"},
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "bucket_start": {"type": "string", "format": "date-time"},
+                            "avg_occupied": {"type": "number"},
+                            "occupancy_rate": {"type": "number", "nullable": True},
+                            "peak_occupied": {"type": "integer"},
+                            "change_count": {"type": "integer"},
+                            "avg_confidence": {"type": "number", "nullable": True},
+                        },
+                    },
+                },
+            },
+        }
+    },
+)
+class OccupancySeriesView(TimeRangeFilterMixin, generics.GenericAPIView):
+    permission_classes = [IsClientMember]
+    resolution_param = "resolution"
+    default_resolution = "hour"
+    # Janela padrão quando `from` não é informado
+    default_windows = {
+        "minute": timedelta(hours=6),
+        "hour": timedelta(days=7),
+        "day": timedelta(days=365),
+    }
+    max_buckets = 2000
+
+    def get_scope(self):
+        """Retorna (filtro dos rollups, filtro das vagas) do lote/estabelecimento"""
+        if "lot_id" in self.kwargs:
+            lot = get_object_or_404(
+                Lots.objects.for_user(self.request.user), pk=self.kwargs["lot_id"]
+            )
+            return {"lot": lot}, {"lot": lot}
+        establishment = get_object_or_404(
+            Establishments.objects.for_user(self.request.user),
+            pk=self.kwargs["establishment_id"],
+        )
+        return {"establishment": establishment}, {"lot__establishment": establishment}
+
+    def get(self, request, *args, **kwargs):
+        resolution = request.query_params.get(
+            self.resolution_param, self.default_resolution
+        )
+        if resolution not in RESOLUTIONS:
+            raise ValidationError(
+                {
+                    self.resolution_param: (
+                        f"Resolução inválida. Use: {', '.join(RESOLUTIONS)}."
+                    )
+                }
+            )
+
+        start, end = self.get_time_range()
+        end = end or timezone.now()
+        start = start or end - self.default_windows[resolution]
+        if start >= end:
+            raise ValidationError({"from": "Deve ser anterior ao fim do intervalo."})
+        if (end - start).total_seconds() / RESOLUTIONS[resolution] > self.max_buckets:
+            raise ValidationError(
+                {
+                    self.resolution_param: (
+                        f"Intervalo muito longo para esta resolução "
+                        f"(máximo de {self.max_buckets} intervalos)."
+                    )
+                }
+            )
+
+        rollup_filter, slot_filter = self.get_scope()
+        rollups = OccupancyRollups.objects.filter(**rollup_filter)
+        slots = Slots.objects.filter(active=True, **slot_filter)
+        slot_type = request.query_params.get("slot_type")
+        if slot_type:
+            if not slot_type.isdigit():
+                raise ValidationError({"slot_type": "Informe o ID do tipo de vaga."})
+            rollups = rollups.filter(slot_type_id=slot_type)
+            slots = slots.filter(slot_type_id=slot_type)
+        capacity = slots.count()
+
+        results = []
+        for row in occupancy_series(rollups, resolution, start, end):
+            row["occupancy_rate"] = row["avg_occupied"] / capacity if capacity else None
+            results.append(row)
+
+        return Response(
+            {"resolution": resolution, "capacity": capacity, "results": results}
+        )
+
+
+class LotScopeMixin:
+    """Lotes da URL: o lote (`lot_id`) ou os do estabelecimento (`establishment_id`)"""
+
+    def get_lots(self):
+        if "lot_id" in self.kwargs:
+            return [
+                get_object_or_404(
+                    Lots.objects.for_user(self.request.user), pk=self.kwargs["lot_id"]
+                )
+            ]
+        establishment = get_object_or_404(
+            Establishments.objects.for_user(self.request.user),
+            pk=self.kwargs["establishment_id"],
+        )
+        return list(establishment.lots.order_by("lot_code", "id"))
+
+
+@extend_schema(
+    summary="Slot status as of a point in time",
+    description=(
+        "Status of every slot of a lot (or establishment) at the instant `at` "
+        "(ISO 8601, default: now), rebuilt from the status history and the "
+        "periodic lot snapshots. Slots with no known status have `status` null."
+    ),
+    tags=["Tenants - Occupancy"],
+    responses={
+        200: {
+            "type": "object",
+            "properties": {
+                "at": {"type": "string", "format": "date-time"},
+                "counts": {"type": "object"},
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "slot_id": {"type": "integer"},
+                            "slot_code": {"type": "string"},
+                            "slot_type_id": {"type": "integer"},
+                            "lot_id": {"type": "integer"},
+                            "status": {"type": "string", "nullable": True},
+                            "vehicle_type_id": {"type": "integer", "nullable": True},
+                            "since": {
+                                "type": "string",
+                                "format": "date-time",
+                                "nullable": True,
+                            },
+                        },
+                    },
+                },
+            },
+        }
+    },
+)
+class SlotStatusAsOfView(LotScopeMixin, TimeRangeFilterMixin, generics.GenericAPIView):
+    permission_classes = [IsClientMember]
+    at_param = "at"
+
+    def get(self, request, *args, **kwargs):
+        moment = self.parse_time_param(self.at_param) or timezone.now()
+
+        results = []
+        for lot in self.get_lots():
+            _, slots = lot_status_as_of(lot, moment)
+            results.extend(slots)
+
+        counts = {}
+        for row in results:
+            key = row["status"] or "UNKNOWN"
+            counts[key] = counts.get(key, 0) + 1
+        return Response({"at": moment, "counts": counts, "results": results})
+
+
+@extend_schema(
+    summary="Lot status history feed",
+    description=(
+        "Status changes of all slots of a lot (or establishment), newest first, "
+        "with keyset pagination: follow `next` (or pass `cursor`) for older "
+        "changes. Use `from`/`to` (ISO 8601) to bound the time range."
+    ),
+    tags=["Tenants - Slot Status History"],
+    responses=SlotStatusHistoryFeedSerializer(many=True),
+)
+class SlotStatusHistoryFeedView(
+    LotScopeMixin, TimeRangeFilterMixin, generics.GenericAPIView
+):
+    queryset = SlotStatusHistory.objects.all()
+    serializer_class = SlotStatusHistoryFeedSerializer
+    permission_classes = [IsClientMember]
+    pagination_class = KeysetPagination
+    page_size = 50
+    max_page_size = 200
+    page_size_param = "page_size"
+    keyset_fields = ("recorded_at", "id")
+    time_range_field = "recorded_at"
+
+    def get(self, request, *args, **kwargs):
+        # Um queryset por lote: cada um segue o índice (lot, recorded_at, id)
+        # e a paginação mescla as páginas em ordem
+        querysets = [
+            self.filter_time_range(self.queryset.filter(lot=lot).select_related("slot"))
+            for lot in self.get_lots()
+        ]
+        page = self.paginate_queryset(querysets)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+@extend_schema(
+    summary="Slot heatmap",
+    description=(
+        "Per-slot utilization (fraction of the time occupied) and turnover "
+        "(arrivals) of a lot between `from` and `to` (ISO 8601, default: last "
+        "7 days), with each slot's polygon for rendering a heatmap."
+    ),
+    tags=["Tenants - Occupancy"],
+    responses={
+        200: {
+            "type": "object",
+            "properties": {
+                "from": {"type": "string", "format": "date-time"},
+                "to": {"type": "string", "format": "date-time"},
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "slot_id": {"type": "integer"},
+                            "slot_code": {"type": "string"},
+                            "polygon_json": {"type": "object"},
+                            "active": {"type": "boolean"},
+                            "utilization": {"type": "number"},
+                            "turnover": {"type": "integer"},
+                            "transitions": {"type": "integer"},
+                        },
+                    },
+                },
+            },
+        }
+    },
+)
+class SlotHeatmapView(TimeRangeFilterMixin, generics.GenericAPIView):
+    permission_classes = [IsClientMember]
+    default_window = timedelta(days=7)
+    max_window = timedelta(days=92)
+    # O fim padrão é arredondado para reaproveitar o cache entre requisições
+    default_end_step = 300
+
+    def get(self, request, *args, **kwargs):
+        lot = get_object_or_404(
+            Lots.objects.for_user(request.user), pk=self.kwargs["lot_id"]
+        )
+        start, end = self.get_time_range()
+        end = end or bucket_start(timezone.now(), self.default_end_step)
+        start = start or end - self.default_window
+        if start >= end:
+            raise ValidationError({"from": "Deve ser anterior ao fim do intervalo."})
+        if end - start > self.max_window:
+            raise ValidationError(
+                {"from": f"Intervalo máximo de {self.max_window.days} dias."}
+            )
+
+        return Response(
+            {"from": start, "to": end, "results": cached_slot_heatmap(lot, start, end)}
+        )
+
+
+PUBLIC_ESTABLISHMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+        "store_type": {"type": "string", "nullable": True},
+        "address": {"type": "string"},
+        "city": {"type": "string"},
+        "state": {"type": "string"},
+        "lat": {"type": "number", "format": "float"},
+        "lng": {"type": "number", "format": "float"},
+    },
+}
+FACET_COUNTS_SCHEMA = {"type": "object", "additionalProperties": {"type": "integer"}}
+
+
 @extend_schema(
     tags=["Catalog - Public"],
     summary="List public establishments",
-    description="Public endpoint to list active establishments",
+    description=(
+        "Public endpoint to list active establishments. Filters (repeat a "
+        "parameter to accept several values): `store_type`, `city`, `state` "
+        "and `has_free` (true/false). With any filter, `limit` or `offset` the "
+        "response is paginated and includes the count of each facet value "
+        "under the other filters; otherwise it is the full list."
+    ),
     responses={
         200: {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "id": {"type": "integer"},
-                    "name": {"type": "string"},
-                    "store_type": {"type": "string", "nullable": True},
-                    "address": {"type": "string"},
-                    "city": {"type": "string"},
-                    "state": {"type": "string"},
-                    "lat": {"type": "number", "format": "float"},
-                    "lng": {"type": "number", "format": "float"},
+            "oneOf": [
+                {"type": "array", "items": PUBLIC_ESTABLISHMENT_SCHEMA},
+                {
+                    "type": "object",
+                    "properties": {
+                        "count": {"type": "integer"},
+                        "has_next": {"type": "boolean"},
+                        "next": {"type": "string", "nullable": True},
+                        "previous": {"type": "string", "nullable": True},
+                        "facets": {
+                            "type": "object",
+                            "properties": {
+                                "store_type": FACET_COUNTS_SCHEMA,
+                                "city": FACET_COUNTS_SCHEMA,
+                                "state": FACET_COUNTS_SCHEMA,
+                                "has_free": FACET_COUNTS_SCHEMA,
+                            },
+                        },
+                        "results": {
+                            "type": "array",
+                            "items": PUBLIC_ESTABLISHMENT_SCHEMA,
+                        },
+                    },
                 },
-            },
+            ]
         }
     },
 )
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def public_establishments_view(request):
-    """Endpoint público para listar estabelecimentos"""
-    establishments = Establishments.objects.filter(
-        client__onboarding_status="ACTIVE"
-    ).select_related("store_type", "client")
+    """Endpoint público para listar (e filtrar) estabelecimentos"""
+    filters = {
+        facet: request.query_params.getlist(facet)
+        for facet in FACETS
+        if request.query_params.getlist(facet)
+    }
+    has_free = request.query_params.get("has_free")
+    if has_free is not None:
+        if has_free.lower() not in ("true", "false", "1", "0"):
+            raise ValidationError({"has_free": "Use true ou false."})
+        has_free = has_free.lower() in ("true", "1")
 
-    data = []
-    for establishment in establishments:
-        data.append(
-            {
-                "id": establishment.id,
-                "name": establishment.name,
-                "store_type": (
-                    establishment.store_type.name if establishment.store_type else None
-                ),
-                "address": establishment.address,
-                "city": establishment.city,
-                "state": establishment.state,
-                "lat": establishment.lat,
-                "lng": establishment.lng,
-            }
-        )
+    rows, facets = establishment_index.search(filters, has_free)
 
-    return Response(data)
+    paginator = StandardResultsPagination()
+    if not (
+        filters
+        or has_free is not None
+        or {paginator.limit_query_param, paginator.offset_query_param}
+        & set(request.query_params)
+    ):
+        return Response(rows)
+
+    page = paginator.paginate_queryset(rows, request)
+    response = paginator.get_paginated_response(page)
+    response.data["facets"] = facets
+    return response
 
 
 @extend_schema(
@@ -508,3 +928,179 @@ def public_slot_status_view(request, establishment_id):
         )
 
     return Response(data)
+
+
+@extend_schema(
+    tags=["Catalog - Public"],
+    summary="Occupancy forecast for an establishment",
+    description=(
+        "Public endpoint with the expected occupancy of each lot and slot type "
+        "of an establishment at `at` (ISO 8601, default: now), from the "
+        "hour-of-week profiles rebuilt nightly."
+    ),
+    responses={
+        200: {
+            "type": "object",
+            "properties": {
+                "at": {"type": "string", "format": "date-time"},
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "lot_id": {"type": "integer"},
+                            "lot_code": {"type": "string"},
+                            "slot_type": {"type": "string"},
+                            "capacity": {"type": "integer"},
+                            "expected_occupied": {"type": "number"},
+                            "expected_free": {"type": "number"},
+                            "occupancy_rate": {"type": "number", "nullable": True},
+                        },
+                    },
+                },
+            },
+        }
+    },
+)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def public_occupancy_forecast_view(request, establishment_id):
+    """Endpoint público de previsão de ocupação de um estabelecimento"""
+    establishment = get_object_or_404(Establishments, id=establishment_id)
+
+    at = timezone.now()
+    if request.query_params.get("at"):
+        try:
+            at = parse_datetime(request.query_params["at"])
+        except ValueError:
+            at = None
+        if at is None:
+            raise ValidationError({"at": "Data/hora inválida. Use o formato ISO 8601."})
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+
+    profiles = (
+        OccupancyProfiles.objects.filter(lot__establishment=establishment)
+        .select_related("lot", "slot_type")
+        .order_by("lot__lot_code", "slot_type__name")
+    )
+
+    data = []
+    for profile in profiles:
+        expected, rate = forecast(profile, at)
+        data.append(
+            {
+                "lot_id": profile.lot_id,
+                "lot_code": profile.lot.lot_code,
+                "slot_type": profile.slot_type.name,
+                "capacity": profile.capacity,
+                "expected_occupied": expected,
+                "expected_free": max(profile.capacity - expected, 0),
+                "occupancy_rate": rate,
+            }
+        )
+
+    return Response({"at": at, "results": data})
+
+
+@extend_schema(
+    tags=["Catalog - Public"],
+    summary="Recent occupancy trend for an establishment",
+    description=(
+        "Public endpoint with the number of occupied slots of each lot, one "
+        "sample per minute over the last 2 hours (oldest first), for "
+        "sparklines. Served from an in-memory buffer."
+    ),
+    responses={
+        200: {
+            "type": "object",
+            "properties": {
+                "resolution_seconds": {"type": "integer"},
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "lot_id": {"type": "integer"},
+                            "capacity": {"type": "integer"},
+                            "start": {"type": "string", "format": "date-time"},
+                            "samples": {"type": "array", "items": {"type": "integer"}},
+                        },
+                    },
+                },
+            },
+        }
+    },
+)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def public_occupancy_trend_view(request, establishment_id):
+    """Endpoint público da ocupação recente (sparkline) de um estabelecimento"""
+    lots = trends.establishment_lots(establishment_id)
+    if lots is None:
+        raise Http404
+
+    data = []
+    for lot_id, capacity in lots.items():
+        start, samples = trends.lot_series(lot_id)
+        data.append(
+            {
+                "lot_id": lot_id,
+                "capacity": capacity,
+                "start": start,
+                "samples": samples,
+            }
+        )
+
+    return Response({"resolution_seconds": trends.resolution, "results": data})
+
+
+REGION_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "state": {"type": "string"},
+            "city": {"type": "string"},
+            "establishments": {"type": "integer"},
+            "total_slots": {"type": "integer"},
+            "free_slots": {"type": "integer"},
+            "lat": {"type": "number", "format": "float", "nullable": True},
+            "lng": {"type": "number", "format": "float", "nullable": True},
+        },
+    },
+}
+
+
+@extend_schema(
+    tags=["Catalog - Public"],
+    summary="Occupancy per state",
+    description=(
+        "Public endpoint with free and total slots and establishment counts "
+        "per state, for the zoomed-out map. Maintained incrementally and "
+        "cached for a few seconds."
+    ),
+    responses={200: REGION_SCHEMA},
+)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def public_state_occupancy_view(request):
+    """Endpoint público da ocupação agregada por estado"""
+    return Response(state_occupancy())
+
+
+@extend_schema(
+    tags=["Catalog - Public"],
+    summary="Occupancy per city of a state",
+    description=(
+        "Public endpoint with free and total slots and establishment counts "
+        "per city of a state. Maintained incrementally and cached for a few "
+        "seconds."
+    ),
+    responses={200: REGION_SCHEMA},
+)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def public_city_occupancy_view(request, state):
+    """Endpoint público da ocupação agregada por cidade de um estado"""
+    return Response(city_occupancy(state))
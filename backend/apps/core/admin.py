@@ -1,2 +1,24 @@
 # Este app core agora contém apenas configurações compartilhadas
-# Os models foram movidos para apps específicos e registrados em seus respectivos admin.py
\ No newline at end of file
+# Os models foram movidos para apps específicos e registrados em seus respectivos admin.py
+from django.contrib import admin
+from .models import RetentionPolicies
+
+# Importar o admin_site customizado
+from smartpark.admin import admin_site
+
+
+class RetentionPoliciesAdmin(admin.ModelAdmin):
+    list_display = [
+        "client",
+        "table",
+        "raw_retention_days",
+        "summary_interval",
+        "summary_retention_days",
+        "enabled",
+    ]
+    list_filter = ["table", "enabled", "client"]
+    search_fields = ["client__name"]
+    readonly_fields = ["created_at", "updated_at"]
+
+
+admin_site.register(RetentionPolicies, RetentionPoliciesAdmin)
@@ -0,0 +1,627 @@
+"""
+Arquivamento de eventos e histórico em arquivos colunares compactados.
+
+Layout em disco (um diretório por tabela, cliente e mês):
+
+    <root>/<tabela>/client_<id>/<AAAA-MM>/part-0001.spa
+
+Formato do arquivo (.spa):
+- MAGIC no início
+- Grupos de linhas: cada coluna do grupo é um bloco JSON compactado com zlib
+  (colunas de data/hora guardam microssegundos em delta, que comprimem bem)
+- Rodapé JSON com colunas, grupos (offset/tamanho/crc32 de cada bloco e
+  intervalo de tempo do grupo) e metadados, seguido do tamanho do rodapé e
+  do MAGIC
+
+A leitura usa mmap: só os blocos das colunas pedidas, nos grupos que cruzam o
+intervalo de tempo, são lidos e descompactados.
+
+A exportação usa cursor no servidor (QuerySet.iterator), em ordem de id, e
+grava um grupo a cada `chunk_size` linhas. As linhas só são removidas do
+banco depois que o arquivo é verificado.
+
+O que já foi arquivado é decidido pelos ids gravados nos arquivos do mês, e
+não por um id máximo: uma linha do mês que foi gravada no banco depois (com
+id menor que outras já arquivadas) entra na próxima execução. O rodapé de
+cada parte (e de cada grupo) traz as faixas de id e de tempo e o número de
+linhas; linhas fora das faixas de id são novas sem abrir nenhum grupo, e as
+de dentro são conferidas contra a coluna id, um grupo por vez (a memória não
+depende do tamanho do mês).
+"""
+
+import json
+import mmap
+import os
+import struct
+import uuid
+import zlib
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from apps.catalog.models import SlotStatusHistory
+from apps.core.partitioning import add_months, month_start
+from apps.events.models import SlotStatusEvents
+
+MAGIC = b"SPA1"
+FOOTER_STRUCT = struct.Struct("<I")
+FILE_SUFFIX = ".spa"
+
+DEFAULT_CHUNK_SIZE = 10000
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Tabela -> (modelo, coluna de tempo, caminho até o cliente)
+ARCHIVE_TARGETS = {
+    "slot_status_events": (SlotStatusEvents, "occurred_at", "client"),
+    "slot_status_history": (SlotStatusHistory, "recorded_at", "slot__client"),
+}
+
+
+class ArchiveError(Exception):
+    """Arquivo inválido ou verificação do arquivamento falhou"""
+
+
+def archive_root():
+    return Path(getattr(settings, "DATA_ARCHIVE", {}).get("root", "archive"))
+
+
+def month_directory(root, table, client_id, month):
+    return Path(root) / table / f"client_{client_id}" / f"{month:%Y-%m}"
+
+
+def column_kind(field):
+    """Tipo de codificação da coluna no arquivo"""
+    if isinstance(field, models.DateTimeField):
+        return "datetime"
+    if isinstance(field, models.DecimalField):
+        return "decimal"
+    if isinstance(field, models.UUIDField):
+        return "uuid"
+    return "json"
+
+
+def model_columns(model):
+    """Colunas (attname, tipo) de todos os campos concretos do modelo"""
+    return [
+        (field.attname, column_kind(field)) for field in model._meta.concrete_fields
+    ]
+
+
+def to_micros(value):
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def encode_column(kind, values):
+    """Converte os valores de uma coluna em lista serializável em JSON"""
+    if kind == "datetime":
+        encoded, previous = [], 0
+        for value in values:
+            if value is None:
+                encoded.append(None)
+                continue
+            micros = to_micros(value)
+            encoded.append(micros - previous)
+            previous = micros
+        return encoded
+    if kind in ("decimal", "uuid"):
+        return [None if value is None else str(value) for value in values]
+    return list(values)
+
+
+def decode_column(kind, values):
+    """Inverso de encode_column"""
+    if kind == "datetime":
+        decoded, previous = [], 0
+        for value in values:
+            if value is None:
+                decoded.append(None)
+                continue
+            previous += value
+            decoded.append(from_micros(previous))
+        return decoded
+    if kind == "decimal":
+        return [None if value is None else Decimal(value) for value in values]
+    if kind == "uuid":
+        return [None if value is None else uuid.UUID(value) for value in values]
+    return values
+
+
+class ArchiveWriter:
+    """
+    Grava um arquivo .spa de forma incremental
+
+    O conteúdo vai para um arquivo temporário; `close()` grava o rodapé,
+    faz fsync e só então renomeia para o caminho final.
+    """
+
+    def __init__(self, path, columns, time_column, metadata=None):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.columns = columns
+        names = [name for name, _ in columns]
+        self.time_index = names.index(time_column)
+        self.id_index = names.index("id") if "id" in names else None
+        self.metadata = metadata or {}
+        self.row_groups = []
+        self.rows = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.tmp_path, "wb")
+        self.file.write(MAGIC)
+
+    def write_rows(self, rows):
+        """Grava um grupo de linhas (tuplas na ordem de `columns`)"""
+        if not rows:
+            return
+        chunks = []
+        for (name, kind), values in zip(self.columns, zip(*rows)):
+            payload = zlib.compress(
+                json.dumps(encode_column(kind, values), separators=(",", ":")).encode()
+            )
+            chunks.append([self.file.tell(), len(payload), zlib.crc32(payload)])
+            self.file.write(payload)
+
+        times = [row[self.time_index] for row in rows]
+        group = {
+            "rows": len(rows),
+            "min_time": to_micros(min(times)),
+            "max_time": to_micros(max(times)),
+            "chunks": chunks,
+        }
+        if self.id_index is not None:
+            ids = [row[self.id_index] for row in rows]
+            group.update({"min_id": min(ids), "max_id": max(ids)})
+        self.row_groups.append(group)
+        self.rows += len(rows)
+
+    def ranges(self):
+        """Faixas de tempo (e de id) do arquivo inteiro, a partir dos grupos"""
+        ranges = {}
+        keys = ["min_time", "max_time"]
+        if self.id_index is not None:
+            keys += ["min_id", "max_id"]
+        for key in keys:
+            values = [group[key] for group in self.row_groups]
+            pick = min if key.startswith("min") else max
+            ranges[key] = pick(values) if values else None
+        return ranges
+
+    def close(self):
+        """Finaliza o arquivo e retorna o caminho final"""
+        footer = json.dumps(
+            {
+                "columns": self.columns,
+                "time_column": self.columns[self.time_index][0],
+                "rows": self.rows,
+                **self.ranges(),
+                "row_groups": self.row_groups,
+                "metadata": self.metadata,
+            },
+            separators=(",", ":"),
+        ).encode()
+        self.file.write(footer)
+        self.file.write(FOOTER_STRUCT.pack(len(footer)))
+        self.file.write(MAGIC)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        """Descarta o arquivo temporário"""
+        self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class ArchiveFile:
+    """Leitura de um arquivo .spa via mmap"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file = open(self.path, "rb")
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ArchiveError(f"Arquivo vazio: {self.path}")
+
+        tail = len(MAGIC) + FOOTER_STRUCT.size
+        if (
+            len(self.buffer) < len(MAGIC) + tail
+            or self.buffer[: len(MAGIC)] != MAGIC
+            or self.buffer[-len(MAGIC) :] != MAGIC
+        ):
+            self.close()
+            raise ArchiveError(f"Arquivo inválido: {self.path}")
+
+        (size,) = FOOTER_STRUCT.unpack_from(self.buffer, len(self.buffer) - tail)
+        footer_start = len(self.buffer) - tail - size
+        self.footer = json.loads(self.buffer[footer_start : footer_start + size])
+        self.columns = [tuple(column) for column in self.footer["columns"]]
+        self.time_column = self.footer["time_column"]
+        self.rows = self.footer["rows"]
+        self.metadata = self.footer["metadata"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    def read_chunk(self, chunk, verify=False):
+        offset, length, crc = chunk
+        payload = self.buffer[offset : offset + length]
+        if verify and zlib.crc32(payload) != crc:
+            raise ArchiveError(f"Checksum inválido em {self.path} (offset {offset})")
+        return json.loads(zlib.decompress(payload))
+
+    def verify(self):
+        """Confere checksums e quantidade de linhas de todos os grupos"""
+        total = 0
+        for group in self.footer["row_groups"]:
+            for chunk in group["chunks"]:
+                if len(self.read_chunk(chunk, verify=True)) != group["rows"]:
+                    raise ArchiveError(f"Coluna com tamanho inválido em {self.path}")
+            total += group["rows"]
+        if total != self.rows:
+            raise ArchiveError(f"Quantidade de linhas inválida em {self.path}")
+        return total
+
+    def column_groups(self, name):
+        """Valores da coluna `name`, uma lista por grupo de linhas"""
+        index = [column for column, _ in self.columns].index(name)
+        kind = self.columns[index][1]
+        for group in self.footer["row_groups"]:
+            yield decode_column(kind, self.read_chunk(group["chunks"][index]))
+
+    def iter_rows(self, start=None, end=None, columns=None):
+        """
+        Gera dicionários das linhas com `start <= tempo < end`
+
+        `columns` limita as colunas lidas (a coluna de tempo é sempre lida).
+        """
+        names = [name for name, _ in self.columns]
+        wanted = columns or names
+        needed = set(wanted) | {self.time_column}
+        start_micros = to_micros(start) if start else None
+        end_micros = to_micros(end) if end else None
+
+        for group in self.footer["row_groups"]:
+            if start_micros is not None and group["max_time"] < start_micros:
+                continue
+            if end_micros is not None and group["min_time"] >= end_micros:
+                continue
+
+            data = {}
+            for (name, kind), chunk in zip(self.columns, group["chunks"]):
+                if name in needed:
+                    data[name] = decode_column(kind, self.read_chunk(chunk))
+
+            times = data[self.time_column]
+            for index, moment in enumerate(times):
+                if start and moment < start:
+                    continue
+                if end and moment >= end:
+                    continue
+                yield {name: data[name][index] for name in wanted}
+
+
+def month_parts(root, table, client_id, month):
+    directory = month_directory(root, table, client_id, month)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f"part-*{FILE_SUFFIX}"))
+
+
+def month_manifest(root, table, client_id, month):
+    """
+    Partes já gravadas de um cliente em um mês, com as faixas de cada uma:
+    [{"path", "rows", "min_id", "max_id", "min_time", "max_time"}, ...]
+    """
+    manifest = []
+    for path in month_parts(root, table, client_id, month):
+        with ArchiveFile(path) as archive:
+            manifest.append(
+                {
+                    "path": path,
+                    "rows": archive.rows,
+                    **{
+                        key: archive.footer.get(key)
+                        for key in ("min_id", "max_id", "min_time", "max_time")
+                    },
+                }
+            )
+    return manifest
+
+
+class PartIds:
+    """
+    Consulta de ids em uma parte gravada em ordem de id
+
+    As consultas devem vir em ordem crescente: os grupos são percorridos uma
+    única vez e só o grupo atual fica descompactado em memória.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.id_index = [name for name, _ in archive.columns].index("id")
+        self.groups = iter(archive.footer["row_groups"])
+        self.group = next(self.groups, None)
+        self.ids = None
+        self.position = 0
+
+    def contains(self, value):
+        while self.group is not None and self.group["max_id"] < value:
+            self.group, self.ids = next(self.groups, None), None
+        if self.group is None or self.group["min_id"] > value:
+            return False
+        if self.ids is None:
+            self.ids = self.archive.read_chunk(self.group["chunks"][self.id_index])
+            self.position = 0
+        self.position = bisect_left(self.ids, value, self.position)
+        return self.position < len(self.ids) and self.ids[self.position] == value
+
+
+class ArchivedIds:
+    """
+    Ids já arquivados de um cliente em um mês (todas as partes)
+
+    `value in archived` deve ser consultado em ordem crescente de id.
+    """
+
+    def __init__(self, root, table, client_id, month):
+        self.manifest = month_manifest(root, table, client_id, month)
+        self.archives = [ArchiveFile(part["path"]) for part in self.manifest]
+        self.parts = [PartIds(archive) for archive in self.archives]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for archive in self.archives:
+            archive.close()
+
+    def __contains__(self, value):
+        return any(part.contains(value) for part in self.parts)
+
+    def covered(self):
+        """Filtro das linhas dentro da faixa de id de alguma parte"""
+        covered = Q(pk__in=[])  # sem partes, nenhuma linha
+        for part in self.manifest:
+            covered |= Q(id__range=(part["min_id"], part["max_id"]))
+        return covered
+
+
+def is_month_archived(root, table, client_id, month, queryset):
+    """
+    Se todas as linhas de `queryset` (já filtrado pelo mês) estão nos
+    arquivos do mês
+
+    Linhas fora das faixas de id das partes respondem sem ler os arquivos; só
+    as de dentro são conferidas contra a coluna id.
+    """
+    with ArchivedIds(root, table, client_id, month) as archived:
+        covered = archived.covered()
+        if queryset.exclude(covered).exists():
+            return False
+        ids = queryset.filter(covered).order_by("id").values_list("id", flat=True)
+        return all(value in archived for value in ids.iterator())
+
+
+def archived_until(table, client, before, root=None):
+    """
+    Até onde as linhas do cliente anteriores a `before` já estão arquivadas
+
+    Retorna o início do primeiro mês com linhas ainda fora dos arquivos, ou
+    `before` se todas já foram arquivadas.
+    """
+    model, time_field, client_lookup = ARCHIVE_TARGETS[table]
+    root = Path(root or archive_root())
+    base = model.objects.with_deleted().filter(
+        **{client_lookup: client, f"{time_field}__lt": before}
+    )
+    oldest = base.aggregate(oldest=Min(time_field))["oldest"]
+    if oldest is None:
+        return before
+
+    month = month_start(oldest)
+    while month < before:
+        queryset = base.filter(
+            **{
+                f"{time_field}__gte": month,
+                f"{time_field}__lt": add_months(month, 1),
+            }
+        )
+        if not is_month_archived(root, table, client.id, month, queryset):
+            return month
+        month = add_months(month, 1)
+    return before
+
+
+def scan_archive(table, start, end, client_id=None, columns=None, root=None):
+    """
+    Lê de volta as linhas arquivadas com `start <= tempo < end`
+
+    Só são abertos os diretórios dos meses do intervalo. Se `client_id` não
+    for informado, percorre todos os clientes.
+    """
+    root = Path(root or archive_root())
+    table_dir = root / table
+    if not table_dir.is_dir():
+        return
+
+    if client_id is not None:
+        client_dirs = [table_dir / f"client_{client_id}"]
+    else:
+        client_dirs = sorted(table_dir.glob("client_*"))
+
+    for client_dir in client_dirs:
+        month = month_start(start)
+        while month < end:
+            directory = client_dir / f"{month:%Y-%m}"
+            if directory.is_dir():
+                for path in sorted(directory.glob(f"part-*{FILE_SUFFIX}")):
+                    with ArchiveFile(path) as archive:
+                        yield from archive.iter_rows(start, end, columns)
+            month = add_months(month, 1)
+
+
+class Archiver:
+    """
+    Exporta meses inteiros de uma tabela para arquivos .spa, por cliente
+
+    Cada execução grava um novo `part-NNNN.spa` com as linhas do mês que
+    ainda não estão em nenhuma parte, então reexecuções são seguras.
+    """
+
+    def __init__(
+        self, root=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, now=None
+    ):
+        self.root = Path(root or archive_root())
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.now = now or timezone.now()
+
+    def cutoff(self, after_days):
+        """Início do primeiro mês que ainda fica no banco"""
+        return month_start(self.now - timedelta(days=after_days))
+
+    def archive_table(self, table, clients, after_days, delete=True):
+        """Arquiva a tabela para os clientes informados e retorna estatísticas"""
+        model, time_field, client_lookup = ARCHIVE_TARGETS[table]
+        cutoff = self.cutoff(after_days)
+        stats = {"files": 0, "rows": 0, "deleted": 0}
+
+        for client in clients:
+            base = model.objects.with_deleted().filter(**{client_lookup: client})
+            oldest = base.filter(**{f"{time_field}__lt": cutoff}).aggregate(
+                oldest=Min(time_field)
+            )["oldest"]
+            if oldest is None:
+                continue
+
+            month = month_start(oldest)
+            while month < cutoff:
+                result = self.archive_month(
+                    table, client.id, base, time_field, month, delete
+                )
+                stats["files"] += result["files"]
+                stats["rows"] += result["rows"]
+                stats["deleted"] += result["deleted"]
+                month = add_months(month, 1)
+        return stats
+
+    def archive_month(self, table, client_id, base, time_field, month, delete):
+        """Arquiva as linhas ainda não arquivadas de um cliente em um mês"""
+        result = {"files": 0, "rows": 0, "deleted": 0}
+        queryset = base.filter(
+            **{
+                f"{time_field}__gte": month,
+                f"{time_field}__lt": add_months(month, 1),
+            }
+        )
+        with ArchivedIds(self.root, table, client_id, month) as archived:
+            if self.dry_run:
+                ids = queryset.order_by("id").values_list("id", flat=True)
+                result["rows"] = sum(
+                    value not in archived
+                    for value in ids.iterator(chunk_size=self.chunk_size)
+                )
+                return result
+            path = self.write_part(
+                table, client_id, month, queryset, time_field, archived
+            )
+        if path is None:
+            return result
+
+        with ArchiveFile(path) as archive:
+            written = archive.rows
+            verified = archive.verify()
+            present = sum(
+                queryset.filter(id__in=ids).count()
+                for ids in archive.column_groups("id")
+            )
+        if verified != written or present != written:
+            path.unlink(missing_ok=True)
+            raise ArchiveError(
+                f"Verificação falhou para {table} cliente {client_id} "
+                f"({month:%Y-%m}): {written} gravadas, {verified} lidas"
+            )
+
+        result["files"], result["rows"] = 1, written
+        if delete:
+            with ArchiveFile(path) as archive:
+                result["deleted"] = self.delete_rows(
+                    queryset, archive.column_groups("id")
+                )
+        return result
+
+    def write_part(self, table, client_id, month, queryset, time_field, archived):
+        """Grava a próxima parte do mês e retorna o caminho (None se vazia)"""
+        columns = model_columns(queryset.model)
+        names = [name for name, _ in columns]
+        id_index = names.index("id")
+
+        path = month_directory(self.root, table, client_id, month) / (
+            f"part-{len(archived.manifest) + 1:04d}{FILE_SUFFIX}"
+        )
+        writer = ArchiveWriter(
+            path,
+            columns,
+            time_field,
+            metadata={
+                "table": table,
+                "client_id": client_id,
+                "month": f"{month:%Y-%m}",
+            },
+        )
+
+        buffer = []
+        try:
+            # Em ordem de id: a coluna id da parte fica ordenada (ver PartIds)
+            rows = queryset.order_by("id").values_list(*names)
+            for row in rows.iterator(chunk_size=self.chunk_size):
+                if row[id_index] in archived:
+                    continue
+                buffer.append(row)
+                if len(buffer) >= self.chunk_size:
+                    writer.write_rows(buffer)
+                    buffer = []
+            writer.write_rows(buffer)
+        except BaseException:
+            writer.abort()
+            raise
+
+        if not writer.rows:
+            writer.abort()
+            return None
+        return writer.close()
+
+    def delete_rows(self, queryset, id_groups):
+        """Remove as linhas arquivadas, um grupo de linhas da parte por vez"""
+        deleted = 0
+        for ids in id_groups:
+            # Mantém o filtro de tempo para podar as partições
+            queryset.filter(id__in=ids).delete()
+            deleted += len(ids)
+        return deleted
@@ -0,0 +1,230 @@
+"""
+Exportação em streaming (CSV ou NDJSON, com gzip opcional).
+
+As linhas são lidas com `.values()` via QuerySet.iterator (cursor no servidor
+no PostgreSQL) e codificadas à medida que chegam, sem instanciar models nem
+serializers. A memória usada é constante e o cabeçalho é enviado antes da
+primeira consulta terminar de ser lida.
+"""
+
+import csv
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+
+EXPORT_CONTENT_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv; charset=utf-8",
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+}
+
+# Tamanho aproximado de cada pedaço enviado ao cliente
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def format_value(value):
+    """Converte valores do banco para texto/JSON"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+class _LineBuffer:
+    """Arquivo falso para csv.writer: devolve a linha escrita"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, fields):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            ["" if row[field] is None else format_value(row[field]) for field in fields]
+        )
+
+
+def ndjson_lines(rows, fields):
+    for row in rows:
+        yield json.dumps(
+            {field: format_value(row[field]) for field in fields},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ) + "\n"
+
+
+def buffered(lines, size=STREAM_BUFFER_SIZE):
+    """
+    Agrupa as linhas em pedaços de ~`size` bytes
+
+    A primeira linha sai sozinha, para o cliente receber o primeiro byte
+    sem esperar o buffer encher.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    yield first.encode("utf-8")
+
+    parts, length = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        parts.append(data)
+        length += len(data)
+        if length >= size:
+            yield b"".join(parts)
+            parts, length = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def gzip_stream(chunks):
+    """Compacta os pedaços em gzip à medida que são gerados"""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        # Z_SYNC_FLUSH envia já o que foi compactado de cada pedaço
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Renderer usado só na negociação de conteúdo das exportações
+
+    O corpo da exportação sai pronto da view (StreamingHttpResponse); este
+    renderer só faz `Accept: text/csv` (ou `?format=csv`) ser aceito em vez
+    de responder 406.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data, renderer_context=renderer_context)
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = "text/csv"
+    format = EXPORT_FORMAT_CSV
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = EXPORT_FORMAT_NDJSON
+
+
+def stream_rows(queryset, fields, export_format, compress=False, chunk_size=2000):
+    """Gera os bytes da exportação do queryset"""
+    rows = queryset.values(*fields).iterator(chunk_size=chunk_size)
+    if export_format == EXPORT_FORMAT_NDJSON:
+        lines = ndjson_lines(rows, fields)
+    else:
+        lines = csv_lines(rows, fields)
+
+    chunks = buffered(lines)
+    if compress:
+        chunks = gzip_stream(chunks)
+    return chunks
+
+
+class StreamingExportMixin:
+    """
+    Mixin para views de exportação em streaming
+
+    Usa o `get_queryset()` da view (escopo do cliente, busca e intervalo de
+    tempo) e responde com um arquivo CSV ou NDJSON.
+
+    Parâmetros:
+    - `export_format`: "csv" (padrão) ou "ndjson"; sem ele, vale o formato
+      negociado pelo `Accept` (ou `?format=`)
+    - `compress=gzip`: compacta o arquivo em gzip
+
+    Respostas de erro continuam em JSON.
+    """
+
+    renderer_classes = [JSONRenderer, CSVRenderer, NDJSONRenderer]
+
+    export_fields = []
+    export_ordering = []
+    export_filename = "export"
+    export_chunk_size = 2000
+    export_format_param = "export_format"
+    export_compress_param = "compress"
+
+    def get_export_format(self):
+        export_format = self.request.query_params.get(self.export_format_param)
+        if export_format is None:
+            renderer = getattr(self.request, "accepted_renderer", None)
+            if isinstance(renderer, ExportRenderer):
+                return renderer.format
+            return EXPORT_FORMAT_CSV
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise ValidationError(
+                {
+                    self.export_format_param: (
+                        f"Formato inválido. Use: {', '.join(EXPORT_CONTENT_TYPES)}."
+                    )
+                }
+            )
+        return export_format
+
+    def get_export_compress(self):
+        compress = self.request.query_params.get(self.export_compress_param)
+        if compress in (None, ""):
+            return False
+        if compress != "gzip":
+            raise ValidationError(
+                {self.export_compress_param: "Compressão inválida. Use: gzip."}
+            )
+        return True
+
+    def get_export_queryset(self):
+        queryset = self.get_queryset()
+        if self.export_ordering:
+            queryset = queryset.order_by(*self.export_ordering)
+        return queryset
+
+    def handle_exception(self, exc):
+        response = super().handle_exception(exc)
+        # Erros em JSON, mesmo quando o cliente pediu CSV/NDJSON
+        if isinstance(getattr(self.request, "accepted_renderer", None), ExportRenderer):
+            self.request.accepted_renderer = JSONRenderer()
+            self.request.accepted_media_type = JSONRenderer.media_type
+        return response
+
+    def get(self, request, *args, **kwargs):
+        export_format = self.get_export_format()
+        compress = self.get_export_compress()
+        queryset = self.get_export_queryset()
+
+        filename = f"{self.export_filename}.{export_format}"
+        if compress:
+            filename += ".gz"
+            content_type = "application/gzip"
+        else:
+            content_type = EXPORT_CONTENT_TYPES[export_format]
+
+        response = StreamingHttpResponse(
+            stream_rows(
+                queryset,
+                self.export_fields,
+                export_format,
+                compress=compress,
+                chunk_size=self.export_chunk_size,
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # Evita que o proxy acumule a resposta antes de repassar
+        response["X-Accel-Buffering"] = "no"
+        return response
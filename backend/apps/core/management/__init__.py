@@ -0,0 +1 @@
+# management commands init file
@@ -0,0 +1 @@
+# commands init file
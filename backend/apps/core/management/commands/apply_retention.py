@@ -0,0 +1,97 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.retention import (
+    RETENTION_TARGETS,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_SLEEP_SECONDS,
+    RetentionEngine,
+)
+from apps.tenants.models import Clients
+
+
+class Command(BaseCommand):
+    """
+    Comando para aplicar as políticas de retenção e downsampling
+
+    Resume e remove heartbeats e histórico de status antigos, em lotes.
+
+    Usage: python manage.py apply_retention --batch-size 1000 --sleep 0.1
+    """
+
+    help = "Resume e remove dados antigos conforme as políticas de retenção"
+
+    def add_arguments(self, parser):
+        """Adicionar argumentos do comando"""
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=sorted(RETENTION_TARGETS),
+            help="Tabela a processar (padrão: todas)",
+        )
+        parser.add_argument(
+            "--client",
+            action="append",
+            type=int,
+            help="ID do cliente a processar (padrão: todos)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Quantidade de linhas por lote",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=DEFAULT_SLEEP_SECONDS,
+            help="Pausa em segundos entre lotes",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas mostra quantas linhas seriam processadas",
+        )
+
+    def handle(self, *args, **options):
+        """Executar o comando"""
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser maior que zero")
+        if options["sleep"] < 0:
+            raise CommandError("--sleep deve ser maior ou igual a zero")
+
+        clients = None
+        if options["client"]:
+            clients = list(
+                Clients.objects.with_deleted()
+                .filter(id__in=options["client"])
+                .order_by("id")
+            )
+            if not clients:
+                raise CommandError("Nenhum cliente encontrado")
+
+        engine = RetentionEngine(
+            batch_size=options["batch_size"],
+            sleep_seconds=options["sleep"],
+            dry_run=options["dry_run"],
+        )
+        stats = engine.run(tables=options["table"], clients=clients)
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING("🔎 Modo de simulação - nada foi alterado")
+            )
+
+        for table, result in stats.items():
+            self.stdout.write(f"📦 {table}:")
+            verb = "seriam" if options["dry_run"] else "foram"
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"   ✓ {result['rows']} linhas brutas {verb} resumidas e removidas"
+                )
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"   ✓ {result['summaries_deleted']} resumos antigos "
+                    f"{verb} removidos"
+                )
+            )
@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.archive import (
+    ARCHIVE_TARGETS,
+    DEFAULT_CHUNK_SIZE,
+    Archiver,
+)
+from apps.tenants.models import Clients
+
+
+class Command(BaseCommand):
+    """
+    Comando para arquivar eventos e histórico antigos
+
+    Grava meses inteiros em arquivos colunares compactados por cliente e mês
+    e remove do banco as linhas arquivadas (após verificar o arquivo).
+
+    Usage: python manage.py archive_data --table slot_status_events --chunk-size 10000
+    """
+
+    help = "Arquiva eventos e histórico antigos em arquivos colunares compactados"
+
+    def add_arguments(self, parser):
+        """Adicionar argumentos do comando"""
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=sorted(ARCHIVE_TARGETS),
+            help="Tabela a processar (padrão: todas configuradas em DATA_ARCHIVE)",
+        )
+        parser.add_argument(
+            "--client",
+            action="append",
+            type=int,
+            help="ID do cliente a processar (padrão: todos)",
+        )
+        parser.add_argument(
+            "--after-days",
+            type=int,
+            default=None,
+            help="Arquiva meses anteriores a hoje - N dias (padrão: DATA_ARCHIVE)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Linhas por leitura do cursor e por grupo do arquivo",
+        )
+        parser.add_argument(
+            "--root",
+            default=None,
+            help="Diretório de destino (padrão: DATA_ARCHIVE['root'])",
+        )
+        parser.add_argument(
+            "--keep-rows",
+            action="store_true",
+            help="Não remove do banco as linhas arquivadas",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas mostra quantas linhas seriam arquivadas",
+        )
+
+    def handle(self, *args, **options):
+        """Executar o comando"""
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size deve ser maior que zero")
+        if options["after_days"] is not None and options["after_days"] < 0:
+            raise CommandError("--after-days deve ser maior ou igual a zero")
+
+        config = getattr(settings, "DATA_ARCHIVE", {}).get("tables", {})
+        tables = options["table"] or sorted(config)
+
+        clients = Clients.objects.with_deleted().order_by("id")
+        if options["client"]:
+            clients = clients.filter(id__in=options["client"])
+            if not clients.exists():
+                raise CommandError("Nenhum cliente encontrado")
+
+        archiver = Archiver(
+            root=options["root"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING("🔎 Modo de simulação - nada foi alterado")
+            )
+
+        for table in tables:
+            table_config = config.get(table, {})
+            after_days = options["after_days"]
+            if after_days is None:
+                after_days = table_config.get("after_days")
+            if after_days is None:
+                raise CommandError(
+                    f"Informe --after-days ou configure DATA_ARCHIVE para '{table}'"
+                )
+            delete = table_config.get("delete", True) and not options["keep_rows"]
+
+            self.stdout.write(
+                f"📦 {table} (meses antes de {archiver.cutoff(after_days):%Y-%m}):"
+            )
+            stats = archiver.archive_table(table, clients, after_days, delete=delete)
+
+            if options["dry_run"]:
+                self.stdout.write(f"   🔎 {stats['rows']} linhas seriam arquivadas")
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"   ✓ {stats['rows']} linhas arquivadas "
+                    f"em {stats['files']} arquivos"
+                )
+            )
+            if delete:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"   ✓ {stats['deleted']} linhas removidas do banco"
+                    )
+                )
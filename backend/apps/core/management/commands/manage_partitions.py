@@ -0,0 +1,114 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.core.partitioning import (
+    PARTITIONED_TABLES,
+    DEFAULT_MONTHS_AHEAD,
+    is_postgresql,
+    is_partitioned,
+    ensure_partitions,
+    detach_partition,
+    partitions_older_than,
+)
+
+
+class Command(BaseCommand):
+    """
+    Comando para manutenção das partições mensais
+
+    Cria as partições dos próximos meses e desanexa as antigas.
+
+    Usage: python manage.py manage_partitions --months-ahead 3 --retain-months 24
+    """
+
+    help = (
+        "Cria partições futuras e desanexa partições antigas das tabelas de "
+        "séries temporais"
+    )
+
+    def add_arguments(self, parser):
+        """Adicionar argumentos do comando"""
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=sorted(PARTITIONED_TABLES),
+            help="Tabela a processar (padrão: todas)",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=DEFAULT_MONTHS_AHEAD,
+            help="Quantidade de meses futuros com partição pré-criada",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=None,
+            help="Desanexa partições mais antigas que N meses (padrão: não desanexa)",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Remove as partições desanexadas (padrão: mantém as tabelas)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas mostra o que seria feito",
+        )
+
+    def handle(self, *args, **options):
+        """Executar o comando"""
+        if not is_postgresql(connection):
+            self.stdout.write(
+                self.style.WARNING(
+                    "⚠ Particionamento disponível apenas no PostgreSQL - nada a fazer"
+                )
+            )
+            return
+
+        if options["months_ahead"] < 0:
+            raise CommandError("--months-ahead deve ser maior ou igual a zero")
+        if options["retain_months"] is not None and options["retain_months"] < 1:
+            raise CommandError("--retain-months deve ser maior que zero")
+
+        tables = options["table"] or sorted(PARTITIONED_TABLES)
+        for table in tables:
+            self.process_table(table, PARTITIONED_TABLES[table], options)
+
+    def process_table(self, table, column, options):
+        """Processa as partições de uma tabela"""
+        if not is_partitioned(connection, table):
+            self.stdout.write(
+                self.style.WARNING(f"⚠ Tabela '{table}' não é particionada - ignorada")
+            )
+            return
+
+        self.stdout.write(f"📦 {table} ({column}):")
+
+        if options["dry_run"]:
+            if options["retain_months"]:
+                for name in partitions_older_than(
+                    connection, table, options["retain_months"]
+                ):
+                    self.stdout.write(f"   🔎 Seria desanexada: {name}")
+            return
+
+        with transaction.atomic():
+            created = ensure_partitions(
+                connection, table, column, options["months_ahead"]
+            )
+        for name in created:
+            self.stdout.write(self.style.SUCCESS(f"   ✓ Partição criada: {name}"))
+
+        if options["retain_months"]:
+            for name in partitions_older_than(
+                connection, table, options["retain_months"]
+            ):
+                with transaction.atomic():
+                    detach_partition(connection, table, name, drop=options["drop"])
+                action = "removida" if options["drop"] else "desanexada"
+                self.stdout.write(self.style.SUCCESS(f"   ✓ Partição {action}: {name}"))
+
+        if not created:
+            self.stdout.write("   ✓ Partições futuras já existem")
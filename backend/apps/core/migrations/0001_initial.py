@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:41
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("tenants", "0002_remove_clientmembers_uq_client_members_client_user_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RetentionPolicies",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "public_id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("deleted_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "table",
+                    models.CharField(
+                        choices=[
+                            ("camera_heartbeats", "Heartbeats de câmeras"),
+                            ("slot_status_history", "Histórico de status das vagas"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("raw_retention_days", models.PositiveIntegerField()),
+                (
+                    "summary_interval",
+                    models.PositiveIntegerField(
+                        choices=[
+                            (300, "5 minutos"),
+                            (3600, "1 hora"),
+                            (86400, "1 dia"),
+                        ],
+                        default=3600,
+                    ),
+                ),
+                (
+                    "summary_retention_days",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("enabled", models.BooleanField(default=True)),
+                (
+                    "client",
+                    models.ForeignKey(
+                        db_column="client_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="%(class)s_set",
+                        to="tenants.clients",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "retention_policies",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("client", "table"),
+                        name="uq_retention_policies_client_table",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProcessingCheckpoints",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=60, unique=True)),
+                ("position", models.DateTimeField(blank=True, null=True)),
+                ("last_id", models.BigIntegerField(default=0)),
+                ("state", models.JSONField(blank=True, default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "processing_checkpoints",
+            },
+        ),
+    ]
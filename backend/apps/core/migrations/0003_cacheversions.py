@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_processingcheckpoints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CacheVersions",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=60, unique=True)),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "cache_versions",
+            },
+        ),
+    ]
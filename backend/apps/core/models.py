@@ -70,4 +70,98 @@ class TenantManager(SoftDeleteManager):
     def for_user(self, user):
         """Filtra objetos pelos clientes do usuário"""
         user_clients = user.client_members.values_list('client_id', flat=True)
-        return self.filter(client_id__in=user_clients)
\ No newline at end of file
+        return self.filter(client_id__in=user_clients)
+
+
+class RetentionPolicies(TenantModel):
+    """
+    Política de retenção por tabela e por cliente.
+
+    Linhas brutas mais antigas que `raw_retention_days` são resumidas em
+    intervalos de `summary_interval` segundos e depois removidas. Resumos mais
+    antigos que `summary_retention_days` também são removidos (nulo = manter).
+    Clientes sem política usam os padrões de settings.DATA_RETENTION.
+    """
+    TABLE_CHOICES = [
+        ("camera_heartbeats", "Heartbeats de câmeras"),
+        ("slot_status_history", "Histórico de status das vagas"),
+    ]
+    INTERVAL_CHOICES = [
+        (300, "5 minutos"),
+        (3600, "1 hora"),
+        (86400, "1 dia"),
+    ]
+
+    table = models.CharField(max_length=50, choices=TABLE_CHOICES)
+    raw_retention_days = models.PositiveIntegerField()
+    summary_interval = models.PositiveIntegerField(
+        choices=INTERVAL_CHOICES, default=3600
+    )
+    summary_retention_days = models.PositiveIntegerField(null=True, blank=True)
+    enabled = models.BooleanField(default=True)
+
+    objects = TenantManager()
+
+    class Meta:
+        db_table = "retention_policies"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["client", "table"], name="uq_retention_policies_client_table"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_table_display()} - {self.client.name}"
+
+
+class ProcessingCheckpoints(models.Model):
+    """
+    Posição de processamentos incrementais (rollups, analytics).
+
+    `position`/`last_id` marcam até onde a fonte já foi processada, na ordem
+    (tempo, id). `state` guarda o que for preciso para continuar de onde parou.
+    """
+    id = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=60, unique=True)
+    position = models.DateTimeField(null=True, blank=True)
+    last_id = models.BigIntegerField(default=0)
+    state = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "processing_checkpoints"
+
+    def __str__(self):
+        return f"{self.name} ({self.position})"
+
+
+class CacheVersions(models.Model):
+    """
+    Versão de dados que os processos mantêm em memória (ex.: índice de
+    estabelecimentos em apps.catalog.facets).
+
+    Quem altera os dados incrementa a versão; cada processo compara a versão
+    atual com a que carregou.
+    """
+    id = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=60, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "cache_versions"
+
+    def __str__(self):
+        return f"{self.name} (v{self.version})"
+
+    @classmethod
+    def bump(cls, name):
+        """Incrementa a versão (criando a linha na primeira vez)"""
+        cls.objects.get_or_create(name=name)
+        cls.objects.filter(name=name).update(version=models.F("version") + 1)
+
+    @classmethod
+    def current(cls, name):
+        """Versão atual (0 se nunca foi incrementada)"""
+        return (
+            cls.objects.filter(name=name).values_list("version", flat=True).first() or 0
+        )
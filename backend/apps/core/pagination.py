@@ -0,0 +1,312 @@
+import base64
+import heapq
+import json
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_MODE_EXACT = "exact"
+COUNT_MODE_ESTIMATED = "estimated"
+COUNT_MODE_NONE = "none"
+
+# Abaixo deste valor a estimativa do planner não compensa: faz COUNT(*) exato
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimated_count(queryset, threshold=ESTIMATED_COUNT_THRESHOLD):
+    """
+    Retorna a quantidade de linhas do queryset usando a estimativa do planner
+    do PostgreSQL (EXPLAIN) quando ela passa de `threshold`.
+
+    Em outros bancos, ou quando a estimativa é pequena, faz o COUNT(*) exato.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+
+    if estimate < threshold:
+        return queryset.count()
+    return estimate
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator do Django Admin que usa contagem estimada em tabelas grandes
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, "query"):
+            return estimated_count(self.object_list)
+        return super().count
+
+
+class EstimatedCountAdminMixin:
+    """
+    Mixin para ModelAdmin de tabelas que só crescem (históricos, eventos, heartbeats)
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class StandardResultsPagination(LimitOffsetPagination):
+    """
+    Paginação padrão da API (limit/offset) com limite máximo aplicado.
+
+    Lê da view as configurações do PaginationMixin:
+    - `page_size` / `max_page_size`: tamanho padrão e máximo da página
+    - `page_size_param`: parâmetro alternativo a `limit`
+    - `count_mode`: "exact", "estimated" ou "none" (sem COUNT, usa N+1 linhas)
+
+    O cliente pode pedir `?count=none` para dispensar a contagem.
+    """
+
+    default_limit = 20
+    max_limit = 100
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    count_mode = COUNT_MODE_EXACT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.configure(view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.count_mode = self.get_count_mode(request)
+
+        if self.count_mode == COUNT_MODE_NONE:
+            self.count = None
+        else:
+            self.count = self.get_count(queryset)
+            if self.count == 0:
+                self.has_next = False
+                return []
+
+        # Busca uma linha a mais para saber se existe próxima página
+        rows = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[: self.limit]
+
+    def configure(self, view):
+        """Aplica as configurações definidas na view"""
+        if view is None:
+            return
+        self.default_limit = getattr(view, "page_size", self.default_limit)
+        self.max_limit = getattr(view, "max_page_size", self.max_limit)
+        self.page_size_query_param = getattr(
+            view, "page_size_param", self.page_size_query_param
+        )
+        self.count_mode = getattr(view, "count_mode", self.count_mode)
+
+    def get_limit(self, request):
+        value = request.query_params.get(self.limit_query_param)
+        if value is None and self.page_size_query_param:
+            value = request.query_params.get(self.page_size_query_param)
+
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            return self.default_limit
+
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+
+    def get_count_mode(self, request):
+        requested = request.query_params.get(self.count_query_param)
+        if requested in (COUNT_MODE_NONE, "false", "0"):
+            return COUNT_MODE_NONE
+        return self.count_mode
+
+    def get_count(self, queryset):
+        self.count_is_estimated = False
+        if self.count_mode == COUNT_MODE_ESTIMATED and hasattr(queryset, "query"):
+            count = estimated_count(queryset)
+            self.count_is_estimated = count >= ESTIMATED_COUNT_THRESHOLD
+            return count
+        return super().get_count(queryset)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        if self.page_size_query_param:
+            url = remove_query_param(url, self.page_size_query_param)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_previous_link(self):
+        url = super().get_previous_link()
+        if url and self.page_size_query_param:
+            url = remove_query_param(url, self.page_size_query_param)
+        return url
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict()
+        if self.count_mode != COUNT_MODE_NONE:
+            payload["count"] = self.count
+            payload["count_is_estimated"] = self.count_is_estimated
+        payload["has_next"] = self.has_next
+        payload["next"] = self.get_next_link()
+        payload["previous"] = self.get_previous_link()
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"]["nullable"] = True
+        response_schema["properties"]["count_is_estimated"] = {"type": "boolean"}
+        response_schema["properties"]["has_next"] = {"type": "boolean"}
+        response_schema["required"] = ["results"]
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por chave (keyset) em ordem decrescente de (tempo, id).
+
+    Em vez de OFFSET, cada página começa logo depois da última linha da página
+    anterior (`cursor`). Com um índice (..., tempo, id) todas as páginas custam
+    o mesmo, qualquer que seja a profundidade, e não há COUNT.
+
+    Lê da view `page_size`, `max_page_size`, `page_size_param` e
+    `keyset_fields` (campo de tempo, campo de desempate). Aceita um queryset
+    ou uma lista de querysets, que são mesclados em ordem (ex.: um por lote).
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    page_size_query_param = "page_size"
+    default_limit = 20
+    max_limit = 100
+    keyset_fields = ("recorded_at", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.configure(view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        time_field, id_field = self.keyset_fields
+
+        querysets = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+        position = self.decode_cursor(request)
+        pages = []
+        for item in querysets:
+            if position is not None:
+                moment, last_id = position
+                item = item.filter(
+                    Q(**{f"{time_field}__lt": moment})
+                    | Q(**{time_field: moment, f"{id_field}__lt": last_id})
+                )
+            pages.append(
+                item.order_by(f"-{time_field}", f"-{id_field}")[: self.limit + 1]
+            )
+
+        rows = list(
+            islice(
+                heapq.merge(
+                    *pages,
+                    key=lambda row: (getattr(row, time_field), getattr(row, id_field)),
+                    reverse=True,
+                ),
+                self.limit + 1,
+            )
+        )
+        self.has_next = len(rows) > self.limit
+        rows = rows[: self.limit]
+        self.next_cursor = None
+        if self.has_next:
+            last = rows[-1]
+            self.next_cursor = self.encode_cursor(
+                getattr(last, time_field), getattr(last, id_field)
+            )
+        return rows
+
+    def configure(self, view):
+        """Aplica as configurações definidas na view"""
+        if view is None:
+            return
+        self.default_limit = getattr(view, "page_size", self.default_limit)
+        self.max_limit = getattr(view, "max_page_size", self.max_limit)
+        self.page_size_query_param = getattr(
+            view, "page_size_param", self.page_size_query_param
+        )
+        self.keyset_fields = getattr(view, "keyset_fields", self.keyset_fields)
+
+    def get_limit(self, request):
+        value = request.query_params.get(self.limit_query_param)
+        if value is None and self.page_size_query_param:
+            value = request.query_params.get(self.page_size_query_param)
+
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            return self.default_limit
+
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+
+    def encode_cursor(self, moment, last_id):
+        data = json.dumps([moment.isoformat(), last_id]).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii")
+
+    def decode_cursor(self, request):
+        """Retorna (tempo, id) do cursor informado ou None"""
+        value = request.query_params.get(self.cursor_query_param)
+        if not value:
+            return None
+        try:
+            moment, last_id = json.loads(base64.urlsafe_b64decode(value.encode()))
+            return datetime.fromisoformat(moment), int(last_id)
+        except (TypeError, ValueError):
+            raise ValidationError({self.cursor_query_param: "Cursor inválido."})
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict()
+        payload["has_next"] = self.has_next
+        payload["next_cursor"] = self.next_cursor
+        payload["next"] = self.get_next_link()
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "has_next": {"type": "boolean"},
+                "next_cursor": {"type": "string", "nullable": True},
+                "next": {"type": "string", "format": "uri", "nullable": True},
+                "results": schema,
+            },
+        }
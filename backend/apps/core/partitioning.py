@@ -0,0 +1,397 @@
+"""
+Particionamento por intervalo de tempo (RANGE mensal) no PostgreSQL.
+
+As tabelas de histórico, eventos e heartbeats só crescem e toda consulta
+relevante é limitada no tempo. Com uma partição por mês, filtros pela coluna
+de tempo leem apenas as partições do intervalo, e VACUUM/reindexação ficam
+restritos a tabelas de tamanho limitado.
+
+Os índices e constraints são criados na tabela pai; o PostgreSQL os replica
+automaticamente em cada partição (inclusive nas criadas depois).
+
+O PostgreSQL só aceita UNIQUE em tabela particionada se a constraint incluir
+a coluna de particionamento. Para que colunas como public_id e event_id
+continuem únicas na tabela inteira (como o model declara), cada uma ganha
+uma tabela de consulta (`<tabela>_<coluna>_uniq`) com a coluna como chave
+primária, mantida por trigger: um valor repetido em outro mês falha com
+IntegrityError, como antes do particionamento.
+"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+
+# Tabela -> coluna de particionamento
+PARTITIONED_TABLES = {
+    "slot_status_history": "recorded_at",
+    "slot_status_events": "occurred_at",
+    "camera_heartbeats": "received_at",
+}
+
+DEFAULT_MONTHS_AHEAD = 3
+
+
+def local_timezone():
+    """Fuso usado para alinhar os limites dos meses (settings.TIME_ZONE)"""
+    return ZoneInfo(settings.TIME_ZONE)
+
+
+def month_start(value=None):
+    """Retorna o início (00:00 do dia 1, horário local) do mês de `value`"""
+    value = value or timezone.now()
+    if timezone.is_aware(value):
+        value = value.astimezone(local_timezone())
+    return datetime(value.year, value.month, 1, tzinfo=local_timezone())
+
+
+def add_months(value, months):
+    """Soma `months` meses a um início de mês"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=value.tzinfo)
+
+
+def partition_name(table, month):
+    """Nome da partição mensal, ex.: slot_status_history_p202501"""
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def is_postgresql(connection):
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned(connection, table):
+    """Verifica se a tabela já é particionada"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(connection, table):
+    """
+    Lista as partições mensais da tabela como (nome, início do mês),
+    em ordem cronológica. A partição DEFAULT não é incluída.
+    """
+    prefix = f"{table}_p"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        suffix = name[len(prefix) :]
+        if not name.startswith(prefix) or len(suffix) != 6 or not suffix.isdigit():
+            continue
+        month = datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=local_timezone())
+        partitions.append((name, month))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def create_partition(connection, table, column, month):
+    """
+    Cria a partição do mês, se ainda não existir.
+
+    Se a partição DEFAULT tiver linhas do intervalo, elas são movidas para a
+    nova partição antes do ATTACH. Retorna True se a partição foi criada.
+
+    O trigger de `create_global_unique` só roda no DELETE da DEFAULT (a nova
+    tabela ainda não está anexada no INSERT), então as chaves das linhas
+    movidas voltam às tabelas de consulta depois do ATTACH.
+    """
+    qn = connection.ops.quote_name
+    name = partition_name(table, month)
+    start, end = month, add_months(month, 1)
+
+    if name in dict(list_partitions(connection, table)):
+        return False
+
+    default = default_partition_name(table)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [default])
+        has_default = cursor.fetchone()[0] is not None
+
+        pending = False
+        if has_default:
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {qn(default)} "
+                f"WHERE {qn(column)} >= %s AND {qn(column)} < %s)",
+                [start, end],
+            )
+            pending = cursor.fetchone()[0]
+
+        if not pending:
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start.isoformat(), end.isoformat()],
+            )
+            return True
+
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} "
+            f"(LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(default)} "
+            f"WHERE {qn(column)} >= %s AND {qn(column)} < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [start.isoformat(), end.isoformat()],
+        )
+        for lookup, columns in global_unique_lookups(connection, table).items():
+            keys = ", ".join(qn(column) for column in columns)
+            present = " AND ".join(f"{qn(column)} IS NOT NULL" for column in columns)
+            cursor.execute(
+                f"INSERT INTO {qn(lookup)} ({keys}) "
+                f"SELECT {keys} FROM {qn(name)} WHERE {present}"
+            )
+    return True
+
+
+def ensure_partitions(connection, table, column, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """Garante partições do mês atual até `months_ahead` meses à frente"""
+    current = month_start()
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_partition(connection, table, column, month):
+            created.append(partition_name(table, month))
+    return created
+
+
+def detach_partition(connection, table, name, drop=False):
+    """
+    Desanexa (e opcionalmente remove) uma partição
+
+    Ao remover, os valores da partição saem das tabelas de consulta de
+    unicidade (uma partição só desanexada continua reservando os seus).
+    """
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if drop:
+            for lookup, columns in global_unique_lookups(connection, table).items():
+                keys = ", ".join(qn(column) for column in columns)
+                cursor.execute(
+                    f"DELETE FROM {qn(lookup)} WHERE ({keys}) IN "
+                    f"(SELECT {keys} FROM {qn(name)})"
+                )
+        cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+        if drop:
+            cursor.execute(f"DROP TABLE {qn(name)}")
+
+
+def partitions_older_than(connection, table, retain_months):
+    """Partições que terminam antes da janela de retenção (em meses)"""
+    cutoff = add_months(month_start(), -retain_months)
+    return [
+        name
+        for name, month in list_partitions(connection, table)
+        if add_months(month, 1) <= cutoff
+    ]
+
+
+def global_unique_name(table, columns):
+    """Nome da tabela de consulta de unicidade, ex.: slot_status_events_event_id_uniq"""
+    return f"{table}_{'_'.join(columns)}_uniq"
+
+
+def global_unique_lookups(connection, table):
+    """Tabelas de consulta de unicidade da tabela, como {nome: [colunas]}"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, ARRAY(SELECT a.attname FROM unnest(x.indkey) k "
+            "JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = k) "
+            "FROM pg_class c JOIN pg_index x ON x.indrelid = c.oid AND x.indisprimary "
+            "WHERE c.relkind = 'r' AND c.relname LIKE %s "
+            "AND pg_table_is_visible(c.oid)",
+            [f"{table}\\_%\\_uniq"],
+        )
+        return {
+            name: list(columns)
+            for name, columns in cursor.fetchall()
+            if name == global_unique_name(table, columns)
+        }
+
+
+def create_global_unique(connection, table, columns):
+    """
+    Garante a unicidade de `columns` na tabela particionada inteira.
+
+    Cria a tabela de consulta (preenchida com os valores atuais) e o trigger
+    que a mantém em INSERT, UPDATE e DELETE. Linhas com NULL em alguma das
+    colunas são ignoradas, como em uma constraint UNIQUE.
+    """
+    qn = connection.ops.quote_name
+    name = global_unique_name(table, columns)
+    keys = ", ".join(qn(column) for column in columns)
+
+    def values(row):
+        return ", ".join(f"{row}.{qn(column)}" for column in columns)
+
+    def present(row):
+        return " AND ".join(f"{row}.{qn(column)} IS NOT NULL" for column in columns)
+
+    changed = " OR ".join(
+        f"NEW.{qn(column)} IS DISTINCT FROM OLD.{qn(column)}" for column in columns
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT a.attname, format_type(a.atttypid, a.atttypmod) "
+            "FROM pg_attribute a WHERE a.attrelid = %s::regclass AND a.attnum > 0",
+            [table],
+        )
+        types = dict(cursor.fetchall())
+        definition = ", ".join(f"{qn(column)} {types[column]}" for column in columns)
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {qn(name)} "
+            f"({definition}, PRIMARY KEY ({keys}))"
+        )
+        cursor.execute(
+            f"INSERT INTO {qn(name)} ({keys}) "
+            f"SELECT {keys} FROM {qn(table)} t WHERE {present('t')} "
+            f"ON CONFLICT DO NOTHING"
+        )
+        cursor.execute(
+            f"CREATE OR REPLACE FUNCTION {qn(name)}() RETURNS trigger "
+            f"LANGUAGE plpgsql AS $$ BEGIN "
+            f"IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND ({changed})) THEN "
+            f"DELETE FROM {qn(name)} WHERE ({keys}) = ({values('OLD')}); "
+            f"END IF; "
+            f"IF (TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND ({changed}))) "
+            f"AND {present('NEW')} THEN "
+            f"INSERT INTO {qn(name)} ({keys}) VALUES ({values('NEW')}); "
+            f"END IF; "
+            f"RETURN NULL; END $$"
+        )
+        cursor.execute(f"DROP TRIGGER IF EXISTS {qn(name)} ON {qn(table)}")
+        cursor.execute(
+            f"CREATE TRIGGER {qn(name)} AFTER INSERT OR UPDATE OR DELETE "
+            f"ON {qn(table)} FOR EACH ROW EXECUTE FUNCTION {qn(name)}()"
+        )
+    return name
+
+
+def drop_global_unique(connection, table, columns):
+    """Remove a tabela de consulta e o trigger de `create_global_unique`"""
+    qn = connection.ops.quote_name
+    name = global_unique_name(table, columns)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {qn(name)} ON {qn(table)}")
+        cursor.execute(f"DROP FUNCTION IF EXISTS {qn(name)}()")
+        cursor.execute(f"DROP TABLE IF EXISTS {qn(name)}")
+
+
+def _table_definition(cursor, table):
+    """Coleta constraints e índices da tabela antes da conversão"""
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid), "
+        "ARRAY(SELECT a.attname FROM unnest(conkey) k "
+        "JOIN pg_attribute a ON a.attrelid = conrelid AND a.attnum = k) "
+        "FROM pg_constraint WHERE conrelid = %s::regclass "
+        "AND contype IN ('p', 'u', 'f') ORDER BY contype DESC, conname",
+        [table],
+    )
+    constraints = cursor.fetchall()
+
+    cursor.execute(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = %s::regclass AND NOT EXISTS ("
+        "SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)",
+        [table],
+    )
+    indexes = cursor.fetchall()
+    return constraints, indexes
+
+
+def partition_table(connection, table, column, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """
+    Converte uma tabela comum em tabela particionada por mês em `column`.
+
+    - Chave primária e constraints UNIQUE passam a incluir `column`
+      (exigência do PostgreSQL para tabelas particionadas); a unicidade das
+      colunas originais continua garantida por `create_global_unique`
+    - Foreign keys e índices são recriados com os mesmos nomes
+    - Cria partições do mês da linha mais antiga até `months_ahead` meses à
+      frente, além de uma partição DEFAULT para valores fora do intervalo
+
+    Deve rodar dentro de uma transação (ex.: migration).
+    """
+    if not is_postgresql(connection) or is_partitioned(connection, table):
+        return False
+
+    qn = connection.ops.quote_name
+    legacy = f"{table}__legacy"
+    extended = []
+
+    with connection.cursor() as cursor:
+        constraints, indexes = _table_definition(cursor, table)
+
+        cursor.execute(f"SELECT MIN({qn(column)}) FROM {qn(table)}")
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} "
+            f"INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE) "
+            f"PARTITION BY RANGE ({qn(column)})"
+        )
+        cursor.execute(
+            f"CREATE TABLE {qn(default_partition_name(table))} "
+            f"PARTITION OF {qn(table)} DEFAULT"
+        )
+
+    current = month_start()
+    month = month_start(oldest) if oldest else current
+    while month <= add_months(current, months_ahead):
+        create_partition(connection, table, column, month)
+        month = add_months(month, 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+        # Índices e constraints na tabela pai se propagam para as partições
+        for name, kind, definition, columns in constraints:
+            if kind in ("p", "u"):
+                keys = list(columns)
+                if column not in keys:
+                    keys.append(column)
+                    if kind == "u":
+                        extended.append(list(columns))
+                clause = "PRIMARY KEY" if kind == "p" else "UNIQUE"
+                definition = f"{clause} ({', '.join(qn(key) for key in keys)})"
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}"
+            )
+        for name, definition in indexes:
+            cursor.execute(definition)
+
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {qn(table)}), 0) + 1, false)",
+            [table],
+        )
+    for columns in extended:
+        create_global_unique(connection, table, columns)
+    return True
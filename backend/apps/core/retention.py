@@ -0,0 +1,337 @@
+"""
+Motor de retenção e downsampling das tabelas que só crescem.
+
+Para cada tabela e cliente, linhas brutas mais antigas que a janela de
+retenção são resumidas por intervalo (ex.: 1 hora) e removidas em lotes.
+Cada lote percorre uma única câmera/vaga em ordem de tempo, usando os índices
+(camera, received_at) e (slot, recorded_at), e há uma pausa entre lotes para
+evitar picos de IO.
+
+Tabelas que também são arquivadas (ver apps.core.archive) só perdem linhas
+brutas dos meses já arquivados: o corte para no primeiro mês com linhas
+ainda fora dos arquivos.
+
+A última linha de histórico de cada vaga nunca é removida: ela é o "status
+antes de X" de point_in_time, heatmap e trends para vagas sem mudanças
+recentes.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.catalog.models import Slots, SlotStatusHistory, SlotStatusHistorySummaries
+from apps.core.archive import ARCHIVE_TARGETS, archived_until
+from apps.core.models import RetentionPolicies
+from apps.core.partitioning import local_timezone
+from apps.hardware.models import CameraHeartbeats, CameraHeartbeatSummaries, Cameras
+from apps.tenants.models import Clients
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_SLEEP_SECONDS = 0.1
+
+
+def bucket_start(value, interval_seconds):
+    """Início do intervalo que contém `value`, alinhado à meia-noite local"""
+    local = value.astimezone(local_timezone())
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed = int((local - midnight).total_seconds())
+    return midnight + timedelta(seconds=elapsed - elapsed % interval_seconds)
+
+
+def resolve_policy(table, client):
+    """
+    Retorna a política efetiva do cliente para a tabela.
+
+    Usa a RetentionPolicies do cliente, se existir, ou settings.DATA_RETENTION.
+    Retorna None quando não há política (ou ela está desabilitada).
+    """
+    override = RetentionPolicies.objects.filter(client=client, table=table).first()
+    if override:
+        if not override.enabled:
+            return None
+        return {
+            "raw_days": override.raw_retention_days,
+            "summary_interval": override.summary_interval,
+            "summary_days": override.summary_retention_days,
+        }
+
+    defaults = getattr(settings, "DATA_RETENTION", {}).get(table)
+    if not defaults:
+        return None
+    return {
+        "raw_days": defaults["raw_days"],
+        "summary_interval": defaults.get("summary_interval", 3600),
+        "summary_days": defaults.get("summary_days"),
+    }
+
+
+class RetentionTarget(ABC):
+    """
+    Descreve uma tabela sujeita à retenção (modelo bruto, resumo e chaves)
+
+    Subclasses: HeartbeatRetention e SlotHistoryRetention.
+    """
+
+    table = None
+    model = None
+    summary_model = None
+    entity_model = None
+    entity_field = None
+    time_field = None
+    fields = []
+    # Campos do resumo somados / sobrescritos quando o intervalo já existe
+    summary_counters = []
+    summary_latest = []
+
+    def entity_ids(self, client):
+        """IDs das câmeras/vagas do cliente (inclusive soft deleted)"""
+        return list(
+            self.entity_model.objects.with_deleted()
+            .filter(client=client)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def raw_queryset(self, entity_id, cutoff):
+        queryset = self.model.objects.with_deleted().filter(
+            **{
+                f"{self.entity_field}_id": entity_id,
+                f"{self.time_field}__lt": cutoff,
+            }
+        )
+        kept = self.kept_id(entity_id)
+        if kept is not None:
+            queryset = queryset.exclude(id=kept)
+        return queryset.order_by(self.time_field)
+
+    def kept_id(self, entity_id):
+        """ID da linha que fica mesmo fora da janela (None: nenhuma)"""
+        return None
+
+    @abstractmethod
+    def summarize(self, rows, interval):
+        """
+        Agrupa as linhas brutas por intervalo, como {início: valores}
+
+        `valores` tem os campos do resumo (`summary_counters`,
+        `summary_latest` e os que só são gravados na criação).
+        """
+
+    def save_summaries(self, entity_id, interval, buckets):
+        """Soma os intervalos aos resumos existentes (ou cria novos)"""
+        for start, values in buckets.items():
+            lookup = {
+                f"{self.entity_field}_id": entity_id,
+                "interval_seconds": interval,
+                "bucket_start": start,
+            }
+            increments = {
+                field: F(field) + values[field] for field in self.summary_counters
+            }
+            latest = {field: values[field] for field in self.summary_latest}
+            updated = self.summary_model.objects.filter(**lookup).update(
+                **increments, **latest
+            )
+            if not updated:
+                self.summary_model.objects.create(**lookup, **values)
+
+
+class HeartbeatRetention(RetentionTarget):
+    table = "camera_heartbeats"
+    model = CameraHeartbeats
+    summary_model = CameraHeartbeatSummaries
+    entity_model = Cameras
+    entity_field = "camera"
+    time_field = "received_at"
+    fields = ["id", "received_at"]
+    summary_counters = ["heartbeat_count"]
+    summary_latest = ["last_received_at"]
+
+    def summarize(self, rows, interval):
+        buckets = {}
+        for row in rows:
+            received_at = row["received_at"]
+            bucket = buckets.setdefault(
+                bucket_start(received_at, interval),
+                {"heartbeat_count": 0, "first_received_at": received_at},
+            )
+            bucket["heartbeat_count"] += 1
+            bucket["last_received_at"] = received_at
+        return buckets
+
+
+class SlotHistoryRetention(RetentionTarget):
+    table = "slot_status_history"
+    model = SlotStatusHistory
+    summary_model = SlotStatusHistorySummaries
+    entity_model = Slots
+    entity_field = "slot"
+    time_field = "recorded_at"
+    fields = ["id", "recorded_at", "status", "confidence", "deleted_at"]
+    summary_counters = [
+        "change_count",
+        "occupied_count",
+        "confidence_sum",
+        "confidence_samples",
+    ]
+    summary_latest = ["last_status", "last_recorded_at"]
+
+    def summarize(self, rows, interval):
+        buckets = {}
+        for row in rows:
+            if row["deleted_at"] is not None:
+                continue
+            bucket = buckets.setdefault(
+                bucket_start(row["recorded_at"], interval),
+                {
+                    "change_count": 0,
+                    "occupied_count": 0,
+                    "confidence_sum": 0,
+                    "confidence_samples": 0,
+                },
+            )
+            bucket["change_count"] += 1
+            if row["status"] == "OCCUPIED":
+                bucket["occupied_count"] += 1
+            if row["confidence"] is not None:
+                bucket["confidence_sum"] += row["confidence"]
+                bucket["confidence_samples"] += 1
+            bucket["last_status"] = row["status"]
+            bucket["last_recorded_at"] = row["recorded_at"]
+        return buckets
+
+    def kept_id(self, entity_id):
+        """Última mudança da vaga (o status atual dela no histórico)"""
+        return (
+            self.model.objects.filter(slot_id=entity_id)
+            .order_by("-recorded_at", "-id")
+            .values_list("id", flat=True)
+            .first()
+        )
+
+
+RETENTION_TARGETS = {
+    target.table: target for target in (HeartbeatRetention(), SlotHistoryRetention())
+}
+
+
+class RetentionEngine:
+    """
+    Aplica as políticas de retenção em lotes
+
+    Cada lote é resumido e removido na mesma transação, então uma
+    interrupção não perde dados nem conta linhas duas vezes.
+    """
+
+    def __init__(
+        self,
+        batch_size=DEFAULT_BATCH_SIZE,
+        sleep_seconds=DEFAULT_SLEEP_SECONDS,
+        dry_run=False,
+        now=None,
+    ):
+        self.batch_size = batch_size
+        self.sleep_seconds = sleep_seconds
+        self.dry_run = dry_run
+        self.now = now or timezone.now()
+
+    def run(self, tables=None, clients=None):
+        """
+        Aplica as políticas e retorna estatísticas por tabela:
+        {"camera_heartbeats": {"rows": n, "summaries_deleted": n}, ...}
+        """
+        if clients is None:
+            clients = Clients.objects.with_deleted().order_by("id")
+
+        stats = {}
+        for table in tables or sorted(RETENTION_TARGETS):
+            target = RETENTION_TARGETS[table]
+            table_stats = stats.setdefault(table, {"rows": 0, "summaries_deleted": 0})
+            for client in clients:
+                policy = resolve_policy(table, client)
+                if policy is None:
+                    continue
+                result = self.apply(target, client, policy)
+                table_stats["rows"] += result["rows"]
+                table_stats["summaries_deleted"] += result["summaries_deleted"]
+        return stats
+
+    def apply(self, target, client, policy):
+        """Aplica a política de um cliente em uma tabela"""
+        cutoff = self.now - timedelta(days=policy["raw_days"])
+        if target.table in ARCHIVE_TARGETS:
+            cutoff = min(cutoff, archived_until(target.table, client, cutoff))
+        interval = policy["summary_interval"]
+        rows = 0
+
+        for entity_id in target.entity_ids(client):
+            rows += self.downsample_entity(target, entity_id, cutoff, interval)
+
+        summaries_deleted = 0
+        if policy["summary_days"] is not None:
+            summary_cutoff = self.now - timedelta(days=policy["summary_days"])
+            summaries_deleted = self.purge_summaries(target, client, summary_cutoff)
+
+        return {"rows": rows, "summaries_deleted": summaries_deleted}
+
+    def downsample_entity(self, target, entity_id, cutoff, interval):
+        """Resume e remove, em lotes, as linhas antigas de uma câmera/vaga"""
+        queryset = target.raw_queryset(entity_id, cutoff)
+        if self.dry_run:
+            return queryset.count()
+
+        processed = 0
+        while True:
+            rows = list(queryset.values(*target.fields)[: self.batch_size])
+            if not rows:
+                break
+
+            with transaction.atomic():
+                target.save_summaries(
+                    entity_id, interval, target.summarize(rows, interval)
+                )
+                # Limites de tempo do lote permitem podar as partições
+                target.model.objects.with_deleted().filter(
+                    **{
+                        f"{target.entity_field}_id": entity_id,
+                        f"{target.time_field}__gte": rows[0][target.time_field],
+                        f"{target.time_field}__lte": rows[-1][target.time_field],
+                        "id__in": [row["id"] for row in rows],
+                    }
+                ).delete()
+
+            processed += len(rows)
+            if len(rows) < self.batch_size:
+                break
+            self.throttle()
+        return processed
+
+    def purge_summaries(self, target, client, cutoff):
+        """Remove, em lotes, resumos mais antigos que `cutoff`"""
+        queryset = target.summary_model.objects.filter(
+            **{f"{target.entity_field}__client": client, "bucket_start__lt": cutoff}
+        )
+        if self.dry_run:
+            return queryset.count()
+
+        deleted = 0
+        while True:
+            ids = list(queryset.values_list("id", flat=True)[: self.batch_size])
+            if not ids:
+                break
+            target.summary_model.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            if len(ids) < self.batch_size:
+                break
+            self.throttle()
+        return deleted
+
+    def throttle(self):
+        if self.sleep_seconds:
+            time.sleep(self.sleep_seconds)
@@ -1,3 +1,709 @@
-from django.test import TestCase
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
+from model_bakery import baker
+
+from apps.catalog.models import (
+    Slots,
+    SlotStatusHistory,
+    SlotStatusHistorySummaries,
+    StoreTypes,
+)
+from apps.catalog.point_in_time import lot_status_as_of
+from apps.core.archive import (
+    ArchiveError,
+    ArchiveFile,
+    Archiver,
+    ArchiveWriter,
+    is_month_archived,
+    month_manifest,
+    month_start as archive_month_start,
+    scan_archive,
+)
+from apps.core.models import RetentionPolicies
+from apps.core.pagination import (
+    StandardResultsPagination,
+    EstimatedCountPaginator,
+    estimated_count,
+    COUNT_MODE_ESTIMATED,
+    COUNT_MODE_NONE,
+)
+from apps.core.partitioning import (
+    add_months,
+    create_partition,
+    detach_partition,
+    ensure_partitions,
+    global_unique_lookups,
+    is_partitioned,
+    list_partitions,
+    local_timezone,
+    month_start,
+    partition_name,
+    partition_table,
+)
+from apps.core.retention import RetentionEngine, bucket_start, resolve_policy
+from apps.core.views import PaginationMixin
+from apps.events.models import SlotStatusEvents
+from apps.hardware.models import CameraHeartbeats, CameraHeartbeatSummaries, Cameras
+from apps.tenants.models import Clients
+
+
+class DummyView(PaginationMixin):
+    page_size = 2
+    max_page_size = 3
+
+
+class StandardResultsPaginationTest(TestCase):
+    """Testes para StandardResultsPagination"""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        for i in range(5):
+            baker.make(StoreTypes, name=f"Tipo {i}")
+        self.queryset = StoreTypes.objects.order_by("id")
+
+    def paginate(self, params=None, view=None):
+        request = Request(self.factory.get("/items/", params or {}))
+        paginator = StandardResultsPagination()
+        page = paginator.paginate_queryset(self.queryset, request, view or DummyView())
+        return paginator, page
+
+    def test_default_page_size_from_view(self):
+        """Testa que o page_size da view é usado por padrão"""
+        paginator, page = self.paginate()
+        self.assertEqual(len(page), 2)
+        self.assertEqual(paginator.count, 5)
+        self.assertTrue(paginator.has_next)
+
+    def test_page_size_param_is_enforced(self):
+        """Testa que page_size é limitado por max_page_size"""
+        paginator, page = self.paginate({"page_size": 50})
+        self.assertEqual(len(page), 3)
+        self.assertEqual(paginator.limit, 3)
+
+    def test_limit_param_is_enforced(self):
+        """Testa que limit também respeita max_page_size"""
+        _, page = self.paginate({"limit": 1000})
+        self.assertEqual(len(page), 3)
+
+    def test_invalid_page_size_falls_back_to_default(self):
+        """Testa page_size inválido"""
+        _, page = self.paginate({"page_size": "abc"})
+        self.assertEqual(len(page), 2)
+
+    def test_no_count_mode_uses_extra_row(self):
+        """Testa modo sem COUNT(*) usando N+1 linhas"""
+        paginator, page = self.paginate({"count": "none", "offset": 2})
+        self.assertIsNone(paginator.count)
+        self.assertEqual(len(page), 2)
+        self.assertTrue(paginator.has_next)
+
+        response = paginator.get_paginated_response([])
+        self.assertNotIn("count", response.data)
+        self.assertTrue(response.data["has_next"])
+        self.assertIn("offset=4", response.data["next"])
+
+    def test_no_count_mode_last_page(self):
+        """Testa has_next falso na última página"""
+        paginator, page = self.paginate({"count": "none", "offset": 4})
+        self.assertEqual(len(page), 1)
+        self.assertFalse(paginator.has_next)
+        self.assertIsNone(paginator.get_next_link())
+
+    def test_view_count_mode_none(self):
+        """Testa count_mode definido na view"""
+        view = DummyView()
+        view.count_mode = COUNT_MODE_NONE
+        paginator, _ = self.paginate(view=view)
+        self.assertIsNone(paginator.count)
+
+    def test_estimated_mode_falls_back_to_exact_count(self):
+        """Testa que tabelas pequenas (ou fora do PostgreSQL) usam COUNT exato"""
+        view = DummyView()
+        view.count_mode = COUNT_MODE_ESTIMATED
+        paginator, _ = self.paginate(view=view)
+        response = paginator.get_paginated_response([])
+        self.assertEqual(response.data["count"], 5)
+        self.assertFalse(response.data["count_is_estimated"])
+
+
+class EstimatedCountTest(TestCase):
+    """Testes para contagem estimada"""
+
+    def test_estimated_count_small_table(self):
+        """Testa estimated_count com poucas linhas"""
+        baker.make(StoreTypes, _quantity=3)
+        self.assertEqual(estimated_count(StoreTypes.objects.all()), 3)
+
+    def test_admin_paginator_count(self):
+        """Testa EstimatedCountPaginator"""
+        baker.make(StoreTypes, _quantity=4)
+        paginator = EstimatedCountPaginator(StoreTypes.objects.order_by("id"), 2)
+        self.assertEqual(paginator.count, 4)
+        self.assertEqual(paginator.num_pages, 2)
+
+    def test_admin_paginator_with_list(self):
+        """Testa EstimatedCountPaginator com lista simples"""
+        paginator = EstimatedCountPaginator([1, 2, 3], 2)
+        self.assertEqual(paginator.count, 3)
+
+
+class PartitioningTest(TestCase):
+    """Testes para os utilitários de particionamento"""
+
+    def test_month_start_uses_local_timezone(self):
+        """Testa que o mês é alinhado ao TIME_ZONE do projeto"""
+        # 02:00 UTC do dia 1 ainda é o mês anterior em America/Sao_Paulo
+        value = datetime.fromisoformat("2025-03-01T02:00:00+00:00")
+        start = month_start(value)
+        self.assertEqual((start.year, start.month, start.day), (2025, 2, 1))
+        self.assertEqual(start.tzinfo, local_timezone())
+
+    def test_add_months_across_years(self):
+        """Testa soma de meses atravessando anos"""
+        start = datetime(2025, 11, 1, tzinfo=local_timezone())
+        self.assertEqual(
+            add_months(start, 3), datetime(2026, 2, 1, tzinfo=local_timezone())
+        )
+        self.assertEqual(
+            add_months(start, -11), datetime(2024, 12, 1, tzinfo=local_timezone())
+        )
+
+    def test_partition_name(self):
+        """Testa nome das partições mensais"""
+        month = datetime(2025, 1, 1, tzinfo=local_timezone())
+        self.assertEqual(
+            partition_name("slot_status_history", month), "slot_status_history_p202501"
+        )
+
+    @skipIf(connection.vendor == "postgresql", "Teste para bancos sem particionamento")
+    def test_partition_table_is_noop_outside_postgresql(self):
+        """Testa que a conversão é ignorada fora do PostgreSQL"""
+        self.assertFalse(
+            partition_table(connection, "slot_status_history", "recorded_at")
+        )
+
+    @skipIf(connection.vendor == "postgresql", "Teste para bancos sem particionamento")
+    def test_manage_partitions_command_outside_postgresql(self):
+        """Testa o comando manage_partitions fora do PostgreSQL"""
+        out = StringIO()
+        call_command("manage_partitions", stdout=out)
+        self.assertIn("apenas no PostgreSQL", out.getvalue())
+
+    @skipUnless(connection.vendor == "postgresql", "Requer PostgreSQL")
+    def test_tables_are_partitioned_by_migrations(self):
+        """Testa que as migrations particionaram as tabelas"""
+        for table in ("slot_status_history", "slot_status_events", "camera_heartbeats"):
+            self.assertTrue(is_partitioned(connection, table))
+
+    @skipUnless(connection.vendor == "postgresql", "Requer PostgreSQL")
+    def test_manage_partitions_creates_future_partitions(self):
+        """Testa a criação de partições futuras pelo comando"""
+        out = StringIO()
+        call_command(
+            "manage_partitions",
+            "--table",
+            "camera_heartbeats",
+            "--months-ahead",
+            "6",
+            stdout=out,
+        )
+        names = dict(list_partitions(connection, "camera_heartbeats"))
+        self.assertIn(
+            partition_name("camera_heartbeats", add_months(month_start(), 6)), names
+        )
+
+    def make_event(self, event_id, occurred_at):
+        return baker.make(
+            SlotStatusEvents,
+            event_id=event_id,
+            occurred_at=occurred_at,
+            curr_status="OCCUPIED",
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Requer PostgreSQL")
+    def test_unique_columns_stay_global_across_partitions(self):
+        """Testa que event_id continua único entre partições de meses diferentes"""
+        self.assertEqual(
+            sorted(global_unique_lookups(connection, "slot_status_events").values()),
+            [["event_id"], ["public_id"]],
+        )
+        event = self.make_event(uuid.uuid4(), timezone.now())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.make_event(event.event_id, timezone.now() - timedelta(days=95))
+
+        # Removido o evento, o valor volta a ficar livre
+        event.delete()
+        self.make_event(event.event_id, timezone.now() - timedelta(days=95))
+
+    @skipUnless(connection.vendor == "postgresql", "Requer PostgreSQL")
+    def test_dropped_partition_releases_unique_values(self):
+        """Testa que remover uma partição libera os valores dela"""
+        month = add_months(month_start(), -30)
+        create_partition(connection, "slot_status_events", "occurred_at", month)
+        event = self.make_event(uuid.uuid4(), month + timedelta(days=3))
+        with connection.cursor() as cursor:
+            # Checagens de FK adiadas impedem o DROP na mesma transação
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        detach_partition(
+            connection,
+            "slot_status_events",
+            partition_name("slot_status_events", month),
+            drop=True,
+        )
+        self.make_event(event.event_id, timezone.now())
+
+    @skipUnless(connection.vendor == "postgresql", "Requer PostgreSQL")
+    def test_rows_moved_from_default_keep_unique_values(self):
+        """Testa que linhas movidas da DEFAULT continuam reservando os valores"""
+        month = add_months(month_start(), 9)
+        self.assertNotIn(
+            partition_name("slot_status_events", month),
+            dict(list_partitions(connection, "slot_status_events")),
+        )
+        event = self.make_event(uuid.uuid4(), month + timedelta(days=3))
+
+        created = ensure_partitions(
+            connection, "slot_status_events", "occurred_at", months_ahead=9
+        )
+
+        self.assertIn(partition_name("slot_status_events", month), created)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.make_event(event.event_id, timezone.now())
+
+
+class RetentionEngineTest(TestCase):
+    """Testes para o motor de retenção e downsampling"""
+
+    def setUp(self):
+        self.client_obj = baker.make(Clients)
+        self.camera = baker.make(Cameras, client=self.client_obj)
+        self.slot = baker.make(Slots, client=self.client_obj)
+        self.now = timezone.now()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        archive = override_settings(DATA_ARCHIVE={"root": self.tmp.name})
+        archive.enable()
+        self.addCleanup(archive.disable)
+
+    def make_history(self, days_ago, **kwargs):
+        history = baker.make(SlotStatusHistory, slot=self.slot, **kwargs)
+        SlotStatusHistory.objects.filter(id=history.id).update(
+            recorded_at=self.now - timedelta(days=days_ago)
+        )
+        return history
+
+    def archive_history(self):
+        Archiver(root=self.tmp.name, now=self.now).archive_table(
+            "slot_status_history", [self.client_obj], after_days=30, delete=False
+        )
+
+    def make_heartbeat(self, days_ago, minutes=0):
+        heartbeat = baker.make(CameraHeartbeats, camera=self.camera)
+        received_at = self.now - timedelta(days=days_ago, minutes=minutes)
+        CameraHeartbeats.objects.filter(id=heartbeat.id).update(received_at=received_at)
+        return received_at
+
+    def run_engine(self, tables, **kwargs):
+        engine = RetentionEngine(sleep_seconds=0, now=self.now, **kwargs)
+        return engine.run(tables=tables, clients=[self.client_obj])
+
+    def test_bucket_start_aligned_to_local_midnight(self):
+        """Testa alinhamento dos intervalos no fuso local"""
+        value = datetime(2025, 3, 10, 14, 47, tzinfo=local_timezone())
+        self.assertEqual(
+            bucket_start(value, 3600),
+            datetime(2025, 3, 10, 14, tzinfo=local_timezone()),
+        )
+        self.assertEqual(
+            bucket_start(value, 86400), datetime(2025, 3, 10, tzinfo=local_timezone())
+        )
+
+    def test_old_heartbeats_are_summarized_and_deleted(self):
+        """Testa que heartbeats antigos viram resumos e são removidos"""
+        old = [self.make_heartbeat(30, minutes=i) for i in range(3)]
+        self.make_heartbeat(1)
+
+        stats = self.run_engine(tables=["camera_heartbeats"], batch_size=2)
+
+        self.assertEqual(stats["camera_heartbeats"]["rows"], 3)
+        self.assertEqual(CameraHeartbeats.objects.count(), 1)
+        summaries = CameraHeartbeatSummaries.objects.filter(camera=self.camera)
+        self.assertEqual(sum(s.heartbeat_count for s in summaries), 3)
+        self.assertEqual(min(s.first_received_at for s in summaries), min(old))
+        self.assertEqual(max(s.last_received_at for s in summaries), max(old))
+
+    def test_history_summary_counts(self):
+        """Testa o resumo do histórico de status"""
+        for status, confidence in (("OCCUPIED", "0.900"), ("FREE", "0.700")):
+            self.make_history(400, status=status, confidence=Decimal(confidence))
+        latest = self.make_history(1, status="FREE")
+        self.archive_history()
+
+        self.run_engine(tables=["slot_status_history"])
+
+        remaining = SlotStatusHistory.objects.with_deleted()
+        self.assertEqual(list(remaining.values_list("id", flat=True)), [latest.id])
+        summary = SlotStatusHistorySummaries.objects.get(slot=self.slot)
+        self.assertEqual(summary.change_count, 2)
+        self.assertEqual(summary.occupied_count, 1)
+        self.assertEqual(summary.avg_confidence, Decimal("0.8"))
+
+    def test_history_not_archived_is_kept(self):
+        """Testa que a retenção não remove histórico de meses não arquivados"""
+        archived = self.make_history(400, status="FREE")
+        self.archive_history()
+        # Linha do mesmo mês gravada depois do arquivamento
+        late = self.make_history(400, status="OCCUPIED")
+        self.make_history(300, status="FREE")
+
+        stats = self.run_engine(tables=["slot_status_history"])
+
+        self.assertEqual(stats["slot_status_history"]["rows"], 0)
+        self.assertEqual(SlotStatusHistory.objects.count(), 3)
+
+        self.archive_history()
+        stats = self.run_engine(tables=["slot_status_history"])
+
+        # A linha mais recente da vaga fica (ver test_latest_history_is_kept)
+        self.assertEqual(stats["slot_status_history"]["rows"], 2)
+        remaining = SlotStatusHistory.objects.filter(id__in=[archived.id, late.id])
+        self.assertFalse(remaining.exists())
+
+    def test_latest_history_is_kept(self):
+        """Testa que a última mudança de cada vaga sobrevive à retenção"""
+        self.make_history(400, status="OCCUPIED")
+        latest = self.make_history(399, status="FREE")
+        self.archive_history()
+
+        for _ in range(2):
+            stats = self.run_engine(tables=["slot_status_history"])
+            self.assertEqual(
+                list(SlotStatusHistory.objects.values_list("id", flat=True)),
+                [latest.id],
+            )
+        self.assertEqual(stats["slot_status_history"]["rows"], 0)
+
+        _, slots = lot_status_as_of(self.slot.lot, self.now)
+        self.assertEqual([slot["status"] for slot in slots], ["FREE"])
+
+    def test_tenant_policy_overrides_settings(self):
+        """Testa que a política do cliente substitui o padrão"""
+        baker.make(
+            RetentionPolicies,
+            client=self.client_obj,
+            table="camera_heartbeats",
+            raw_retention_days=60,
+        )
+        self.make_heartbeat(30)
+
+        stats = self.run_engine(tables=["camera_heartbeats"])
+
+        self.assertEqual(stats["camera_heartbeats"]["rows"], 0)
+        self.assertEqual(CameraHeartbeats.objects.count(), 1)
+
+    def test_disabled_policy_is_skipped(self):
+        """Testa política desabilitada"""
+        baker.make(
+            RetentionPolicies,
+            client=self.client_obj,
+            table="camera_heartbeats",
+            raw_retention_days=1,
+            enabled=False,
+        )
+        self.assertIsNone(resolve_policy("camera_heartbeats", self.client_obj))
+
+    def test_old_summaries_are_purged(self):
+        """Testa remoção de resumos fora da janela de retenção"""
+        baker.make(
+            CameraHeartbeatSummaries,
+            camera=self.camera,
+            interval_seconds=3600,
+            bucket_start=self.now - timedelta(days=500),
+        )
+
+        stats = self.run_engine(tables=["camera_heartbeats"])
+
+        self.assertEqual(stats["camera_heartbeats"]["summaries_deleted"], 1)
+        self.assertFalse(CameraHeartbeatSummaries.objects.exists())
+
+    def test_dry_run_does_not_change_data(self):
+        """Testa que o modo de simulação não altera dados"""
+        self.make_heartbeat(30)
+
+        stats = self.run_engine(tables=["camera_heartbeats"], dry_run=True)
+
+        self.assertEqual(stats["camera_heartbeats"]["rows"], 1)
+        self.assertEqual(CameraHeartbeats.objects.count(), 1)
+        self.assertFalse(CameraHeartbeatSummaries.objects.exists())
+
+    def test_apply_retention_command(self):
+        """Testa o comando apply_retention"""
+        self.make_heartbeat(30)
+        out = StringIO()
+        call_command(
+            "apply_retention",
+            "--client",
+            str(self.client_obj.id),
+            "--sleep",
+            "0",
+            stdout=out,
+        )
+        self.assertIn("camera_heartbeats", out.getvalue())
+        self.assertEqual(CameraHeartbeats.objects.count(), 0)
+
+
+class ArchiveFormatTest(TestCase):
+    """Testes para o formato de arquivo colunar"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "part-0001.spa"
+        self.start = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        self.columns = [
+            ("id", "json"),
+            ("occurred_at", "datetime"),
+            ("confidence", "decimal"),
+        ]
+
+    def write(self, groups):
+        writer = ArchiveWriter(self.path, self.columns, "occurred_at")
+        for group in groups:
+            writer.write_rows(group)
+        return writer.close()
+
+    def rows(self, first, count):
+        return [
+            (i, self.start + timedelta(hours=i), Decimal("0.950") if i % 2 else None)
+            for i in range(first, first + count)
+        ]
+
+    def test_round_trip(self):
+        """Testa gravação e leitura de volta"""
+        self.write([self.rows(0, 3), self.rows(3, 2)])
+
+        with ArchiveFile(self.path) as archive:
+            self.assertEqual(archive.verify(), 5)
+            rows = list(archive.iter_rows())
+
+        self.assertEqual([row["id"] for row in rows], [0, 1, 2, 3, 4])
+        self.assertEqual(rows[4]["occurred_at"], self.start + timedelta(hours=4))
+        self.assertEqual(rows[1]["confidence"], Decimal("0.950"))
+        self.assertIsNone(rows[0]["confidence"])
+
+    def test_time_range_and_columns(self):
+        """Testa filtro por intervalo de tempo e seleção de colunas"""
+        self.write([self.rows(0, 3), self.rows(3, 3)])
+
+        with ArchiveFile(self.path) as archive:
+            rows = list(
+                archive.iter_rows(
+                    self.start + timedelta(hours=2),
+                    self.start + timedelta(hours=4),
+                    columns=["id"],
+                )
+            )
+
+        self.assertEqual(rows, [{"id": 2}, {"id": 3}])
+
+    def test_corrupted_file_fails_verification(self):
+        """Testa que arquivos corrompidos são detectados"""
+        self.write([self.rows(0, 3)])
+        data = bytearray(self.path.read_bytes())
+        data[6] ^= 0xFF
+        self.path.write_bytes(bytes(data))
+
+        with ArchiveFile(self.path) as archive:
+            with self.assertRaises(ArchiveError):
+                archive.verify()
+
+    def test_invalid_file(self):
+        """Testa arquivo que não é .spa"""
+        self.path.write_bytes(b"not an archive")
+        with self.assertRaises(ArchiveError):
+            ArchiveFile(self.path)
+
+
+class ArchiverTest(TestCase):
+    """Testes para o arquivamento de eventos e histórico"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.client_obj = baker.make(Clients)
+        self.slot = baker.make(Slots, client=self.client_obj)
+        self.now = datetime(2025, 9, 15, 12, tzinfo=local_timezone())
+        self.old = datetime(2025, 1, 10, 8, tzinfo=local_timezone())
+        self.archiver = Archiver(root=self.tmp.name, chunk_size=2, now=self.now)
+
+    def make_event(self, occurred_at):
+        return baker.make(
+            SlotStatusEvents,
+            client=self.client_obj,
+            lot=self.slot.lot,
+            slot=self.slot,
+            occurred_at=occurred_at,
+            curr_status="OCCUPIED",
+            confidence=Decimal("0.900"),
+        )
+
+    def test_archive_events_and_delete(self):
+        """Testa arquivamento de eventos antigos com remoção do banco"""
+        events = [self.make_event(self.old + timedelta(hours=i)) for i in range(3)]
+        self.make_event(self.now)
+
+        stats = self.archiver.archive_table(
+            "slot_status_events", [self.client_obj], after_days=30
+        )
+
+        self.assertEqual(stats, {"files": 1, "rows": 3, "deleted": 3})
+        self.assertEqual(SlotStatusEvents.objects.count(), 1)
+
+        rows = list(
+            scan_archive(
+                "slot_status_events",
+                self.old,
+                self.old + timedelta(days=1),
+                client_id=self.client_obj.id,
+                root=self.tmp.name,
+            )
+        )
+        self.assertEqual([row["id"] for row in rows], [e.id for e in events])
+        self.assertEqual(rows[0]["event_id"], events[0].event_id)
+        self.assertEqual(rows[0]["confidence"], Decimal("0.900"))
+
+    def test_archive_history_keeping_rows_is_incremental(self):
+        """Testa reexecução sem remoção: só linhas novas são arquivadas"""
+        history = baker.make(SlotStatusHistory, slot=self.slot, status="FREE")
+        SlotStatusHistory.objects.filter(id=history.id).update(recorded_at=self.old)
+
+        first = self.archiver.archive_table(
+            "slot_status_history", [self.client_obj], after_days=30, delete=False
+        )
+        second = self.archiver.archive_table(
+            "slot_status_history", [self.client_obj], after_days=30, delete=False
+        )
+
+        self.assertEqual(first["rows"], 1)
+        self.assertEqual(second["files"], 0)
+        self.assertEqual(SlotStatusHistory.objects.count(), 1)
+
+    def test_late_row_with_lower_id_is_archived(self):
+        """Testa que uma linha gravada depois, com id menor, não é pulada"""
+        late = self.make_event(self.now)
+        self.make_event(self.old)
+        self.archiver.archive_table(
+            "slot_status_events", [self.client_obj], after_days=30, delete=False
+        )
+
+        # A transação da linha de id menor só confirmou após o arquivamento
+        SlotStatusEvents.objects.filter(id=late.id).update(
+            occurred_at=self.old + timedelta(hours=1)
+        )
+        stats = self.archiver.archive_table(
+            "slot_status_events", [self.client_obj], after_days=30
+        )
+
+        self.assertEqual(stats, {"files": 1, "rows": 1, "deleted": 1})
+        rows = scan_archive(
+            "slot_status_events",
+            self.old,
+            self.now,
+            client_id=self.client_obj.id,
+            root=self.tmp.name,
+        )
+        self.assertIn(late.id, [row["id"] for row in rows])
+        self.assertEqual(SlotStatusEvents.objects.count(), 1)
+
+    def archive_events(self, delete=False):
+        return self.archiver.archive_table(
+            "slot_status_events", [self.client_obj], after_days=30, delete=delete
+        )
+
+    def is_archived(self):
+        month = archive_month_start(self.old)
+        queryset = SlotStatusEvents.objects.filter(
+            client=self.client_obj,
+            occurred_at__gte=month,
+            occurred_at__lt=self.old + timedelta(days=1),
+        )
+        return is_month_archived(
+            self.tmp.name, "slot_status_events", self.client_obj.id, month, queryset
+        )
+
+    def test_late_row_inside_archived_id_range_is_archived(self):
+        """Testa uma linha atrasada com id entre os ids de uma parte já gravada"""
+        first = self.make_event(self.old)
+        late = self.make_event(self.now)
+        last = self.make_event(self.old + timedelta(hours=2))
+        self.archive_events()
+
+        manifest = month_manifest(
+            self.tmp.name,
+            "slot_status_events",
+            self.client_obj.id,
+            archive_month_start(self.old),
+        )
+        self.assertEqual(
+            [(part["min_id"], part["max_id"], part["rows"]) for part in manifest],
+            [(first.id, last.id, 2)],
+        )
+
+        SlotStatusEvents.objects.filter(id=late.id).update(
+            occurred_at=self.old + timedelta(hours=1)
+        )
+        self.assertFalse(self.is_archived())
+
+        stats = self.archive_events(delete=True)
+
+        self.assertEqual(stats, {"files": 1, "rows": 1, "deleted": 1})
+        self.assertFalse(SlotStatusEvents.objects.filter(id=late.id).exists())
+        self.assertTrue(self.is_archived())
+
+    def test_rows_outside_archived_ranges_do_not_read_parts(self):
+        """Testa que linhas novas (fora das faixas de id) não abrem grupos"""
+        for hours in range(3):
+            self.make_event(self.old + timedelta(hours=hours))
+        self.archive_events()
+        self.make_event(self.old + timedelta(hours=3))
+
+        with mock.patch.object(
+            ArchiveFile, "read_chunk", autospec=True, side_effect=ArchiveFile.read_chunk
+        ) as read_chunk:
+            self.assertFalse(self.is_archived())
+            self.assertEqual(read_chunk.call_count, 0)
+
+            self.archive_events()
+            # Só a coluna id do grupo que contém cada linha consultada
+            read_chunk.reset_mock()
+            self.assertTrue(self.is_archived())
+            self.assertEqual(read_chunk.call_count, 3)
+
+    def test_archive_data_command_dry_run(self):
+        """Testa o comando archive_data em modo de simulação"""
+        self.make_event(datetime(2000, 1, 1, tzinfo=local_timezone()))
+        out = StringIO()
+        call_command(
+            "archive_data",
+            "--table",
+            "slot_status_events",
+            "--root",
+            self.tmp.name,
+            "--dry-run",
+            stdout=out,
+        )
+        self.assertIn("1 linhas seriam arquivadas", out.getvalue())
+        self.assertEqual(SlotStatusEvents.objects.count(), 1)
+        self.assertFalse(any(Path(self.tmp.name).iterdir()))
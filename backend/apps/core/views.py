@@ -1,10 +1,16 @@
+from datetime import datetime
+
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from .models import SoftDeleteManager, TenantManager
+from .pagination import StandardResultsPagination, COUNT_MODE_EXACT
 
 
 class BaseViewSetMixin:
@@ -123,25 +129,76 @@ class SearchMixin:
 class PaginationMixin:
     """
     Mixin para paginação customizada
+
+    As configurações abaixo são lidas por StandardResultsPagination.
+    `count_mode` pode ser "exact", "estimated" (tabelas grandes) ou "none".
     """
+    pagination_class = StandardResultsPagination
     page_size = 20
     page_size_param = 'page_size'
     max_page_size = 100
+    count_mode = COUNT_MODE_EXACT
+
+
+class TimeRangeFilterMixin:
+    """
+    Mixin para filtrar por intervalo de tempo (`from` inclusivo, `to` exclusivo)
+
+    Aceita datas ou datas/horas ISO 8601. Filtrar pela coluna de tempo permite
+    ao PostgreSQL ler apenas as partições mensais do intervalo.
+    """
+    time_range_field = None
+    time_range_from_param = 'from'
+    time_range_to_param = 'to'
+
+    def parse_time_param(self, param):
+        """Converte o parâmetro em datetime com timezone (ou None)"""
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
 
-    def get_queryset(self):
-        """Aplica paginação ao queryset"""
-        queryset = super().get_queryset()
-        page_size = self.request.query_params.get(self.page_size_param, self.page_size)
-        
         try:
-            page_size = int(page_size)
-            if page_size > self.max_page_size:
-                page_size = self.max_page_size
-        except (ValueError, TypeError):
-            page_size = self.page_size
-        
+            parsed = parse_datetime(value)
+            if parsed is None:
+                date_value = parse_date(value)
+                if date_value is not None:
+                    parsed = datetime.combine(date_value, datetime.min.time())
+        except ValueError:
+            parsed = None
+
+        if parsed is None:
+            raise ValidationError({param: 'Data/hora inválida. Use o formato ISO 8601.'})
+
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def get_time_range(self):
+        """Retorna a tupla (início, fim) informada na requisição"""
+        start = self.parse_time_param(self.time_range_from_param)
+        end = self.parse_time_param(self.time_range_to_param)
+        if start and end and start >= end:
+            raise ValidationError(
+                {self.time_range_to_param: 'Deve ser posterior ao início do intervalo.'}
+            )
+        return start, end
+
+    def filter_time_range(self, queryset):
+        """Aplica o intervalo de tempo ao queryset"""
+        if not self.time_range_field:
+            return queryset
+
+        start, end = self.get_time_range()
+        if start:
+            queryset = queryset.filter(**{f"{self.time_range_field}__gte": start})
+        if end:
+            queryset = queryset.filter(**{f"{self.time_range_field}__lt": end})
         return queryset
 
+    def get_queryset(self):
+        """Filtra o queryset pelo intervalo de tempo"""
+        return self.filter_time_range(super().get_queryset())
+
 
 class AuditMixin:
     """
@@ -153,4 +210,4 @@ class AuditMixin:
 
     def perform_update(self, serializer):
         """Registra quem atualizou o objeto"""
-        serializer.save(updated_by=self.request.user)
\ No newline at end of file
+        serializer.save(updated_by=self.request.user)
\ No newline at end of file
@@ -2,12 +2,13 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
 from .models import SlotStatusEvents
+from apps.core.pagination import EstimatedCountAdminMixin
 
 # Importar o admin_site customizado
 from smartpark.admin import admin_site
 
 
-class SlotStatusEventsAdmin(admin.ModelAdmin):
+class SlotStatusEventsAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = [
         "event_id_short",
         "event_type_display",
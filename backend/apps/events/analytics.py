@@ -0,0 +1,219 @@
+"""
+Tempo de permanência (dwell time) e rotatividade a partir dos eventos.
+
+Os eventos são lidos em lotes, na ordem em que chegaram ao servidor
+(received_at, id), a partir de um checkpoint. O occurred_at vem do cliente e
+pode chegar bem atrasado (reenvio do spool da câmera), então não serve de
+checkpoint: um evento antigo recebido depois ainda é processado. Dentro do
+lote os eventos são aplicados em ordem de occurred_at.
+
+Uma transição para OCCUPIED abre uma visita na vaga; a próxima transição
+para outro status fecha a visita, que é gravada com a duração e o tipo de
+veículo. As visitas abertas ficam salvas no checkpoint, então nunca é
+preciso carregar um dia inteiro de eventos para continuar.
+"""
+
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from apps.core.models import ProcessingCheckpoints
+from apps.core.partitioning import local_timezone
+
+from .models import LotDailyTurnover, SlotStatusEvents, SlotVisits
+
+OCCUPIED_STATUS = "OCCUPIED"
+CHECKPOINT_NAME = "slot_visits"
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_LAG_SECONDS = 60
+
+# Limites (em segundos) das faixas do histograma de permanência
+DEFAULT_DWELL_BINS = [0, 300, 900, 1800, 3600, 7200, 14400, 28800, 86400]
+
+
+class DwellTimeEngine:
+    """
+    Converte transições OCCUPIED → liberação em visitas e rotatividade diária
+    """
+
+    def __init__(
+        self, batch_size=DEFAULT_BATCH_SIZE, lag_seconds=DEFAULT_LAG_SECONDS, now=None
+    ):
+        self.batch_size = batch_size
+        self.lag = timedelta(seconds=lag_seconds)
+        self.now = now or timezone.now()
+
+    def run(self, until=None):
+        """
+        Processa os eventos recebidos até `until` (padrão: agora - lag)
+
+        Retorna {"events": eventos lidos, "visits": visitas gravadas}.
+        """
+        until = until or self.now - self.lag
+        checkpoint, _ = ProcessingCheckpoints.objects.get_or_create(
+            name=CHECKPOINT_NAME
+        )
+        self.open_visits = checkpoint.state.get("open_visits", {})
+        stats = {"events": 0, "visits": 0}
+
+        position, last_id = checkpoint.position, checkpoint.last_id
+        events = SlotStatusEvents.objects.all()
+        if position is not None:
+            events = events.filter(
+                Q(received_at__gt=position) | Q(received_at=position, id__gt=last_id)
+            )
+
+        while True:
+            rows = list(
+                events.filter(received_at__lt=until)
+                .order_by("received_at", "id")
+                .values(
+                    "id",
+                    "event_id",
+                    "client_id",
+                    "lot_id",
+                    "slot_id",
+                    "curr_status",
+                    "curr_vehicle_id",
+                    "occurred_at",
+                    "received_at",
+                )[: self.batch_size]
+            )
+            if not rows:
+                break
+
+            ordered = sorted(rows, key=lambda row: (row["occurred_at"], row["id"]))
+            visits = [visit for visit in map(self.apply, ordered) if visit]
+            with transaction.atomic():
+                SlotVisits.objects.bulk_create(visits, batch_size=1000)
+                self.update_turnover(visits)
+                checkpoint.position = rows[-1]["received_at"]
+                checkpoint.last_id = rows[-1]["id"]
+                checkpoint.state = {"open_visits": self.open_visits}
+                checkpoint.save()
+
+            stats["events"] += len(rows)
+            stats["visits"] += len(visits)
+            if len(rows) < self.batch_size:
+                break
+            events = SlotStatusEvents.objects.filter(
+                Q(received_at__gt=checkpoint.position)
+                | Q(received_at=checkpoint.position, id__gt=checkpoint.last_id)
+            )
+        return stats
+
+    def apply(self, row):
+        """Aplica um evento e retorna a visita encerrada por ele (ou None)"""
+        key = str(row["slot_id"])
+        visit = self.open_visits.get(key)
+
+        if row["curr_status"] == OCCUPIED_STATUS:
+            if visit is None:
+                self.open_visits[key] = {
+                    "started_at": row["occurred_at"].isoformat(),
+                    "vehicle_type_id": row["curr_vehicle_id"],
+                    "event_id": str(row["event_id"]),
+                }
+            elif visit["vehicle_type_id"] is None:
+                visit["vehicle_type_id"] = row["curr_vehicle_id"]
+            return None
+
+        if visit is None:
+            return None
+
+        started_at = datetime.fromisoformat(visit["started_at"])
+        ended_at = row["occurred_at"]
+        if ended_at < started_at:
+            # Evento atrasado, anterior à visita aberta: não a encerra
+            return None
+        del self.open_visits[key]
+        return SlotVisits(
+            client_id=row["client_id"],
+            lot_id=row["lot_id"],
+            slot_id=row["slot_id"],
+            vehicle_type_id=visit["vehicle_type_id"],
+            started_at=started_at,
+            ended_at=ended_at,
+            duration_seconds=int((ended_at - started_at).total_seconds()),
+            start_event_id=visit["event_id"],
+            end_event_id=row["event_id"],
+        )
+
+    def update_turnover(self, visits):
+        """Soma as visitas à rotatividade do dia (local) em que começaram"""
+        totals = {}
+        for visit in visits:
+            key = (visit.lot_id, visit.started_at.astimezone(local_timezone()).date())
+            count, seconds = totals.get(key, (0, 0))
+            totals[key] = (count + 1, seconds + visit.duration_seconds)
+
+        if not totals:
+            return
+        existing = {
+            (row.lot_id, row.day): row
+            for row in LotDailyTurnover.objects.filter(
+                lot_id__in={key[0] for key in totals},
+                day__in={key[1] for key in totals},
+            )
+        }
+        to_create, to_update = [], []
+        for (lot_id, day), (count, seconds) in totals.items():
+            row = existing.get((lot_id, day))
+            if row is None:
+                row = LotDailyTurnover(lot_id=lot_id, day=day)
+                to_create.append(row)
+            else:
+                to_update.append(row)
+            row.visit_count += count
+            row.total_dwell_seconds += seconds
+
+        LotDailyTurnover.objects.bulk_create(to_create)
+        LotDailyTurnover.objects.bulk_update(
+            to_update, ["visit_count", "total_dwell_seconds"]
+        )
+
+
+def reset_dwell_analytics():
+    """Apaga visitas, rotatividade e checkpoint (para reconstruir do zero)"""
+    with transaction.atomic():
+        SlotVisits.objects.all().delete()
+        LotDailyTurnover.objects.all().delete()
+        ProcessingCheckpoints.objects.filter(name=CHECKPOINT_NAME).delete()
+
+
+def dwell_histogram(visits, bins=DEFAULT_DWELL_BINS):
+    """
+    Distribuição das durações nas faixas de `bins`, calculada no banco
+
+    Uma única consulta agrupa as visitas pela faixa (CASE ... WHEN), sem
+    trazer as visitas para a aplicação. A última faixa é aberta.
+    """
+    ranges = list(zip(bins, bins[1:] + [None]))
+    whens = [
+        When(
+            Q(duration_seconds__gte=low)
+            & (Q(duration_seconds__lt=high) if high is not None else Q()),
+            then=Value(index),
+        )
+        for index, (low, high) in enumerate(ranges)
+    ]
+    counts = dict(
+        visits.filter(duration_seconds__gte=bins[0])
+        .annotate(bin=Case(*whens, output_field=IntegerField()))
+        .values("bin")
+        .annotate(count=Count("id"))
+        .values_list("bin", "count")
+    )
+    return [
+        {"min_seconds": low, "max_seconds": high, "count": counts.get(index, 0)}
+        for index, (low, high) in enumerate(ranges)
+    ]
+
+
+def dwell_summary(visits):
+    """Quantidade e duração média das visitas"""
+    summary = visits.aggregate(count=Count("id"), avg=Avg("duration_seconds"))
+    return {"count": summary["count"], "avg_seconds": summary["avg"]}
@@ -0,0 +1,102 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0005_occupancyrollups"),
+        ("events", "0004_partition_slot_status_events"),
+        ("tenants", "0002_remove_clientmembers_uq_client_members_client_user_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LotDailyTurnover",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("day", models.DateField()),
+                ("visit_count", models.PositiveIntegerField(default=0)),
+                ("total_dwell_seconds", models.BigIntegerField(default=0)),
+                (
+                    "lot",
+                    models.ForeignKey(
+                        db_column="lot_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="daily_turnover",
+                        to="catalog.lots",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "lot_daily_turnover",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("lot", "day"), name="uq_lot_daily_turnover_day"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="SlotVisits",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("started_at", models.DateTimeField()),
+                ("ended_at", models.DateTimeField()),
+                ("duration_seconds", models.PositiveIntegerField()),
+                ("start_event_id", models.UUIDField(blank=True, null=True)),
+                ("end_event_id", models.UUIDField(blank=True, null=True)),
+                (
+                    "client",
+                    models.ForeignKey(
+                        db_column="client_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="slot_visits",
+                        to="tenants.clients",
+                    ),
+                ),
+                (
+                    "lot",
+                    models.ForeignKey(
+                        db_column="lot_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="slot_visits",
+                        to="catalog.lots",
+                    ),
+                ),
+                (
+                    "slot",
+                    models.ForeignKey(
+                        db_column="slot_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="visits",
+                        to="catalog.slots",
+                    ),
+                ),
+                (
+                    "vehicle_type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="vehicle_type_id",
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="slot_visits",
+                        to="catalog.vehicletypes",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "slot_visits",
+                "indexes": [
+                    models.Index(
+                        fields=["lot", "started_at"], name="ix_slot_visits_lot_start"
+                    ),
+                    models.Index(
+                        fields=["slot", "started_at"], name="ix_slot_visits_slot_start"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_slot_status_events_global_unique"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="slotstatusevents",
+            index=models.Index(
+                fields=["received_at", "id"], name="ix_slot_sts_events_rcv_at"
+            ),
+        ),
+    ]
@@ -71,7 +71,94 @@ class SlotStatusEvents(TenantModel):
             models.Index(
                 fields=["slot", "occurred_at"], name="ix_slot_sts_events_occ_at"
             ),
+            # Leitura incremental na ordem de chegada (apps.events.analytics)
+            models.Index(
+                fields=["received_at", "id"], name="ix_slot_sts_events_rcv_at"
+            ),
         ]
 
     def __str__(self):
-        return f"{self.event_type} - {self.slot.slot_code} ({self.occurred_at})"
\ No newline at end of file
+        return f"{self.event_type} - {self.slot.slot_code} ({self.occurred_at})"
+
+
+class SlotVisits(models.Model):
+    """
+    Permanência de um veículo em uma vaga (de OCCUPIED até a liberação),
+    derivada dos eventos de status (ver apps.events.analytics)
+    """
+    id = models.BigAutoField(primary_key=True)
+    client = models.ForeignKey(
+        "tenants.Clients",
+        on_delete=models.PROTECT,
+        db_column="client_id",
+        related_name="slot_visits",
+    )
+    lot = models.ForeignKey(
+        "catalog.Lots",
+        on_delete=models.PROTECT,
+        db_column="lot_id",
+        related_name="slot_visits",
+    )
+    slot = models.ForeignKey(
+        "catalog.Slots",
+        on_delete=models.PROTECT,
+        db_column="slot_id",
+        related_name="visits",
+    )
+    vehicle_type = models.ForeignKey(
+        "catalog.VehicleTypes",
+        on_delete=models.PROTECT,
+        db_column="vehicle_type_id",
+        null=True,
+        blank=True,
+        related_name="slot_visits",
+    )
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    duration_seconds = models.PositiveIntegerField()
+    # UUIDs dos eventos (não FKs: os eventos podem ser arquivados)
+    start_event_id = models.UUIDField(null=True, blank=True)
+    end_event_id = models.UUIDField(null=True, blank=True)
+
+    class Meta:
+        db_table = "slot_visits"
+        indexes = [
+            models.Index(fields=["lot", "started_at"], name="ix_slot_visits_lot_start"),
+            models.Index(
+                fields=["slot", "started_at"], name="ix_slot_visits_slot_start"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.slot.slot_code} - {self.started_at} ({self.duration_seconds}s)"
+
+
+class LotDailyTurnover(models.Model):
+    """Quantidade de visitas e tempo total de permanência por lote e dia (local)"""
+    id = models.BigAutoField(primary_key=True)
+    lot = models.ForeignKey(
+        "catalog.Lots",
+        on_delete=models.PROTECT,
+        db_column="lot_id",
+        related_name="daily_turnover",
+    )
+    day = models.DateField()
+    visit_count = models.PositiveIntegerField(default=0)
+    total_dwell_seconds = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "lot_daily_turnover"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lot", "day"], name="uq_lot_daily_turnover_day"
+            ),
+        ]
+
+    @property
+    def avg_dwell_seconds(self):
+        if not self.visit_count:
+            return None
+        return self.total_dwell_seconds / self.visit_count
+
+    def __str__(self):
+        return f"{self.lot.lot_code} - {self.day} ({self.visit_count})"
\ No newline at end of file
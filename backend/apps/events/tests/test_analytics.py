@@ -0,0 +1,201 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.tests.test_utils import local
+from apps.core.models import ProcessingCheckpoints
+from apps.events.analytics import DwellTimeEngine, dwell_histogram
+from apps.events.models import LotDailyTurnover, SlotVisits
+from .test_utils import TestDataMixin
+
+
+class DwellDataMixin(TestDataMixin):
+    """Cenário: duas vagas do mesmo lote"""
+
+    def create_scenario(self):
+        self.lot = self.create_lot()
+        self.car = self.create_vehicle_type("Carro")
+        self.slot_a = self.create_slot(slot_code="A1", lot=self.lot)
+        self.slot_b = self.create_slot(slot_code="B1", lot=self.lot)
+
+        # A: 10:00-10:20 e 11:00-13:00; B: 10:30 ocupa e segue ocupada
+        self.create_slot_status_event(
+            slot=self.slot_a,
+            curr_status="OCCUPIED",
+            occurred_at=local(10),
+            received_at=local(10),
+            curr_vehicle=self.car,
+        )
+        self.create_slot_status_event(
+            slot=self.slot_a,
+            curr_status="FREE",
+            occurred_at=local(10, 20),
+            received_at=local(10, 20),
+        )
+        self.create_slot_status_event(
+            slot=self.slot_b,
+            curr_status="OCCUPIED",
+            occurred_at=local(10, 30),
+            received_at=local(10, 30),
+        )
+        self.create_slot_status_event(
+            slot=self.slot_a,
+            curr_status="OCCUPIED",
+            occurred_at=local(11),
+            received_at=local(11),
+        )
+        self.create_slot_status_event(
+            slot=self.slot_a,
+            curr_status="FREE",
+            occurred_at=local(13),
+            received_at=local(13),
+        )
+
+
+class DwellTimeEngineTest(TestCase, DwellDataMixin):
+    """Testes para DwellTimeEngine"""
+
+    def setUp(self):
+        self.create_scenario()
+
+    def test_visits_from_events(self):
+        """Testa visitas derivadas das transições de status"""
+        stats = DwellTimeEngine(lag_seconds=0).run(until=local(14))
+
+        self.assertEqual(stats, {"events": 5, "visits": 2})
+        visits = list(SlotVisits.objects.order_by("started_at"))
+        self.assertEqual([v.duration_seconds for v in visits], [1200, 7200])
+        self.assertEqual(visits[0].vehicle_type, self.car)
+        self.assertIsNone(visits[1].vehicle_type)
+
+        turnover = LotDailyTurnover.objects.get(lot=self.lot)
+        self.assertEqual(turnover.visit_count, 2)
+        self.assertEqual(turnover.avg_dwell_seconds, 4200)
+
+    def test_incremental_runs_keep_open_visits(self):
+        """Testa que a visita aberta continua entre execuções"""
+        engine = DwellTimeEngine(lag_seconds=0, batch_size=2)
+        first = engine.run(until=local(12))
+        self.create_slot_status_event(
+            slot=self.slot_b,
+            curr_status="FREE",
+            occurred_at=local(15),
+            received_at=local(15),
+        )
+        second = engine.run(until=local(16))
+
+        self.assertEqual(first["visits"], 1)
+        self.assertEqual(second["visits"], 2)
+        self.assertEqual(
+            SlotVisits.objects.get(slot=self.slot_b).duration_seconds, 4.5 * 3600
+        )
+        self.assertEqual(LotDailyTurnover.objects.get(lot=self.lot).visit_count, 3)
+
+        checkpoint = ProcessingCheckpoints.objects.get(name="slot_visits")
+        self.assertEqual(checkpoint.state["open_visits"], {})
+
+    def test_late_event_is_processed(self):
+        """Testa evento recebido depois do checkpoint, com occurred_at antigo"""
+        engine = DwellTimeEngine(lag_seconds=0)
+        engine.run(until=local(14))
+        # Reenviado pela câmera às 15:00, ocorrido às 12:00
+        self.create_slot_status_event(
+            slot=self.slot_b,
+            curr_status="FREE",
+            occurred_at=local(12),
+            received_at=local(15),
+        )
+        stats = engine.run(until=local(16))
+
+        self.assertEqual(stats, {"events": 1, "visits": 1})
+        self.assertEqual(
+            SlotVisits.objects.get(slot=self.slot_b).duration_seconds, 1.5 * 3600
+        )
+
+    def test_late_event_before_open_visit_is_ignored(self):
+        """Testa que um evento atrasado não encerra visita posterior a ele"""
+        engine = DwellTimeEngine(lag_seconds=0)
+        engine.run(until=local(14))
+        self.create_slot_status_event(
+            slot=self.slot_b,
+            curr_status="FREE",
+            occurred_at=local(10),
+            received_at=local(15),
+        )
+        stats = engine.run(until=local(16))
+
+        self.assertEqual(stats, {"events": 1, "visits": 0})
+        checkpoint = ProcessingCheckpoints.objects.get(name="slot_visits")
+        self.assertIn(str(self.slot_b.id), checkpoint.state["open_visits"])
+
+    def test_histogram(self):
+        """Testa o histograma de permanência"""
+        DwellTimeEngine(lag_seconds=0).run(until=local(14))
+
+        histogram = dwell_histogram(SlotVisits.objects.all())
+
+        counts = {row["min_seconds"]: row["count"] for row in histogram}
+        self.assertEqual(counts[900], 1)
+        self.assertEqual(counts[7200], 1)
+        self.assertEqual(sum(counts.values()), 2)
+        self.assertIsNone(histogram[-1]["max_seconds"])
+
+    def test_command_reset(self):
+        """Testa o comando build_dwell_analytics com --reset"""
+        DwellTimeEngine(lag_seconds=0).run(until=local(14))
+        out = StringIO()
+        call_command("build_dwell_analytics", "--reset", stdout=out)
+
+        self.assertIn("5 eventos", out.getvalue())
+        self.assertEqual(SlotVisits.objects.count(), 2)
+        self.assertEqual(LotDailyTurnover.objects.get(lot=self.lot).visit_count, 2)
+
+
+class LotDwellTimeViewTest(APITestCase, DwellDataMixin):
+    """Testes para LotDwellTimeView"""
+
+    def setUp(self):
+        self.create_scenario()
+        DwellTimeEngine(lag_seconds=0).run(until=local(14))
+
+        self.user = self.create_user()
+        role = self.create_group("client_member")
+        self.create_client_member(self.user, self.lot.client, role=role)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("events:lot-dwell-times", kwargs={"lot_id": self.lot.id})
+        self.params = {"from": local(0).isoformat(), "to": local(0, day=11).isoformat()}
+
+    def test_dwell_times(self):
+        """Testa resumo, histograma e rotatividade do lote"""
+        response = self.client.get(self.url, self.params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["avg_seconds"], 4200)
+        self.assertEqual(len(response.data["turnover"]), 1)
+        self.assertEqual(response.data["turnover"][0]["turnover_per_slot"], 1)
+
+    def test_vehicle_type_filter(self):
+        """Testa o filtro por tipo de veículo"""
+        response = self.client.get(
+            self.url, {**self.params, "vehicle_type": self.car.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.client.get(self.url, {"vehicle_type": "carro"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_client_lot_not_found(self):
+        """Testa que lotes de outros clientes não são acessíveis"""
+        other_lot = self.create_lot(client=self.create_client(name="Outro"))
+        url = reverse("events:lot-dwell-times", kwargs={"lot_id": other_lot.id})
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
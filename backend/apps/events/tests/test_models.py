@@ -146,9 +146,11 @@ class SlotStatusEventsModelTest(TestCase, TestDataMixin):
 
         # Verifica se o índice foi criado
         indexes = SlotStatusEvents._meta.indexes
-        self.assertEqual(len(indexes), 1)
+        self.assertEqual(len(indexes), 2)
         self.assertEqual(indexes[0].name, "ix_slot_sts_events_occ_at")
         self.assertEqual(indexes[0].fields, ["slot", "occurred_at"])
+        self.assertEqual(indexes[1].name, "ix_slot_sts_events_rcv_at")
+        self.assertEqual(indexes[1].fields, ["received_at", "id"])
 
     def test_decimal_field_precision(self):
         """Testa precisão do campo confidence"""
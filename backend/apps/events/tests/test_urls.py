@@ -23,6 +23,22 @@ class EventsUrlsTest(TestCase):
         self.assertEqual(resolver.func.view_class, views.SlotStatusEventDetailView)
         self.assertEqual(resolver.kwargs["pk"], 123)
 
+    def test_slot_status_event_export_url(self):
+        """Testa URL de exportação de eventos de status de slot"""
+        url = reverse("events:slot-status-event-export")
+        self.assertEqual(url, "/api/events/slot-status-events/export/")
+
+        resolver = resolve(url)
+        self.assertEqual(resolver.func.view_class, views.SlotStatusEventExportView)
+
+    def test_lot_dwell_times_url(self):
+        """Testa URL de tempo de permanência do lote"""
+        url = reverse("events:lot-dwell-times", kwargs={"lot_id": 7})
+        self.assertEqual(url, "/api/events/lots/7/dwell-times/")
+
+        resolver = resolve(url)
+        self.assertEqual(resolver.func.view_class, views.LotDwellTimeView)
+
     def test_app_name(self):
         """Testa se o app_name está definido corretamente"""
         # Verificar se o namespace funciona
@@ -33,7 +49,7 @@ class EventsUrlsTest(TestCase):
         """Testa que temos o número esperado de URLs"""
         from apps.events.urls import urlpatterns
 
-        self.assertEqual(len(urlpatterns), 2)
+        self.assertEqual(len(urlpatterns), 4)
 
     def test_all_view_classes_resolvable(self):
         """Testa que todas as views podem ser resolvidas"""
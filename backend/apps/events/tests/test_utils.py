@@ -106,6 +106,7 @@ class TestDataMixin:
         curr_status="OCCUPIED",
         prev_status="FREE",
         occurred_at=None,
+        received_at=None,
         **kwargs,
     ):
         """Cria um evento de status de slot para testes"""
@@ -117,7 +118,7 @@ class TestDataMixin:
 
         lot = kwargs.pop("lot", slot.lot)
 
-        return SlotStatusEvents.objects.create(
+        event = SlotStatusEvents.objects.create(
             event_type=event_type,
             slot=slot,
             lot=lot,
@@ -127,3 +128,8 @@ class TestDataMixin:
             occurred_at=occurred_at,
             **kwargs,
         )
+        if received_at is not None:
+            # received_at é auto_now_add: o instante vai depois do insert
+            SlotStatusEvents.objects.filter(pk=event.pk).update(received_at=received_at)
+            event.received_at = received_at
+        return event
@@ -180,6 +180,87 @@ class SlotStatusEventListCreateViewTest(APITestCase, TestDataMixin):
         # Usuário sem cliente não tem permissão
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_export_events_csv(self):
+        """Testa exportação de eventos em CSV, em ordem de ocorrência"""
+        from datetime import timedelta
+
+        now = timezone.now()
+        later = self.create_slot_status_event(slot=self.slot, occurred_at=now)
+        earlier = self.create_slot_status_event(
+            slot=self.slot, occurred_at=now - timedelta(hours=1)
+        )
+
+        response = self.client_api.get("/api/events/slot-status-events/export/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith(f"{earlier.id},"))
+        self.assertTrue(lines[2].startswith(f"{later.id},"))
+
+    def test_export_events_respects_time_range(self):
+        """Testa filtro from/to na exportação"""
+        from datetime import timedelta
+
+        now = timezone.now()
+        self.create_slot_status_event(slot=self.slot, occurred_at=now)
+        self.create_slot_status_event(
+            slot=self.slot, occurred_at=now - timedelta(days=10)
+        )
+
+        response = self.client_api.get(
+            "/api/events/slot-status-events/export/",
+            {"from": (now - timedelta(days=1)).isoformat(), "export_format": "ndjson"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+
+    def test_export_events_accept_header(self):
+        """Testa a escolha do formato pelo cabeçalho Accept"""
+        self.create_slot_status_event(slot=self.slot)
+
+        for accept, lines_expected in (("text/csv", 2), ("application/x-ndjson", 1)):
+            response = self.client_api.get(
+                "/api/events/slot-status-events/export/", HTTP_ACCEPT=accept
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response["Content-Type"].startswith(accept))
+            lines = b"".join(response.streaming_content).decode().splitlines()
+            self.assertEqual(len(lines), lines_expected)
+
+    def test_export_events_invalid_format_with_csv_accept(self):
+        """Testa que erros saem em JSON mesmo com Accept: text/csv"""
+        response = self.client_api.get(
+            "/api/events/slot-status-events/export/",
+            {"export_format": "xml"},
+            HTTP_ACCEPT="text/csv",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("export_format", response.json())
+
+    def test_export_events_other_client_not_included(self):
+        """Testa que a exportação respeita o escopo do cliente"""
+        other_client = self.create_client(name="Outro Cliente")
+        other_slot = self.create_slot(client=other_client)
+        self.create_slot_status_event(slot=other_slot)
+
+        response = self.client_api.get("/api/events/slot-status-events/export/")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+
+    def test_export_events_post_not_allowed(self):
+        """Testa que a exportação é somente leitura"""
+        response = self.client_api.post("/api/events/slot-status-events/export/", {})
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
 
 class SlotStatusEventDetailViewTest(APITestCase, TestDataMixin):
     """Testes para SlotStatusEventDetailView"""
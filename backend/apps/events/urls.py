@@ -6,5 +6,9 @@ app_name = 'events'
 urlpatterns = [
     # Eventos de status de vagas
     path('slot-status-events/', views.SlotStatusEventListCreateView.as_view(), name='slot-status-event-list'),
+    path('slot-status-events/export/', views.SlotStatusEventExportView.as_view(), name='slot-status-event-export'),
     path('slot-status-events/<int:pk>/', views.SlotStatusEventDetailView.as_view(), name='slot-status-event-detail'),
+
+    # Análises
+    path('lots/<int:lot_id>/dwell-times/', views.LotDwellTimeView.as_view(), name='lot-dwell-times'),
 ]
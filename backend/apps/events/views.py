@@ -1,14 +1,34 @@
+from datetime import timedelta
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from .analytics import dwell_histogram, dwell_summary
+from .models import LotDailyTurnover, SlotVisits
 from .serializers import SlotStatusEventSerializer, SlotStatusEventCreateSerializer
 from apps.core.permissions import IsClientMember
-from apps.core.views import TenantViewSetMixin, SearchMixin, PaginationMixin
+from apps.core.views import (
+    FilterByClientMixin,
+    TenantViewSetMixin,
+    SearchMixin,
+    PaginationMixin,
+    TimeRangeFilterMixin,
+)
+from apps.core.pagination import COUNT_MODE_ESTIMATED
+from apps.core.export import StreamingExportMixin
+from apps.catalog.models import Lots
 
 
 @extend_schema_view(
     get=extend_schema(
         summary="List slot status events",
-        description="Retrieve paginated list of slot status change events",
+        description=(
+            "Retrieve paginated list of slot status change events. "
+            "Use `from`/`to` (ISO 8601) to bound `occurred_at`."
+        ),
         tags=["Events - System Events"],
     ),
     post=extend_schema(
@@ -18,11 +38,17 @@ from apps.core.views import TenantViewSetMixin, SearchMixin, PaginationMixin
     ),
 )
 class SlotStatusEventListCreateView(
-    TenantViewSetMixin, SearchMixin, PaginationMixin, generics.ListCreateAPIView
+    TimeRangeFilterMixin,
+    TenantViewSetMixin,
+    SearchMixin,
+    PaginationMixin,
+    generics.ListCreateAPIView,
 ):
     serializer_class = SlotStatusEventSerializer
     permission_classes = [IsClientMember]
     search_fields = ["event_type", "slot__slot_code", "lot__lot_code"]
+    count_mode = COUNT_MODE_ESTIMATED
+    time_range_field = "occurred_at"
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -30,6 +56,45 @@ class SlotStatusEventListCreateView(
         return SlotStatusEventSerializer
 
 
+@extend_schema(
+    summary="Export slot status events",
+    description=(
+        "Stream slot status events as CSV (default) or NDJSON "
+        "(`export_format=ndjson` or `Accept: application/x-ndjson`), optionally "
+        "gzip-compressed (`compress=gzip`). "
+        "Accepts the same `from`/`to` and `search` filters as the list endpoint."
+    ),
+    tags=["Events - System Events"],
+    responses={(200, "text/csv"): str, (200, "application/x-ndjson"): str},
+)
+class SlotStatusEventExportView(
+    StreamingExportMixin, FilterByClientMixin, SlotStatusEventListCreateView
+):
+    http_method_names = ["get", "head", "options"]
+    export_fields = [
+        "id",
+        "event_id",
+        "event_type",
+        "occurred_at",
+        "received_at",
+        "lot_id",
+        "lot__lot_code",
+        "slot_id",
+        "slot__slot_code",
+        "camera_id",
+        "sequence",
+        "prev_status",
+        "prev_vehicle__name",
+        "curr_status",
+        "curr_vehicle__name",
+        "confidence",
+        "source_model",
+        "source_version",
+    ]
+    export_ordering = ["occurred_at", "id"]
+    export_filename = "slot-status-events"
+
+
 @extend_schema(
     summary="Get slot status event details",
     description="Retrieve details of a specific slot status event",
@@ -38,3 +103,91 @@ class SlotStatusEventListCreateView(
 class SlotStatusEventDetailView(TenantViewSetMixin, generics.RetrieveAPIView):
     serializer_class = SlotStatusEventSerializer
     permission_classes = [IsClientMember]
+
+
+@extend_schema(
+    summary="Lot dwell times and turnover",
+    description=(
+        "Dwell time distribution and daily turnover of a lot, computed from "
+        "the slot visits derived from the event stream. `from`/`to` "
+        "(ISO 8601) bound the visit start (default: last 30 days); "
+        "`vehicle_type` restricts to one vehicle type."
+    ),
+    tags=["Events - Analytics"],
+    responses={
+        200: {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer"},
+                "avg_seconds": {"type": "number", "nullable": True},
+                "histogram": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "min_seconds": {"type": "integer"},
+                            "max_seconds": {"type": "integer", "nullable": True},
+                            "count": {"type": "integer"},
+                        },
+                    },
+                },
+                "turnover": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "day": {"type": "string", "format": "date"},
+                            "visit_count": {"type": "integer"},
+                            "avg_dwell_seconds": {"type": "number", "nullable": True},
+                            "turnover_per_slot": {"type": "number", "nullable": True},
+                        },
+                    },
+                },
+            },
+        }
+    },
+)
+class LotDwellTimeView(TimeRangeFilterMixin, generics.GenericAPIView):
+    permission_classes = [IsClientMember]
+    default_window = timedelta(days=30)
+
+    def get(self, request, *args, **kwargs):
+        lot = get_object_or_404(
+            Lots.objects.for_user(request.user), pk=self.kwargs["lot_id"]
+        )
+        start, end = self.get_time_range()
+        end = end or timezone.now()
+        start = start or end - self.default_window
+        if start >= end:
+            raise ValidationError({"from": "Deve ser anterior ao fim do intervalo."})
+
+        visits = SlotVisits.objects.filter(
+            lot=lot, started_at__gte=start, started_at__lt=end
+        )
+        vehicle_type = request.query_params.get("vehicle_type")
+        if vehicle_type:
+            if not vehicle_type.isdigit():
+                raise ValidationError(
+                    {"vehicle_type": "Informe o ID do tipo de veículo."}
+                )
+            visits = visits.filter(vehicle_type_id=vehicle_type)
+
+        data = dwell_summary(visits)
+        data["histogram"] = dwell_histogram(visits)
+
+        # A rotatividade diária é pré-agregada por lote (todos os veículos)
+        capacity = lot.slots.filter(active=True).count()
+        data["turnover"] = [
+            {
+                "day": row.day,
+                "visit_count": row.visit_count,
+                "avg_dwell_seconds": row.avg_dwell_seconds,
+                "turnover_per_slot": (row.visit_count / capacity if capacity else None),
+            }
+            for row in LotDailyTurnover.objects.filter(
+                lot=lot,
+                day__gte=timezone.localdate(start),
+                day__lte=timezone.localdate(end - timedelta(microseconds=1)),
+            ).order_by("day")
+        ]
+        return Response(data)
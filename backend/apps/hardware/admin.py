@@ -5,6 +5,7 @@ from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
 from .models import ApiKeys, Cameras, CameraHeartbeats
+from apps.core.pagination import EstimatedCountAdminMixin
 
 # Importar o admin_site customizado
 from smartpark.admin import admin_site
@@ -230,7 +231,7 @@ class CamerasAdmin(admin.ModelAdmin):
     set_maintenance.short_description = "Definir como manutenção"
 
 
-class CameraHeartbeatsAdmin(admin.ModelAdmin):
+class CameraHeartbeatsAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ["camera_info", "received_at", "payload_preview", "time_since"]
     list_filter = ["received_at", "camera__client"]
     search_fields = ["camera__camera_code", "camera__client__name"]
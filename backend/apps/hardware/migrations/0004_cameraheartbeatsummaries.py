@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hardware", "0003_partition_camera_heartbeats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CameraHeartbeatSummaries",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("interval_seconds", models.PositiveIntegerField()),
+                ("bucket_start", models.DateTimeField()),
+                ("heartbeat_count", models.PositiveIntegerField(default=0)),
+                ("first_received_at", models.DateTimeField()),
+                ("last_received_at", models.DateTimeField()),
+                (
+                    "camera",
+                    models.ForeignKey(
+                        db_column="camera_id",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="heartbeat_summaries",
+                        to="hardware.cameras",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "camera_heartbeat_summaries",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("camera", "interval_seconds", "bucket_start"),
+                        name="uq_cam_hb_summaries_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+from apps.core.partitioning import (
+    create_global_unique,
+    drop_global_unique,
+    is_partitioned,
+    is_postgresql,
+)
+
+TABLE = "camera_heartbeats"
+# Colunas que o model declara unique=True e que o particionamento estendeu
+# com a coluna de tempo
+UNIQUE_COLUMNS = [
+    ["public_id"],
+]
+
+
+def global_unique_forward(apps, schema_editor):
+    """Volta a garantir a unicidade das colunas na tabela inteira"""
+    connection = schema_editor.connection
+    if is_postgresql(connection) and is_partitioned(connection, TABLE):
+        for columns in UNIQUE_COLUMNS:
+            create_global_unique(connection, TABLE, columns)
+
+
+def global_unique_backward(apps, schema_editor):
+    connection = schema_editor.connection
+    if is_postgresql(connection):
+        for columns in UNIQUE_COLUMNS:
+            drop_global_unique(connection, TABLE, columns)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hardware", "0004_cameraheartbeatsummaries"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            global_unique_forward, global_unique_backward, elidable=False
+        ),
+    ]
@@ -88,4 +88,32 @@ class CameraHeartbeats(BaseModel):
         ]
 
     def __str__(self):
-        return f"Heartbeat {self.camera.camera_code} - {self.received_at}"
\ No newline at end of file
+        return f"Heartbeat {self.camera.camera_code} - {self.received_at}"
+
+
+class CameraHeartbeatSummaries(models.Model):
+    """Resumo de heartbeats por intervalo, gerado pela política de retenção"""
+    id = models.BigAutoField(primary_key=True)
+    camera = models.ForeignKey(
+        "Cameras",
+        on_delete=models.PROTECT,
+        db_column="camera_id",
+        related_name="heartbeat_summaries",
+    )
+    interval_seconds = models.PositiveIntegerField()
+    bucket_start = models.DateTimeField()
+    heartbeat_count = models.PositiveIntegerField(default=0)
+    first_received_at = models.DateTimeField()
+    last_received_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "camera_heartbeat_summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["camera", "interval_seconds", "bucket_start"],
+                name="uq_cam_hb_summaries_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.camera.camera_code} - {self.bucket_start} ({self.heartbeat_count})"
@@ -136,6 +136,8 @@ class SlotStatusEventSerializer(serializers.Serializer):
     confidence = serializers.DecimalField(
         max_digits=4, decimal_places=3, required=False, allow_null=True
     )
+    # Momento da detecção na câmera (padrão: quando o evento chega)
+    occurred_at = serializers.DateTimeField(required=False, allow_null=True)
 
     def validate_status(self, value):
         # Assume that valid statuses are defined somewhere
@@ -332,6 +332,115 @@ class SlotStatusEventViewTest(TestCase, TestDataMixin):
         # Should return 500 since Http404 is caught in exception handler
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def test_occurred_at_is_recorded(self):
+        """Testa que a hora do evento vai para occurred_at, sem mudar recorded_at"""
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from model_bakery import baker
+
+        from apps.catalog.models import Slots, SlotStatus, SlotStatusHistory
+
+        slot = baker.make(Slots)
+        before = timezone.now()
+        occurred_at = before - timedelta(minutes=10)
+
+        for value in ("OCCUPIED", "FREE"):
+            response = self.client_api.post(
+                self.url,
+                {"slot_id": slot.id, "status": value, "occurred_at": occurred_at},
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(SlotStatus.objects.get(slot=slot).changed_at, occurred_at)
+
+        history = SlotStatusHistory.objects.filter(slot=slot)
+        for row in history:
+            self.assertEqual(row.occurred_at, occurred_at)
+            self.assertGreaterEqual(row.recorded_at, before)
+
+    def test_occurred_at_in_the_future_is_clamped(self):
+        """Testa que um relógio adiantado na câmera não grava mudanças no futuro"""
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from model_bakery import baker
+
+        from apps.catalog.models import Slots, SlotStatusHistory
+
+        slot = baker.make(Slots)
+        before = timezone.now()
+        response = self.client_api.post(
+            self.url,
+            {
+                "slot_id": slot.id,
+                "status": "OCCUPIED",
+                "occurred_at": before + timedelta(hours=1),
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        history = SlotStatusHistory.objects.get(slot=slot)
+        self.assertLessEqual(history.occurred_at, timezone.now())
+        self.assertGreaterEqual(history.occurred_at, before)
+
+    def test_replayed_event_is_read_after_snapshot(self):
+        """Testa que evento reenviado depois de uma foto do lote não se perde"""
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from model_bakery import baker
+
+        from apps.catalog.models import Slots
+        from apps.catalog.point_in_time import lot_status_as_of, take_snapshot
+
+        slot = baker.make(Slots)
+        take_snapshot(slot.lot, timezone.now())
+
+        response = self.client_api.post(
+            self.url,
+            {
+                "slot_id": slot.id,
+                "status": "OCCUPIED",
+                "occurred_at": timezone.now() - timedelta(minutes=10),
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        _, results = lot_status_as_of(slot.lot, timezone.now())
+        self.assertEqual([row["status"] for row in results], ["OCCUPIED"])
+
+    def test_replayed_event_is_read_by_next_rollup_run(self):
+        """Testa que evento reenviado depois de uma execução entra nos rollups"""
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from model_bakery import baker
+
+        from apps.catalog.models import Slots
+        from apps.catalog.rollups import OccupancyRollupBuilder
+
+        slot = baker.make(Slots)
+        builder = OccupancyRollupBuilder(lag_seconds=0)
+        self.client_api.post(
+            self.url, {"slot_id": slot.id, "status": "OCCUPIED"}, format="json"
+        )
+        self.assertEqual(builder.run(until=timezone.now())["rows"], 1)
+
+        self.client_api.post(
+            self.url,
+            {
+                "slot_id": slot.id,
+                "status": "FREE",
+                "occurred_at": timezone.now() - timedelta(minutes=10),
+            },
+            format="json",
+        )
+
+        self.assertEqual(builder.run(until=timezone.now())["rows"], 1)
+
 
 class ViewPermissionsTest(TestCase, TestDataMixin):
     """Testes de permissões das views"""
@@ -6,6 +6,8 @@ from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
 from apps.catalog.models import Slots, SlotStatus, SlotStatusHistory
+from apps.catalog.regions import record_status_change
+from apps.catalog.trends import trends
 from .serializers import (
     ApiKeySerializer,
     ApiKeyCreateSerializer,
@@ -16,11 +18,13 @@ from .serializers import (
     SlotStatusEventSerializer,
 )
 from apps.core.permissions import IsClientAdminForClient, IsClientMember
+from apps.core.pagination import COUNT_MODE_ESTIMATED
 from apps.core.views import (
     TenantViewSetMixin,
     SearchMixin,
     PaginationMixin,
     FilterByClientMixin,
+    TimeRangeFilterMixin,
 )
 
 
@@ -149,15 +153,24 @@ class CameraHeartbeatCreateView(generics.CreateAPIView):
 
 @extend_schema(
     summary="List camera heartbeats",
-    description="Retrieve paginated list of heartbeats for a specific camera",
+    description=(
+        "Retrieve paginated list of heartbeats for a specific camera. "
+        "Use `from`/`to` (ISO 8601) to bound `received_at`."
+    ),
     tags=["Hardware - Camera Monitoring"],
 )
 class CameraHeartbeatListView(
-    FilterByClientMixin, SearchMixin, PaginationMixin, generics.ListAPIView
+    TimeRangeFilterMixin,
+    FilterByClientMixin,
+    SearchMixin,
+    PaginationMixin,
+    generics.ListAPIView,
 ):
     serializer_class = CameraHeartbeatSerializer
     permission_classes = [IsClientMember]
     search_fields = ["payload_json"]
+    count_mode = COUNT_MODE_ESTIMATED
+    time_range_field = "received_at"
 
     def get_queryset(self):
         from .models import CameraHeartbeats
@@ -165,9 +178,10 @@ class CameraHeartbeatListView(
         if getattr(self, "swagger_fake_view", False):
             return CameraHeartbeats.objects.none()
         camera_id = self.kwargs["camera_id"]
-        return CameraHeartbeats.objects.filter(camera_id=camera_id).order_by(
+        queryset = CameraHeartbeats.objects.filter(camera_id=camera_id).order_by(
             "-received_at"
         )
+        return self.filter_time_range(queryset)
 
 
 @extend_schema(
@@ -197,6 +211,12 @@ def slot_status_event_view(request):
         slot_status_value = validated_data["status"]
         vehicle_type_id = validated_data.get("vehicle_type_id")
         confidence = validated_data.get("confidence")
+        now = timezone.now()
+        occurred_at = validated_data.get("occurred_at")
+        if occurred_at is not None:
+            # Eventos reenviados do spool chegam atrasados; relógio adiantado
+            # da câmera não pode gravar mudanças no futuro
+            occurred_at = min(occurred_at, now)
 
         # Buscar a vaga
         slot = get_object_or_404(Slots, id=slot_id)
@@ -211,21 +231,28 @@ def slot_status_event_view(request):
             },
         )
 
+        previous_status = None
         if not created:
+            previous_status = slot_status.status
             # Atualizar status existente
             slot_status.status = slot_status_value
             slot_status.vehicle_type_id = vehicle_type_id
             slot_status.confidence = confidence
-            slot_status.changed_at = timezone.now()
+            slot_status.changed_at = occurred_at or now
             slot_status.save()
+        elif occurred_at is not None:
+            SlotStatus.objects.filter(pk=slot_status.pk).update(changed_at=occurred_at)
 
         # Criar entrada no histórico
-        SlotStatusHistory.objects.create(
+        history = SlotStatusHistory.objects.create(
             slot=slot,
             status=slot_status_value,
             vehicle_type_id=vehicle_type_id,
             confidence=confidence,
+            occurred_at=occurred_at,
         )
+        trends.record_on_commit(history)
+        record_status_change(slot, previous_status, slot_status_value)
 
         return Response(
             {
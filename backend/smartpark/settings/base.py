@@ -94,11 +94,37 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.StandardResultsPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Retenção de dados (padrões; cada cliente pode sobrescrever via RetentionPolicies)
+# raw_days: dias mantidos em formato bruto
+# summary_interval: tamanho do intervalo dos resumos, em segundos
+# summary_days: dias de retenção dos resumos (None = manter para sempre)
+DATA_RETENTION = {
+    "camera_heartbeats": {"raw_days": 7, "summary_interval": 3600, "summary_days": 365},
+    "slot_status_history": {
+        "raw_days": 180,
+        "summary_interval": 3600,
+        "summary_days": None,
+    },
+}
+
+# Arquivamento (arquivos colunares compactados, por cliente e mês)
+# after_days: meses inteiros anteriores a (hoje - after_days) são arquivados
+# delete: remove do banco as linhas arquivadas (após verificar o arquivo).
+# O histórico é mantido no banco para que a retenção gere os resumos antes de
+# removê-lo; por isso after_days deve ficar bem abaixo de raw_days.
+DATA_ARCHIVE = {
+    "root": env("DATA_ARCHIVE_ROOT", default=str(ROOT_DIR / "archive")),
+    "tables": {
+        "slot_status_events": {"after_days": 180, "delete": True},
+        "slot_status_history": {"after_days": 120, "delete": False},
+    },
+}
+
 # Swagger/Schema
 SPECTACULAR_SETTINGS = {
     "TITLE": "SmartPark API",
@@ -0,0 +1,208 @@
+"""
+Benchmark de desempenho e acurácia do detector sobre vídeos gravados.
+
+Roda o detector e o filtro de status (sem janelas nem envio) sobre cada
+quadro de uma ou mais câmeras do arquivo de câmeras do runner.py, com o
+vídeo gravado como fonte. Diferente do pipeline, nenhum quadro é
+descartado, então o resultado é o mesmo a cada execução e dá para comparar
+commits.
+
+Rótulos (CSV, um por vídeo; padrão: `<vídeo>.labels.csv`): a coluna
+"frame" e uma coluna por slot_id, com 1 (ocupada) ou 0 (livre). Quadros sem
+linha repetem a última linha anterior, então basta uma linha por mudança:
+    frame,12,13,14
+    0,0,1,0
+    240,1,1,0
+
+Saída (JSON): quadros/s, percentis de latência de cada etapa, pico de
+memória, precisão/revocação por vaga (do status filtrado e do score bruto
+contra o limiar) e número de eventos.
+
+Usage: python benchmark.py cameras.json [--camera ID] [--max-frames N] [--output resultado.json]
+"""
+
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from pipeline import LatencyCounter
+from runner import camera_detector, camera_tracker, load_cameras
+
+DEFAULT_FPS = 30.0
+
+
+def labels_path(source):
+    return f"{os.path.splitext(source)[0]}.labels.csv"
+
+
+def load_labels(path, slot_ids, frames):
+    """Matriz (quadros x vagas) de ocupação: 1, 0 ou -1 (sem rótulo)"""
+    with open(path, newline="", encoding="utf-8") as labels:
+        rows = sorted(
+            (int(row["frame"]), row) for row in csv.DictReader(labels) if row["frame"]
+        )
+    truth = np.full((frames, len(slot_ids)), -1, np.int8)
+    for position, (frame, row) in enumerate(rows):
+        end = rows[position + 1][0] if position + 1 < len(rows) else frames
+        for index, slot_id in enumerate(slot_ids):
+            value = row.get(str(slot_id), "")
+            if value != "":
+                truth[frame:end, index] = int(value)
+    return truth
+
+
+def classification(predicted, truth):
+    """Precisão, revocação e contagens de uma vaga (só quadros rotulados)"""
+    labeled = truth >= 0
+    predicted, truth = predicted[labeled], truth[labeled] == 1
+    true_positives = int(np.count_nonzero(predicted & truth))
+    false_positives = int(np.count_nonzero(predicted & ~truth))
+    false_negatives = int(np.count_nonzero(~predicted & truth))
+    return {
+        "frames": int(labeled.sum()),
+        "precision": (
+            true_positives / (true_positives + false_positives)
+            if true_positives + false_positives
+            else None
+        ),
+        "recall": (
+            true_positives / (true_positives + false_negatives)
+            if true_positives + false_negatives
+            else None
+        ),
+        "accuracy": float(np.mean(predicted == truth)) if len(truth) else None,
+        "false_positives": false_positives,
+        "false_negatives": false_negatives,
+    }
+
+
+def benchmark_camera(camera, max_frames=None):
+    """Roda o detector sobre o vídeo da câmera e retorna as métricas"""
+    detector = camera_detector(camera)
+    tracker = camera_tracker(camera)
+    slot_ids = [slot["slot_id"] for slot in camera["slots"]]
+    latency = {
+        "decode": LatencyCounter(),
+        "detect": LatencyCounter(),
+        "track": LatencyCounter(),
+    }
+
+    video = cv2.VideoCapture(camera["source"])
+    if not video.isOpened():
+        raise SystemExit(f"Não foi possível abrir o vídeo {camera['source']}")
+    fps = video.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+    scores, states = [], []
+    started = time.perf_counter()
+    try:
+        while max_frames is None or len(scores) < max_frames:
+            with latency["decode"].time():
+                check, frame = video.read()
+            if not check:
+                break
+            with latency["detect"].time():
+                frame_scores = detector.detect(frame)
+            with latency["track"].time():
+                # Tempo do vídeo, para o tempo mínimo valer como ao vivo
+                tracker.update(frame_scores, len(scores) / fps)
+            scores.append(np.array(frame_scores, float))
+            states.append(tracker.occupied.copy())
+    finally:
+        video.release()
+    elapsed = time.perf_counter() - started
+
+    frames = len(scores)
+    result = {
+        "camera": camera["id"],
+        "source": camera["source"],
+        "frames": frames,
+        "slots": len(slot_ids),
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed else None,
+        "detect_fps": (
+            latency["detect"].count / latency["detect"].total
+            if latency["detect"].total
+            else None
+        ),
+        "stages": {name: counter.snapshot() for name, counter in latency.items()},
+        "events": tracker.emitted,
+        "suppressed": tracker.suppressed,
+    }
+    if detector.gate is not None:
+        result["motion_skip_ratio"] = detector.gate.skip_ratio
+    if hasattr(detector, "fallbacks"):
+        # Avaliações pela binarização no modo de modelo de fundo
+        result["binary_fallbacks"] = detector.fallbacks
+
+    path = camera.get("labels") or labels_path(camera["source"])
+    if frames and os.path.exists(path):
+        truth = load_labels(path, slot_ids, frames)
+        scores, states = np.array(scores), np.array(states)
+        raw = scores > detector.thresholds
+        result["labels"] = path
+        result["accuracy"] = {
+            str(slot_id): {
+                "tracked": classification(states[:, index], truth[:, index]),
+                "raw": classification(raw[:, index], truth[:, index]),
+            }
+            for index, slot_id in enumerate(slot_ids)
+        }
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do detector em vídeos")
+    parser.add_argument("cameras", help="Arquivo JSON com as câmeras")
+    parser.add_argument(
+        "--camera", action="append", help="Só esta câmera (pode repetir)"
+    )
+    parser.add_argument("--max-frames", type=int, help="Limite de quadros por vídeo")
+    parser.add_argument("--output", help="Arquivo de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    cameras = load_cameras(args.cameras)
+    if args.camera:
+        cameras = [camera for camera in cameras if camera["id"] in args.camera]
+    if not cameras:
+        raise SystemExit("Nenhuma câmera selecionada")
+
+    results = [benchmark_camera(camera, args.max_frames) for camera in cameras]
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "opencv": cv2.__version__,
+        "cameras": results,
+        # ru_maxrss vem em KB no Linux
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as result:
+            result.write(output + "\n")
+        print(f"✅ Resultado salvo em {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
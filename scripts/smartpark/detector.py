@@ -0,0 +1,391 @@
+"""
+Detector de ocupação de vagas a partir de quadros de vídeo.
+
+As vagas (polígonos, nas coordenadas do quadro já redimensionado) são
+desenhadas uma única vez em uma imagem de rótulos: cada pixel guarda o
+número da vaga que o contém (0 = fora das vagas). A cada quadro, a contagem
+de pixels brancos de todas as vagas sai de um único np.bincount sobre os
+rótulos dos pixels brancos, então o custo por quadro quase não muda entre
+8 e 80 vagas.
+
+Só a região que cobre todas as vagas (mais a margem dos kernels) é
+convertida e binarizada; os rótulos e os recortes das vagas ficam nas
+coordenadas dessa região.
+
+Com `motion_threshold`, um MotionGate compara uma versão bem reduzida do
+quadro com a referência de cada vaga e só as vagas que mudaram passam pela
+binarização (limiar adaptativo, mediana e dilatação), cada uma no seu
+recorte; as outras repetem o último score.
+
+BackgroundDetector é o modo alternativo com modelo de fundo: compara cada
+vaga com a imagem dela vazia em vez de binarizar o quadro.
+
+Uso:
+    detector = SlotDetector([rectangle(1, 89, 108, 213), ...], scale=0.67)
+    scores = detector.detect(frame)          # fração de pixels brancos
+    ocupadas = scores > detector.thresholds
+"""
+
+import cv2
+import numpy as np
+
+# Pré-processamento do script.py
+ADAPTIVE_BLOCK_SIZE = 25
+ADAPTIVE_C = 16
+MEDIAN_KERNEL = 5
+DILATE_KERNEL = np.ones((3, 3), np.uint8)
+# Alcance dos kernels: o recorte de uma vaga com essa margem é binarizado
+# exatamente como no quadro inteiro
+KERNEL_MARGIN = ADAPTIVE_BLOCK_SIZE // 2 + MEDIAN_KERNEL // 2 + 1
+
+# Portão de movimento: redução do quadro, diferença média (0-255) que marca
+# a vaga como alterada e reavaliação forçada a cada N quadros
+MOTION_FACTOR = 8
+DEFAULT_MOTION_THRESHOLD = 6.0
+REFRESH_EVERY = 150
+
+# Fração de pixels brancos acima da qual a vaga está ocupada
+# (~3000 px em uma vaga de 108 x 213 px do script.py)
+DEFAULT_THRESHOLD = 0.13
+
+# Modelo de fundo: peso do quadro novo na imagem de fundo (vagas livres) e
+# nas estatísticas de ruído, desvios-padrão acima do ruído que marcam a vaga
+# como ocupada e diferença média mínima (0-255) para isso
+BACKGROUND_ALPHA = 0.01
+NOISE_ALPHA = 0.02
+NOISE_SIGMAS = 4.0
+MIN_DIFFERENCE = 12.0
+# Os scores do modelo de fundo são normalizados pelo limiar de cada vaga
+BACKGROUND_THRESHOLD = 1.0
+# Fração do limiar da binarização abaixo da qual a vaga vira fundo
+SEED_RATIO = 0.5
+
+
+def rectangle(x, y, w, h):
+    """Polígono do retângulo (x, y, largura, altura): os pixels de [y:y+h, x:x+w]"""
+    right, bottom = x + w - 1, y + h - 1
+    return np.array([(x, y), (right, y), (right, bottom), (x, bottom)], np.int32)
+
+
+class SlotDetector:
+    """
+    Calcula o score de ocupação de todas as vagas de uma câmera
+    """
+
+    def __init__(
+        self,
+        polygons,
+        scale=1.0,
+        thresholds=DEFAULT_THRESHOLD,
+        motion_threshold=None,
+        refresh_every=REFRESH_EVERY,
+    ):
+        self.polygons = [np.asarray(polygon, np.int32) for polygon in polygons]
+        self.scale = scale
+        self.thresholds = np.broadcast_to(
+            np.asarray(thresholds, np.float64), (len(self.polygons),)
+        ).copy()
+        self.gate = (
+            MotionGate(self, motion_threshold, refresh_every=refresh_every)
+            if motion_threshold is not None
+            else None
+        )
+        self.shape = None
+
+    def __len__(self):
+        return len(self.polygons)
+
+    def build(self, shape):
+        """Monta a região das vagas e os rótulos para quadros redimensionados"""
+        self.shape = shape[:2]
+        height, width = self.shape
+        bounds = []
+        for polygon in self.polygons:
+            x, y, w, h = cv2.boundingRect(polygon)
+            bounds.append(
+                (
+                    max(y - KERNEL_MARGIN, 0),
+                    min(y + h + KERNEL_MARGIN, height),
+                    max(x - KERNEL_MARGIN, 0),
+                    min(x + w + KERNEL_MARGIN, width),
+                )
+            )
+        top, bottom, left, right = (
+            min(bound[0] for bound in bounds),
+            max(bound[1] for bound in bounds),
+            min(bound[2] for bound in bounds),
+            max(bound[3] for bound in bounds),
+        )
+        self.roi = (slice(top, bottom), slice(left, right))
+        # Recorte de cada vaga (com a margem), nas coordenadas da região
+        self.boxes = [
+            (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+            for y0, y1, x0, x1 in bounds
+        ]
+
+        labels = np.zeros((bottom - top, right - left), np.int32)
+        # Em vagas sobrepostas, a área comum fica com a última
+        for index, polygon in enumerate(self.polygons):
+            cv2.fillPoly(labels, [polygon - (left, top)], index + 1)
+
+        flat = labels.ravel()
+        self.inside = np.flatnonzero(flat)
+        self.inside_labels = flat[self.inside]
+        self.areas = np.bincount(self.inside_labels, minlength=len(self) + 1)[1:]
+        self.labels = labels
+        self.last_counts = np.zeros(len(self), np.int64)
+        if self.gate is not None:
+            self.gate.build(labels)
+
+    def resize(self, frame):
+        if self.scale != 1.0:
+            frame = cv2.resize(frame, (0, 0), fx=self.scale, fy=self.scale)
+        if self.shape != frame.shape[:2]:
+            self.build(frame.shape)
+        return frame
+
+    def gray(self, frame):
+        """Região das vagas do quadro redimensionado, em tons de cinza"""
+        return cv2.cvtColor(frame[self.roi], cv2.COLOR_BGR2GRAY)
+
+    def preprocess(self, frame):
+        """(quadro redimensionado, binário da região das vagas) do quadro BGR"""
+        frame = self.resize(frame)
+        return frame, self.binarize(self.gray(frame))
+
+    def binarize(self, gray):
+        binary = cv2.adaptiveThreshold(
+            gray,
+            255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY_INV,
+            ADAPTIVE_BLOCK_SIZE,
+            ADAPTIVE_C,
+        )
+        binary = cv2.medianBlur(binary, MEDIAN_KERNEL)
+        return cv2.dilate(binary, DILATE_KERNEL)
+
+    def counts(self, binary):
+        """Pixels brancos de cada vaga (np.ndarray, uma posição por vaga)
+
+        `binary` é a imagem binária da região das vagas (ver `preprocess`).
+        """
+        white = binary.ravel()[self.inside] != 0
+        return np.bincount(self.inside_labels[white], minlength=len(self) + 1)[1:]
+
+    def scores(self, binary):
+        """Fração de pixels brancos de cada vaga"""
+        counts = self.counts(binary)
+        return counts / np.maximum(self.areas, 1)
+
+    def slot_count(self, gray, index):
+        """Pixels brancos de uma vaga, binarizando só o recorte dela"""
+        rows, columns = self.boxes[index]
+        binary = self.binarize(gray[rows, columns])
+        return np.count_nonzero(binary[self.labels[rows, columns] == index + 1])
+
+    def detect(self, frame):
+        """Scores de ocupação de todas as vagas para um quadro BGR"""
+        if self.gate is None:
+            _, binary = self.preprocess(frame)
+            return self.scores(binary)
+
+        gray = self.gray(self.resize(frame))
+        changed = np.flatnonzero(self.gate.changed(gray))
+        if len(changed) == len(self):
+            self.last_counts = self.counts(self.binarize(gray))
+        else:
+            for index in changed:
+                self.last_counts[index] = self.slot_count(gray, index)
+        return self.last_counts / np.maximum(self.areas, 1)
+
+
+class MotionGate:
+    """
+    Decide, por vaga, se o quadro mudou o suficiente para reavaliá-la
+
+    Compara o quadro reduzido `factor` vezes com a referência da vaga (o
+    quadro reduzido da última avaliação dela), pela diferença absoluta média
+    nos pixels da vaga. Toda vaga é reavaliada ao menos a cada
+    `refresh_every` quadros, para acompanhar mudanças lentas de luz.
+    """
+
+    def __init__(
+        self,
+        detector,
+        threshold=DEFAULT_MOTION_THRESHOLD,
+        factor=MOTION_FACTOR,
+        refresh_every=REFRESH_EVERY,
+    ):
+        self.detector = detector
+        self.threshold = threshold
+        self.factor = factor
+        self.refresh_every = refresh_every
+        self.evaluated = 0
+        self.skipped = 0
+
+    @property
+    def skip_ratio(self):
+        """Fração das avaliações de vaga evitadas pelo portão"""
+        total = self.evaluated + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def build(self, labels):
+        small = labels[:: self.factor, :: self.factor]
+        self.size = (small.shape[1], small.shape[0])
+        flat = small.ravel()
+        self.inside = np.flatnonzero(flat)
+        self.inside_labels = flat[self.inside]
+        count = len(self.detector) + 1
+        self.areas = np.bincount(self.inside_labels, minlength=count)[1:]
+        self.reference = None
+        self.age = np.zeros(count - 1, np.int64)
+
+    def changed(self, gray):
+        """Vetor booleano das vagas a reavaliar neste quadro"""
+        small = cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+        if self.reference is None:
+            self.reference = small
+            changed = np.ones(len(self.age), bool)
+        else:
+            diff = cv2.absdiff(small, self.reference).ravel()[self.inside]
+            total = np.bincount(
+                self.inside_labels, weights=diff, minlength=len(self.age) + 1
+            )[1:]
+            # Vagas pequenas demais para o quadro reduzido são sempre avaliadas
+            motion = np.divide(
+                total,
+                self.areas,
+                out=np.full(len(self.age), np.inf),
+                where=self.areas > 0,
+            )
+            changed = (motion > self.threshold) | (self.age >= self.refresh_every)
+
+            # A referência só avança nas vagas reavaliadas
+            pixels = self.inside[changed[self.inside_labels - 1]]
+            self.reference.ravel()[pixels] = small.ravel()[pixels]
+
+        self.age = np.where(changed, 0, self.age + 1)
+        evaluated = int(changed.sum())
+        self.evaluated += evaluated
+        self.skipped += len(changed) - evaluated
+        return changed
+
+
+class BackgroundDetector(SlotDetector):
+    """
+    Score de ocupação pela diferença de cada vaga para a imagem dela vazia
+
+    A imagem de fundo (float32, da região das vagas) só é atualizada, aos
+    poucos, nas vagas livres, acompanhando a luz do dia. Para cada vaga, a
+    média e a variância da diferença enquanto livre dão o ruído normal dela;
+    o score é a diferença média dividida por `ruído + sigmas * desvio` (no
+    mínimo `min_difference`), então 1.0 é o limiar de todas as vagas.
+
+    Sem imagem do estacionamento vazio (`background`, um quadro BGR do
+    tamanho dos do vídeo), cada vaga começa sem fundo confiável e usa a
+    binarização do SlotDetector até ela indicar a vaga livre com folga
+    (abaixo de SEED_RATIO do limiar); o recorte desse quadro vira o fundo
+    da vaga. Vagas ocupadas também são conferidas pela binarização a cada
+    `refresh_every` quadros e recebem um fundo novo se estiverem livres (a
+    luz pode ter mudado com o carro parado).
+    """
+
+    def __init__(
+        self,
+        polygons,
+        scale=1.0,
+        thresholds=DEFAULT_THRESHOLD,
+        background=None,
+        alpha=BACKGROUND_ALPHA,
+        sigmas=NOISE_SIGMAS,
+        min_difference=MIN_DIFFERENCE,
+        refresh_every=REFRESH_EVERY,
+    ):
+        super().__init__(polygons, scale, thresholds)
+        # Limiares da binarização, usados só para semear e conferir o fundo
+        self.binary_thresholds = self.thresholds
+        self.thresholds = np.full(len(self), BACKGROUND_THRESHOLD)
+        self.initial = background
+        self.alpha = alpha
+        self.sigmas = sigmas
+        self.min_difference = min_difference
+        self.refresh_every = refresh_every
+        self.fallbacks = 0
+
+    def build(self, shape):
+        super().build(shape)
+        # Máscara de cada vaga dentro do recorte dela
+        self.masks = [
+            (self.labels[box] == index + 1).astype(np.uint8)
+            for index, box in enumerate(self.boxes)
+        ]
+        self.background = np.zeros(self.labels.shape, np.float32)
+        self.trusted = np.zeros(len(self), bool)
+        self.noise_mean = np.zeros(len(self))
+        self.noise_var = np.zeros(len(self))
+        self.age = 0
+        if self.initial is not None:
+            initial = self.initial
+            if self.scale != 1.0:
+                initial = cv2.resize(initial, (0, 0), fx=self.scale, fy=self.scale)
+            if initial.shape[:2] != self.shape:
+                raise ValueError("A imagem de fundo deve ter o tamanho dos quadros")
+            self.seed(self.gray(initial), np.arange(len(self)))
+
+    def seed(self, gray, slots):
+        """Usa o recorte atual das vagas `slots` como fundo delas"""
+        for index in slots:
+            box = self.boxes[index]
+            np.copyto(self.background[box], gray[box], where=self.masks[index] > 0)
+        self.trusted[slots] = True
+        self.noise_mean[slots] = 0.0
+        self.noise_var[slots] = 0.0
+
+    def binary_score(self, gray, index):
+        """Score da binarização da vaga, normalizado pelo limiar dela"""
+        self.fallbacks += 1
+        score = self.slot_count(gray, index) / max(self.areas[index], 1)
+        return score / self.binary_thresholds[index]
+
+    def detect(self, frame):
+        gray = self.gray(self.resize(frame))
+        self.age += 1
+
+        current = gray.astype(np.float32)
+        mean = np.array(
+            [
+                cv2.mean(cv2.absdiff(current[box], self.background[box]), mask=mask)[0]
+                for box, mask in zip(self.boxes, self.masks)
+            ]
+        )
+        limit = np.maximum(
+            self.noise_mean + self.sigmas * np.sqrt(self.noise_var),
+            self.min_difference,
+        )
+        scores = mean / limit
+
+        refresh = self.age % self.refresh_every == 0
+        for index in np.flatnonzero(
+            ~self.trusted | (refresh & (scores > BACKGROUND_THRESHOLD))
+        ):
+            score = self.binary_score(gray, index)
+            if score <= SEED_RATIO:
+                self.seed(gray, [index])
+                scores[index] = mean[index] = 0.0
+            elif not self.trusted[index]:
+                scores[index] = score
+
+        free = self.trusted & (scores < BACKGROUND_THRESHOLD)
+        for index in np.flatnonzero(free):
+            box = self.boxes[index]
+            cv2.accumulateWeighted(
+                gray[box], self.background[box], self.alpha, mask=self.masks[index]
+            )
+        if free.any():
+            delta = mean[free] - self.noise_mean[free]
+            self.noise_mean[free] += NOISE_ALPHA * delta
+            self.noise_var[free] = (1 - NOISE_ALPHA) * (
+                self.noise_var[free] + NOISE_ALPHA * delta**2
+            )
+        return scores
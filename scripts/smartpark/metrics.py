@@ -0,0 +1,110 @@
+"""
+Saída de métricas e imagens de depuração do detector em modo headless.
+
+- MetricsPublisher guarda o último dict de métricas e o publica em um
+  arquivo JSON (reescrito de forma atômica, no máximo a cada `every`
+  segundos) e/ou em um endpoint HTTP local (GET /metrics).
+- SnapshotWriter grava, com pouca frequência, um quadro anotado em disco
+  para conferir a câmera sem abrir janelas.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+METRICS_EVERY = 1.0
+SNAPSHOT_EVERY = 60.0
+
+
+def write_atomic(path, data):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as output:
+        output.write(data)
+    os.replace(temporary, path)
+
+
+class MetricsPublisher:
+    """
+    Publica as métricas mais recentes em arquivo e/ou HTTP local
+    """
+
+    def __init__(self, path=None, port=None, host="127.0.0.1", every=METRICS_EVERY):
+        self.path = path
+        self.every = every
+        self.latest = {}
+        self.lock = threading.Lock()
+        self.written_at = 0.0
+        self.server = None
+        if port is not None:
+            self.server = ThreadingHTTPServer((host, port), self.handler())
+            threading.Thread(
+                target=self.server.serve_forever, name="metrics", daemon=True
+            ).start()
+
+    def handler(self):
+        publisher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = publisher.json().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def json(self):
+        with self.lock:
+            return json.dumps(self.latest, ensure_ascii=False)
+
+    def publish(self, metrics):
+        with self.lock:
+            self.latest = metrics
+        now = time.monotonic()
+        if self.path and now - self.written_at >= self.every:
+            self.written_at = now
+            write_atomic(self.path, self.json())
+
+    def close(self):
+        if self.path and self.latest:
+            write_atomic(self.path, self.json())
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+class SnapshotWriter:
+    """
+    Grava um quadro de depuração (sempre no mesmo arquivo) a cada `every` s
+    """
+
+    def __init__(self, directory, every=SNAPSHOT_EVERY, name="snapshot.jpg"):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, name)
+        self.every = every
+        self.written_at = None
+
+    def due(self):
+        """Se já está na hora do próximo quadro (só então vale desenhar)"""
+        return (
+            self.written_at is None or time.monotonic() - self.written_at >= self.every
+        )
+
+    def write(self, image):
+        self.written_at = time.monotonic()
+        root, extension = os.path.splitext(self.path)
+        temporary = f"{root}.tmp{extension}"
+        if cv2.imwrite(temporary, image):
+            os.replace(temporary, self.path)
@@ -0,0 +1,255 @@
+"""
+Pipeline em threads para o detector: captura -> processamento -> envio.
+
+- Captura: uma thread decodifica os quadros do cv2.VideoCapture para um
+  buffer circular limitado; com o buffer cheio, o quadro mais antigo é
+  descartado (a câmera nunca espera pelo processamento).
+- Processamento: uma ou mais threads pegam sempre o quadro mais recente e
+  rodam o detector (OpenCV e NumPy liberam o GIL durante o trabalho pesado).
+- Envio: uma thread entrega os resultados, em ordem, para `on_result`.
+
+Cada etapa tem um contador de latência, então a vazão fica perto da etapa
+mais lenta, e não da soma das três.
+
+Uso:
+    pipeline = DetectorPipeline(VIDEO_PATH, lambda: SlotDetector(...), print)
+    pipeline.start()
+    ...
+    print(pipeline.stats())
+    pipeline.stop()
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+BUFFER_SIZE = 4
+# Amostras guardadas para os percentis de cada etapa
+LATENCY_SAMPLES = 1000
+
+
+class LatencyCounter:
+    """
+    Latências (em segundos) de uma etapa: totais e amostras recentes
+    """
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=samples)
+
+    def add(self, seconds):
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self.recent.append(seconds)
+
+    def time(self):
+        """Context manager que mede o bloco"""
+        return _Timer(self)
+
+    def snapshot(self):
+        """{"count", "mean_ms", "max_ms", "p50_ms", "p95_ms", "p99_ms"}"""
+        with self.lock:
+            recent = np.array(self.recent)
+            result = {
+                "count": self.count,
+                "mean_ms": self.total / self.count * 1000 if self.count else None,
+                "max_ms": self.max * 1000,
+            }
+        for percentile in (50, 95, 99):
+            result[f"p{percentile}_ms"] = (
+                float(np.percentile(recent, percentile)) * 1000 if len(recent) else None
+            )
+        return result
+
+
+class _Timer:
+    def __init__(self, counter):
+        self.counter = counter
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.counter.add(time.perf_counter() - self.start)
+
+
+class FrameRing:
+    """
+    Buffer circular de quadros; cheio, descarta o mais antigo
+    """
+
+    def __init__(self, size=BUFFER_SIZE):
+        self.frames = deque(maxlen=size)
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.condition:
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+            self.frames.append(item)
+            self.condition.notify()
+
+    def newest(self, timeout=None):
+        """Retira o item mais recente (descartando os anteriores) ou None"""
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.frames or self.closed, timeout=timeout
+            ):
+                return None
+            if not self.frames:
+                return None
+            item = self.frames.pop()
+            self.dropped += len(self.frames)
+            self.frames.clear()
+            return item
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class DetectorPipeline:
+    """
+    Roda um detector sobre uma fonte de vídeo em três etapas paralelas
+
+    `detector_factory` cria um detector por thread de processamento (o
+    detector guarda estado entre quadros). `on_result` recebe dicts com
+    "frame", "captured_at" (time.time()) e "scores".
+    """
+
+    def __init__(
+        self,
+        source,
+        detector_factory,
+        on_result,
+        workers=1,
+        buffer_size=BUFFER_SIZE,
+        loop=False,
+    ):
+        self.source = source
+        self.detector_factory = detector_factory
+        self.on_result = on_result
+        self.workers = workers
+        self.loop = loop
+        self.frames = FrameRing(buffer_size)
+        self.results = FrameRing(buffer_size)
+        self.latency = {
+            "capture": LatencyCounter(),
+            "process": LatencyCounter(),
+            "send": LatencyCounter(),
+            # Da captura até o fim do envio
+            "total": LatencyCounter(),
+        }
+        self.stopping = threading.Event()
+        self.threads = []
+        self.running_workers = workers
+        self.workers_lock = threading.Lock()
+        self.finished = threading.Event()
+        self.last_sent = -1
+
+    def start(self):
+        self.threads = [threading.Thread(target=self.capture, name="capture")]
+        self.threads += [
+            threading.Thread(target=self.process, name=f"process-{index}")
+            for index in range(self.workers)
+        ]
+        self.threads.append(threading.Thread(target=self.send, name="send"))
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self.stopping.set()
+        self.frames.close()
+        self.results.close()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def wait(self, timeout=None):
+        """Espera a fonte terminar e os resultados serem entregues"""
+        return self.finished.wait(timeout)
+
+    def capture(self):
+        video = cv2.VideoCapture(self.source)
+        index = 0
+        try:
+            while not self.stopping.is_set():
+                with self.latency["capture"].time():
+                    check, frame = video.read()
+                if not check:
+                    if self.loop:
+                        video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+                self.frames.put((index, time.time(), time.perf_counter(), frame))
+                index += 1
+        finally:
+            video.release()
+            self.frames.close()
+
+    def process(self):
+        detector = self.detector_factory()
+        try:
+            while True:
+                item = self.frames.newest(timeout=0.5)
+                if item is None:
+                    if self.frames.closed:
+                        break
+                    continue
+                index, captured_at, started, frame = item
+                with self.latency["process"].time():
+                    scores = detector.detect(frame)
+                self.results.put((index, captured_at, started, scores))
+        finally:
+            with self.workers_lock:
+                self.running_workers -= 1
+                if not self.running_workers:
+                    self.results.close()
+
+    def send(self):
+        try:
+            self.deliver()
+        finally:
+            self.finished.set()
+
+    def deliver(self):
+        while True:
+            item = self.results.newest(timeout=0.5)
+            if item is None:
+                if self.results.closed:
+                    break
+                continue
+            index, captured_at, started, scores = item
+            # Com várias threads de processamento, um quadro pode chegar
+            # depois de um mais novo: o mais antigo é descartado
+            if index <= self.last_sent:
+                continue
+            self.last_sent = index
+            with self.latency["send"].time():
+                self.on_result(
+                    {"frame": index, "captured_at": captured_at, "scores": scores}
+                )
+            self.latency["total"].add(time.perf_counter() - started)
+
+    def stats(self):
+        """Contadores de cada etapa e quadros descartados"""
+        return {
+            "stages": {
+                name: counter.snapshot() for name, counter in self.latency.items()
+            },
+            "dropped_frames": self.frames.dropped,
+            "dropped_results": self.results.dropped,
+        }
@@ -0,0 +1,261 @@
+"""
+Executa o detector em várias câmeras de um mesmo equipamento.
+
+Cada câmera roda em um processo próprio (fixado em um núcleo, quando o
+sistema permite), com o pipeline de captura/processamento em threads. Os
+processos não compartilham nada além de uma fila de resultados: as mudanças
+de status de todas as câmeras são enviadas ao backend por um único
+uploader (ver uploader.py), no processo principal. Um processo que cai é
+reiniciado.
+
+Arquivo de câmeras (JSON):
+    [
+      {
+        "id": "entrada-norte",
+        "source": "rtsp://10.0.0.5/stream1",   # ou caminho de um vídeo
+        "scale": 0.67,
+        "loop": false,
+        "threshold": 0.13,                      # padrão das vagas
+        "motion_threshold": 6.0,                # opcional
+        "mode": "background",                   # opcional: modelo de fundo
+        "background": "vazio.png",              # opcional: quadro sem carros
+        "min_dwell": 3.0,                       # segundos até confirmar
+        "ema_alpha": 0.3,
+        "slots": [
+          {"slot_id": 12, "polygon": [[1, 89], [108, 89], [108, 301], [1, 301]]},
+          {"slot_id": 13, "rect": [115, 87, 152, 211], "threshold": 0.15},
+          {"slot_id": 14, "rect": [289, 89, 138, 212],
+           "enter_threshold": 0.16, "exit_threshold": 0.1}
+        ]
+      }
+    ]
+
+Usage: python runner.py cameras.json --endpoint http://backend/api/hardware/events/slot-status/ [--spool-dir spool]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+import cv2
+import numpy as np
+
+from detector import (
+    BACKGROUND_THRESHOLD,
+    DEFAULT_THRESHOLD,
+    BackgroundDetector,
+    SlotDetector,
+    rectangle,
+)
+from pipeline import DetectorPipeline
+from tracking import EMA_ALPHA, MIN_DWELL, SlotStateTracker, hysteresis_thresholds
+from uploader import Uploader
+
+# Espera antes de reiniciar uma câmera que caiu (dobra a cada queda seguida)
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 60.0
+# Uma câmera que ficou de pé esse tempo volta ao atraso inicial
+STABLE_SECONDS = 300
+STREAM_PREFIXES = ("rtsp://", "rtmp://", "http://", "https://")
+
+
+def load_cameras(path):
+    with open(path, encoding="utf-8") as config:
+        return json.load(config)
+
+
+def camera_polygons(camera):
+    polygons = []
+    for slot in camera["slots"]:
+        if "rect" in slot:
+            polygons.append(rectangle(*slot["rect"]))
+        else:
+            polygons.append(np.array(slot["polygon"], np.int32))
+    return polygons
+
+
+def background_mode(camera):
+    return camera.get("mode") == "background"
+
+
+def camera_detector(camera):
+    """SlotDetector (ou BackgroundDetector) configurado para a câmera"""
+    default = camera.get("threshold", DEFAULT_THRESHOLD)
+    if background_mode(camera):
+        background = None
+        if camera.get("background"):
+            background = cv2.imread(camera["background"])
+            if background is None:
+                raise ValueError(f"Imagem de fundo inválida: {camera['background']}")
+        return BackgroundDetector(
+            camera_polygons(camera),
+            scale=camera.get("scale", 1.0),
+            thresholds=[slot.get("threshold", default) for slot in camera["slots"]],
+            background=background,
+        )
+    return SlotDetector(
+        camera_polygons(camera),
+        scale=camera.get("scale", 1.0),
+        thresholds=[slot.get("threshold", default) for slot in camera["slots"]],
+        motion_threshold=camera.get("motion_threshold"),
+    )
+
+
+def pin_to_cpu(cpu):
+    """Fixa o processo atual em um núcleo (só em sistemas com sched_setaffinity)"""
+    if hasattr(os, "sched_setaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {available[cpu % len(available)]})
+
+
+def camera_tracker(camera):
+    """SlotStateTracker com os limiares de entrada e saída de cada vaga"""
+    default = camera.get("threshold", DEFAULT_THRESHOLD)
+    enters, exits = [], []
+    for slot in camera["slots"]:
+        # No modelo de fundo o score já vem normalizado pelo limiar da vaga
+        default_enter, default_exit = hysteresis_thresholds(
+            BACKGROUND_THRESHOLD
+            if background_mode(camera)
+            else slot.get("threshold", default)
+        )
+        enters.append(slot.get("enter_threshold", default_enter))
+        exits.append(slot.get("exit_threshold", default_exit))
+    return SlotStateTracker(
+        [slot["slot_id"] for slot in camera["slots"]],
+        enter_thresholds=enters,
+        exit_thresholds=exits,
+        min_dwell=camera.get("min_dwell", MIN_DWELL),
+        alpha=camera.get("ema_alpha", EMA_ALPHA),
+    )
+
+
+def run_camera(camera, results, cpu):
+    """Processo de uma câmera: detecta e publica as mudanças na fila"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pin_to_cpu(cpu)
+    tracker = camera_tracker(camera)
+
+    def publish(result):
+        events = tracker.update(result["scores"], result["captured_at"])
+        if events:
+            results.put([{"camera": camera["id"], **event} for event in events])
+
+    pipeline = DetectorPipeline(
+        camera["source"],
+        lambda: camera_detector(camera),
+        publish,
+        loop=camera.get("loop", False),
+    ).start()
+    pipeline.wait()
+    pipeline.stop()
+
+
+class Runner:
+    """
+    Mantém um processo por câmera e entrega os eventos ao uploader
+    """
+
+    def __init__(self, cameras, upload):
+        self.cameras = cameras
+        self.upload = upload
+        self.context = multiprocessing.get_context("spawn")
+        self.results = self.context.Queue()
+        self.processes = {}
+        self.restarts = {camera["id"]: 0 for camera in cameras}
+        self.started_at = {}
+
+    def start_camera(self, index):
+        camera = self.cameras[index]
+        process = self.context.Process(
+            target=run_camera,
+            args=(camera, self.results, index),
+            name=f"camera-{camera['id']}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+        self.started_at[index] = time.monotonic()
+
+    def supervise(self):
+        """Reinicia câmeras que caíram (com espera crescente)"""
+        for index, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            camera = self.cameras[index]
+            if process.exitcode == 0 and not camera["source"].startswith(
+                STREAM_PREFIXES
+            ):
+                # Vídeo gravado que chegou ao fim
+                del self.processes[index]
+                continue
+
+            uptime = time.monotonic() - self.started_at[index]
+            if uptime >= STABLE_SECONDS:
+                self.restarts[camera["id"]] = 0
+            delay = min(
+                RESTART_DELAY * 2 ** self.restarts[camera["id"]], MAX_RESTART_DELAY
+            )
+            if uptime < delay:
+                continue
+            self.restarts[camera["id"]] += 1
+            print(
+                f"Câmera {camera['id']} parou (código {process.exitcode}), "
+                f"reiniciando ({self.restarts[camera['id']]}x)"
+            )
+            self.start_camera(index)
+
+    def run(self):
+        for index in range(len(self.cameras)):
+            self.start_camera(index)
+        try:
+            while self.processes:
+                try:
+                    events = self.results.get(timeout=1)
+                except queue.Empty:
+                    events = None
+                if events:
+                    self.upload(events)
+                self.supervise()
+            # Eventos publicados pelas últimas câmeras antes de terminar
+            while True:
+                try:
+                    self.upload(self.results.get(timeout=0.1))
+                except queue.Empty:
+                    break
+        except KeyboardInterrupt:
+            print("\nEncerrado pelo usuário (Ctrl+C).")
+        finally:
+            for process in self.processes.values():
+                process.terminate()
+            for process in self.processes.values():
+                process.join(5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa o detector em várias câmeras")
+    parser.add_argument("cameras", help="Arquivo JSON com as câmeras")
+    parser.add_argument("--endpoint", required=True, help="URL de eventos de status")
+    parser.add_argument(
+        "--spool-dir",
+        default="spool",
+        help="Diretório dos eventos ainda não entregues (padrão: spool)",
+    )
+    args = parser.parse_args()
+
+    cameras = load_cameras(args.cameras)
+    print(f"Iniciando {len(cameras)} câmeras em {os.cpu_count()} núcleos")
+    uploader = Uploader(args.endpoint, args.spool_dir)
+    try:
+        Runner(cameras, uploader).run()
+    finally:
+        uploader.close()
+        print(f"Envio: {uploader.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,24 @@
+"""
+Detector de vagas de um vídeo, com janelas (padrão) ou headless.
+
+No modo headless nada é desenhado e nenhuma janela é aberta: o laço roda no
+ritmo do vídeo (ou de --fps) e as métricas (quadros/s, pixels e score de
+cada vaga, latência) vão para um arquivo JSON e/ou um endpoint HTTP local.
+Opcionalmente, um quadro anotado é gravado em disco de tempos em tempos.
+
+Usage: python script.py [--headless] [--fps 15] [--metrics-file metricas.json] [--metrics-port 9100] [--snapshot-dir snapshots]
+"""
+
+import argparse
 import os
+import time
+from collections import deque
+
 import cv2
-import numpy as np
+
+from detector import SlotDetector, rectangle
+from metrics import SNAPSHOT_EVERY, MetricsPublisher, SnapshotWriter
+from pipeline import LatencyCounter
 
 # Caminho dinâmico para o vídeo (relativo ao diretório do script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -17,66 +35,152 @@ vaga8 = [1027, 94, 147, 202]
 
 vagas = [vaga1, vaga2, vaga3, vaga4, vaga5, vaga6, vaga7, vaga8]
 
-video = cv2.VideoCapture(VIDEO_PATH)
-
-try:
-    while True:  # loop infinito até Ctrl+C
-        check, img = video.read()
-        if not check:
-            # Reinicia o vídeo quando terminar
-            video.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            continue
-
-        # Reduz o tamanho do vídeo em 10%
-        img = cv2.resize(img, (0, 0), fx=0.67, fy=0.67)
-        imgCinza = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        imgTh = cv2.adaptiveThreshold(
-            imgCinza, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 25, 16
-        )
-        imgBlur = cv2.medianBlur(imgTh, 5)
-        kernel = np.ones((3, 3), np.int8)
-        imgDil = cv2.dilate(imgBlur, kernel)
-
-        qtVagasAbertas = 0
-        for x, y, w, h in vagas:
-            recorte = imgDil[y : y + h, x : x + w]
-            qtPxBranco = cv2.countNonZero(recorte)
-            cv2.putText(
-                img,
-                str(qtPxBranco),
-                (x, y + h - 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.5,
-                (255, 255, 255),
-                1,
-            )
-
-            if qtPxBranco > 3000:
-                cv2.rectangle(img, (x, y), (x + w, y + h), (0, 0, 255), 3)
-            else:
-                cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 3)
-                qtVagasAbertas += 1
-
-        cv2.rectangle(img, (90, 0), (415, 60), (255, 0, 0), -1)
+# Pixels brancos acima dos quais a vaga está ocupada
+LIMIAR_PX = 3000
+# Ritmo do laço quando o vídeo não informa o FPS
+FPS_PADRAO = 30.0
+
+
+def desenhar(img, pxBrancos):
+    """Anota no quadro os pixels de cada vaga, o status e o total de livres"""
+    qtVagasAbertas = 0
+    for (x, y, w, h), qtPxBranco in zip(vagas, pxBrancos):
         cv2.putText(
             img,
-            f"LIVRE: {qtVagasAbertas}/{len(vagas)}",
-            (95, 45),
+            str(qtPxBranco),
+            (x, y + h - 10),
             cv2.FONT_HERSHEY_SIMPLEX,
-            1.5,
+            0.5,
             (255, 255, 255),
-            5,
+            1,
         )
 
-        cv2.imshow("video", img)
-        cv2.imshow("video TH", imgDil)
+        if qtPxBranco > LIMIAR_PX:
+            cv2.rectangle(img, (x, y), (x + w, y + h), (0, 0, 255), 3)
+        else:
+            cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 3)
+            qtVagasAbertas += 1
+
+    cv2.rectangle(img, (90, 0), (415, 60), (255, 0, 0), -1)
+    cv2.putText(
+        img,
+        f"LIVRE: {qtVagasAbertas}/{len(vagas)}",
+        (95, 45),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1.5,
+        (255, 255, 255),
+        5,
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Detector de vagas")
+    parser.add_argument("--video", default=VIDEO_PATH, help="Vídeo ou URL da câmera")
+    parser.add_argument(
+        "--headless", action="store_true", help="Sem janelas nem desenho"
+    )
+    parser.add_argument("--fps", type=float, help="Ritmo do laço (padrão: do vídeo)")
+    parser.add_argument("--metrics-file", help="Arquivo JSON de métricas")
+    parser.add_argument("--metrics-port", type=int, help="Porta local de /metrics")
+    parser.add_argument("--snapshot-dir", help="Diretório do quadro de depuração")
+    parser.add_argument(
+        "--snapshot-every",
+        type=float,
+        default=SNAPSHOT_EVERY,
+        help=f"Segundos entre quadros de depuração (padrão: {SNAPSHOT_EVERY:g})",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    detector = SlotDetector([rectangle(*vaga) for vaga in vagas], scale=0.67)
+    video = cv2.VideoCapture(args.video)
+
+    fps = args.fps or video.get(cv2.CAP_PROP_FPS) or FPS_PADRAO
+    intervalo = 1.0 / fps
+    latencia = LatencyCounter()
+    quadros = deque(maxlen=int(fps * 2) + 1)
+    metricas = None
+    if args.metrics_file or args.metrics_port is not None:
+        metricas = MetricsPublisher(args.metrics_file, args.metrics_port)
+    snapshots = (
+        SnapshotWriter(args.snapshot_dir, args.snapshot_every)
+        if args.snapshot_dir
+        else None
+    )
+
+    proximo = time.monotonic()
+    try:
+        while True:  # loop infinito até Ctrl+C
+            check, img = video.read()
+            if not check:
+                # Reinicia o vídeo quando terminar
+                video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+
+            with latencia.time():
+                # Reduz o tamanho do vídeo em 33% e binariza
+                img, imgDil = detector.preprocess(img)
+                # Pixels brancos de todas as vagas de uma vez
+                pxBrancos = detector.counts(imgDil)
+
+            quadros.append(time.monotonic())
+            if metricas is not None:
+                scores = pxBrancos / detector.areas
+                metricas.publish(
+                    {
+                        "updated_at": time.time(),
+                        "frames": latencia.count,
+                        "fps": (
+                            (len(quadros) - 1) / (quadros[-1] - quadros[0])
+                            if len(quadros) > 1
+                            else None
+                        ),
+                        "latency": latencia.snapshot(),
+                        "free": int((pxBrancos <= LIMIAR_PX).sum()),
+                        "slots": [
+                            {
+                                "vaga": index + 1,
+                                "pixels": int(qtPxBranco),
+                                "score": round(float(score), 4),
+                                "occupied": bool(qtPxBranco > LIMIAR_PX),
+                            }
+                            for index, (qtPxBranco, score) in enumerate(
+                                zip(pxBrancos, scores)
+                            )
+                        ],
+                    }
+                )
+
+            if not args.headless:
+                desenhar(img, pxBrancos)
+                cv2.imshow("video", img)
+                cv2.imshow("video TH", imgDil)
+                if cv2.waitKey(1) & 0xFF == 27:  # ESC também fecha
+                    break
+            elif snapshots is not None and snapshots.due():
+                desenhar(img, pxBrancos)
+                snapshots.write(img)
+
+            # Segura o laço no ritmo configurado (sem acumular atraso)
+            proximo += intervalo
+            espera = proximo - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            elif espera < -intervalo:
+                proximo = time.monotonic()
+
+    except KeyboardInterrupt:
+        print("\nEncerrado pelo usuário (Ctrl+C).")
 
-        if cv2.waitKey(10) & 0xFF == 27:  # ESC também fecha
-            break
+    finally:
+        video.release()
+        if metricas is not None:
+            metricas.close()
+        if not args.headless:
+            cv2.destroyAllWindows()
 
-except KeyboardInterrupt:
-    print("\nEncerrado pelo usuário (Ctrl+C).")
 
-finally:
-    video.release()
-    cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
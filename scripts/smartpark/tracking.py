@@ -0,0 +1,126 @@
+"""
+Filtro temporal do status das vagas (histerese e debounce).
+
+Os scores do detector oscilam com pessoas passando, sombras e ruído. Para
+cada vaga, o SlotStateTracker:
+- suaviza o score com uma média móvel exponencial;
+- usa limiares separados para entrar (FREE -> OCCUPIED) e sair
+  (OCCUPIED -> FREE), então um score perto do limiar não fica alternando;
+- só confirma a mudança depois que ela se mantém por `min_dwell` segundos.
+
+Só as mudanças confirmadas viram eventos. A confiança de cada evento vem da
+distância do score suavizado ao limiar que desfaria a mudança.
+"""
+
+import numpy as np
+
+from detector import DEFAULT_THRESHOLD
+
+# Largura da histerese em torno do limiar (fração do limiar)
+HYSTERESIS = 0.15
+# Tempo mínimo (s) de um novo status antes de ser confirmado
+MIN_DWELL = 3.0
+# Peso do score novo na média móvel exponencial
+EMA_ALPHA = 0.3
+
+OCCUPIED_STATUS = "OCCUPIED"
+FREE_STATUS = "FREE"
+
+
+def hysteresis_thresholds(threshold, band=HYSTERESIS):
+    """(limiar de entrada, limiar de saída) em torno de `threshold`"""
+    return threshold * (1 + band), threshold * (1 - band)
+
+
+class SlotStateTracker:
+    """
+    Status confirmado de cada vaga de uma câmera, a partir dos scores
+    """
+
+    def __init__(
+        self,
+        slot_ids,
+        enter_thresholds=None,
+        exit_thresholds=None,
+        min_dwell=MIN_DWELL,
+        alpha=EMA_ALPHA,
+    ):
+        count = len(slot_ids)
+        default_enter, default_exit = hysteresis_thresholds(DEFAULT_THRESHOLD)
+        self.slot_ids = list(slot_ids)
+        self.enter = np.broadcast_to(
+            np.asarray(
+                default_enter if enter_thresholds is None else enter_thresholds, float
+            ),
+            (count,),
+        ).copy()
+        self.exit = np.broadcast_to(
+            np.asarray(
+                default_exit if exit_thresholds is None else exit_thresholds, float
+            ),
+            (count,),
+        ).copy()
+        if np.any(self.exit > self.enter):
+            raise ValueError("O limiar de saída deve ser menor que o de entrada")
+        self.min_dwell = min_dwell
+        self.alpha = alpha
+        self.ema = None
+        self.occupied = None
+        self.pending_since = np.full(count, np.nan)
+        self.emitted = 0
+        self.suppressed = 0
+
+    def confidence(self):
+        """Confiança (0.5 a 1) do status atual de cada vaga"""
+        distance = np.where(
+            self.occupied,
+            (self.ema - self.exit) / np.maximum(self.exit, 1e-6),
+            (self.enter - self.ema) / np.maximum(self.enter, 1e-6),
+        )
+        return 0.5 + 0.5 * np.clip(distance, 0.0, 1.0)
+
+    def update(self, scores, at):
+        """
+        Processa os scores de um quadro (`at` em segundos)
+
+        Retorna os eventos das vagas cuja mudança foi confirmada. No primeiro
+        quadro, todas as vagas recebem um evento com o status inicial.
+        """
+        scores = np.asarray(scores, float)
+        if self.ema is None:
+            self.ema = scores.copy()
+            self.occupied = self.ema > (self.enter + self.exit) / 2
+            return self.events(np.ones(len(scores), bool), at)
+
+        self.ema += self.alpha * (scores - self.ema)
+        wanted = np.where(self.occupied, self.ema >= self.exit, self.ema > self.enter)
+        pending = wanted != self.occupied
+
+        # Mudanças que voltaram atrás antes do tempo mínimo são descartadas
+        self.suppressed += int(
+            np.count_nonzero(~pending & ~np.isnan(self.pending_since))
+        )
+        self.pending_since = np.where(
+            pending,
+            np.where(np.isnan(self.pending_since), at, self.pending_since),
+            np.nan,
+        )
+        confirmed = pending & (at - self.pending_since >= self.min_dwell)
+        self.occupied = np.where(confirmed, wanted, self.occupied)
+        self.pending_since[confirmed] = np.nan
+        return self.events(confirmed, at)
+
+    def events(self, changed, at):
+        confidence = self.confidence()
+        events = [
+            {
+                "slot_id": self.slot_ids[index],
+                "status": OCCUPIED_STATUS if self.occupied[index] else FREE_STATUS,
+                "score": round(float(self.ema[index]), 4),
+                "confidence": round(float(confidence[index]), 3),
+                "at": at,
+            }
+            for index in np.flatnonzero(changed)
+        ]
+        self.emitted += len(events)
+        return events
@@ -0,0 +1,338 @@
+"""
+Envio dos eventos de status ao backend, sem bloquear a detecção.
+
+`submit` só coloca os eventos em uma fila em memória. Uma thread:
+1. grava cada evento no spool em disco (append-only, com número de
+   sequência), então nada se perde com o backend fora do ar;
+2. junta os eventos pendentes em lotes (por tamanho ou por tempo);
+3. envia cada lote por um conjunto de sessões HTTP keep-alive, com as
+   vagas distribuídas entre as sessões (os eventos de uma vaga seguem
+   sempre pela mesma sessão, na ordem);
+4. confirma no spool os eventos entregues e, em caso de falha, tenta de
+   novo com espera exponencial, sempre na ordem da sequência.
+
+Cada evento leva a hora da detecção (occurred_at), não a do envio. Só os
+eventos rejeitados como inválidos (400/422) são descartados.
+
+O spool é uma sequência de segmentos de tamanho fixo mapeados em memória
+(mmap); segmentos totalmente confirmados são apagados. Depois de uma
+queda, os eventos não confirmados são reenviados (um evento entregue logo
+antes da queda pode ser enviado de novo).
+"""
+
+import json
+import mmap
+import os
+import random
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SEGMENT_SIZE = 4 * 1024 * 1024
+# Cabeçalho de cada registro: tamanho do JSON e número de sequência
+RECORD_HEADER = struct.Struct("<IQ")
+
+BATCH_SIZE = 50
+MAX_DELAY = 1.0
+POOL_SIZE = 4
+TIMEOUT = 5
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+# Eventos pendentes mantidos em memória; o resto é lido do spool depois
+MAX_IN_MEMORY = 10000
+# Respostas de evento inválido: o evento é descartado (e confirmado). Qualquer
+# outra falha (401/403 de chave, 404 de rota, 5xx etc.) é tentada de novo.
+POISON_STATUS = (400, 422)
+
+
+class DiskSpool:
+    """
+    Eventos em segmentos append-only mapeados em memória
+    """
+
+    def __init__(self, directory, segment_size=SEGMENT_SIZE):
+        self.directory = directory
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self.ack_path = os.path.join(directory, "ack")
+        self.acked = 0
+        if os.path.exists(self.ack_path):
+            with open(self.ack_path) as ack:
+                self.acked = int(ack.read().strip() or 0)
+
+        self.segments = sorted(
+            int(name.split(".")[0])
+            for name in os.listdir(directory)
+            if name.endswith(".seg")
+        )
+        self.last_seq = self.acked
+        self.active = None
+        if self.segments:
+            self.open(self.segments[-1])
+            for seq, _ in self.records(self.segments[-1]):
+                self.last_seq = max(self.last_seq, seq)
+
+    def path(self, first_seq):
+        return os.path.join(self.directory, f"{first_seq:020d}.seg")
+
+    def open(self, first_seq, size=None):
+        """Abre (ou cria) o segmento para escrita"""
+        if self.active is not None:
+            self.active[1].close()
+        path = self.path(first_seq)
+        with open(path, "a+b") as segment:
+            if os.path.getsize(path) < (size or self.segment_size):
+                segment.truncate(size or self.segment_size)
+        with open(path, "r+b") as segment:
+            buffer = mmap.mmap(segment.fileno(), 0)
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(buffer):
+            length, _ = RECORD_HEADER.unpack_from(buffer, offset)
+            if not length:
+                break
+            offset += RECORD_HEADER.size + length
+        self.active = (first_seq, buffer, offset)
+
+    def append(self, event):
+        """Grava o evento e retorna o número de sequência dele"""
+        seq = self.last_seq + 1
+        payload = json.dumps(event, separators=(",", ":")).encode()
+        size = RECORD_HEADER.size + len(payload)
+        if self.active is None or self.active[2] + size > len(self.active[1]):
+            self.segments.append(seq)
+            self.open(seq, max(self.segment_size, size))
+        first_seq, buffer, offset = self.active
+        buffer[offset + RECORD_HEADER.size : offset + size] = payload
+        # O cabeçalho por último: um registro incompleto nunca é lido
+        RECORD_HEADER.pack_into(buffer, offset, len(payload), seq)
+        self.active = (first_seq, buffer, offset + size)
+        self.last_seq = seq
+        return seq
+
+    def flush(self):
+        if self.active is not None:
+            self.active[1].flush()
+
+    def records(self, first_seq):
+        """(seq, evento) de um segmento, em ordem"""
+        active = self.active is not None and self.active[0] == first_seq
+        if active:
+            buffer = self.active[1]
+        else:
+            with open(self.path(first_seq), "rb") as segment:
+                buffer = mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            offset = 0
+            while offset + RECORD_HEADER.size <= len(buffer):
+                length, seq = RECORD_HEADER.unpack_from(buffer, offset)
+                if not length:
+                    break
+                start = offset + RECORD_HEADER.size
+                yield seq, json.loads(bytes(buffer[start : start + length]))
+                offset = start + length
+        finally:
+            if not active:
+                buffer.close()
+
+    def read(self, after, limit):
+        """Até `limit` eventos com sequência maior que `after`, em ordem"""
+        results = []
+        for index, first_seq in enumerate(self.segments):
+            following = self.segments[index + 1 : index + 2]
+            if following and following[0] <= after + 1:
+                continue
+            for seq, event in self.records(first_seq):
+                if seq > after:
+                    results.append((seq, event))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def ack(self, seq):
+        """Confirma a entrega de todos os eventos até `seq`"""
+        if seq <= self.acked:
+            return
+        self.flush()
+        temporary = f"{self.ack_path}.tmp"
+        with open(temporary, "w") as ack:
+            ack.write(str(seq))
+        os.replace(temporary, self.ack_path)
+        self.acked = seq
+
+        # Segmentos fechados cujos eventos já foram todos confirmados
+        while len(self.segments) > 1 and self.segments[1] - 1 <= seq:
+            os.remove(self.path(self.segments.pop(0)))
+
+    def close(self):
+        if self.active is not None:
+            self.active[1].flush()
+            self.active[1].close()
+            self.active = None
+
+
+class Uploader:
+    """
+    Envia eventos em lotes, com spool em disco e novas tentativas
+
+    Instâncias são chamáveis com uma lista de eventos (equivale a `submit`).
+    """
+
+    def __init__(
+        self,
+        endpoint,
+        spool_dir,
+        batch_size=BATCH_SIZE,
+        max_delay=MAX_DELAY,
+        pool_size=POOL_SIZE,
+        timeout=TIMEOUT,
+    ):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.spool = DiskSpool(spool_dir)
+        self.sessions = []
+        for _ in range(pool_size):
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_maxsize=1))
+            session.mount("https://", HTTPAdapter(pool_maxsize=1))
+            self.sessions.append(session)
+        self.executor = ThreadPoolExecutor(pool_size, thread_name_prefix="upload")
+
+        self.incoming = deque()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        # (seq, evento, momento em que entrou) ainda não entregues
+        self.pending = deque()
+        self.loaded_until = self.spool.acked
+        self.retry_delay = 0.0
+        self.retry_at = 0.0
+        self.stats = {"submitted": 0, "sent": 0, "dropped": 0, "failures": 0}
+
+        self.thread = threading.Thread(target=self.run, name="uploader", daemon=True)
+        self.thread.start()
+
+    def submit(self, events):
+        """Enfileira eventos para envio (nunca bloqueia)"""
+        self.incoming.extend(events)
+        self.stats["submitted"] += len(events)
+        if len(self.incoming) >= self.batch_size:
+            self.wakeup.set()
+
+    __call__ = submit
+
+    @property
+    def backlog(self):
+        """Eventos ainda não entregues (em memória e no spool)"""
+        return len(self.incoming) + self.spool.last_seq - self.spool.acked
+
+    def close(self, timeout=10):
+        """Tenta entregar o que falta por até `timeout` segundos e para"""
+        deadline = time.monotonic() + timeout
+        self.wakeup.set()
+        while self.backlog and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.stopping.set()
+        self.wakeup.set()
+        self.thread.join(timeout)
+        self.executor.shutdown(wait=False)
+        self.spool.close()
+
+    def run(self):
+        while not self.stopping.is_set():
+            self.wakeup.wait(self.max_delay)
+            self.wakeup.clear()
+            self.store_incoming()
+            self.load_from_spool()
+
+            now = time.monotonic()
+            if not self.pending or now < self.retry_at:
+                continue
+            oldest = self.pending[0][2]
+            if len(self.pending) >= self.batch_size or now - oldest >= self.max_delay:
+                self.deliver(list(self.pending)[: self.batch_size])
+
+    def store_incoming(self):
+        if not self.incoming:
+            return
+        now = time.monotonic()
+        while self.incoming:
+            event = self.incoming.popleft()
+            seq = self.spool.append(event)
+            if self.loaded_until == seq - 1 and len(self.pending) < MAX_IN_MEMORY:
+                self.pending.append((seq, event, now))
+                self.loaded_until = seq
+        self.spool.flush()
+
+    def load_from_spool(self):
+        """Traz do spool os eventos que não couberam em memória (ou da última execução)"""
+        room = MAX_IN_MEMORY - len(self.pending)
+        if room <= 0 or self.loaded_until >= self.spool.last_seq:
+            return
+        now = time.monotonic()
+        for seq, event in self.spool.read(self.loaded_until, room):
+            self.pending.append((seq, event, now - self.max_delay))
+            self.loaded_until = seq
+
+    def deliver(self, batch):
+        """Envia um lote e confirma no spool o que foi entregue"""
+        partitions = {}
+        for seq, event, _ in batch:
+            index = hash(event["slot_id"]) % len(self.sessions)
+            partitions.setdefault(index, []).append((seq, event))
+        done = set()
+        for result in self.executor.map(
+            lambda item: self.send_partition(*item), partitions.items()
+        ):
+            done.update(result)
+
+        self.pending = deque(item for item in self.pending if item[0] not in done)
+        self.spool.ack(self.pending[0][0] - 1 if self.pending else self.loaded_until)
+
+        if len(done) < len(batch):
+            self.stats["failures"] += 1
+            self.retry_delay = min(
+                max(self.retry_delay * 2, RETRY_DELAY), MAX_RETRY_DELAY
+            )
+            self.retry_at = time.monotonic() + self.retry_delay * random.uniform(1, 1.5)
+        else:
+            self.retry_delay = 0.0
+            self.retry_at = 0.0
+
+    def send_partition(self, index, events):
+        """Envia os eventos de uma partição em ordem; para na primeira falha"""
+        session = self.sessions[index]
+        done = []
+        for seq, event in events:
+            data = {
+                "slot_id": event["slot_id"],
+                "status": event["status"],
+                "confidence": event.get("confidence"),
+            }
+            if event.get("at") is not None:
+                # Hora da detecção: o envio pode atrasar (fila, spool, queda)
+                data["occurred_at"] = datetime.fromtimestamp(
+                    event["at"], timezone.utc
+                ).isoformat()
+            try:
+                response = session.post(self.endpoint, json=data, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"Erro ao enviar para o endpoint: {e}")
+                break
+            if response.status_code in POISON_STATUS:
+                # Evento rejeitado (vaga inexistente etc.): não adianta repetir
+                print(f"Evento descartado ({response.status_code}): {data}")
+                self.stats["dropped"] += 1
+            elif response.status_code >= 400:
+                print(f"Falha no endpoint ({response.status_code}), tentando depois")
+                break
+            else:
+                self.stats["sent"] += 1
+            done.append(seq)
+        return done